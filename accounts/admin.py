@@ -72,6 +72,16 @@ class UserAdmin(ModelAdmin):
         ("Important dates", {"fields": ("last_login", "created_at")}),
     )
 
+    # changing is_active, is_staff or is_superuser revokes the user's tokens by
+    # itself (User.save), this is for the other cases
+    actions = ["revoke_tokens"]
+
+    @admin.action(description="Revoke all tokens of the selected users")
+    def revoke_tokens(self, request, queryset):
+        for user in queryset:
+            user.revoke_tokens()
+        self.message_user(request, f"Revoked the tokens of {len(queryset)} user(s).")
+
     # Human-readable full name column
     @display(description="Full name")
     def full_name_display(self, obj):
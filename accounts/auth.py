@@ -1,11 +1,112 @@
-from rest_framework_simplejwt.authentication import JWTAuthentication
+"""
+JWT authentication of the API, from the Authorization header or the access cookie.
+
+By default the token's user is resolved through accounts/user_cache.py.
+
+With settings.AUTH_STATELESS_CLAIMS the signed claims CustomTokenObtainPairSerializer
+puts in every token (is_active, is_staff, is_superuser, token_version) are
+trusted instead: request.user is a ClaimsUser answering those, its id and
+is_authenticated without touching the database or a cache, and loading the row
+only when a view reads any other attribute. Tokens issued without the claims
+still go through the cache.
+
+Revocation: User.revoke_tokens() bumps token_version, tokens carrying an older
+version are refused. The stateful path compares against the cached user. In
+claims mode the check is one primary key lookup of the version, done for every
+request with settings.AUTH_TOKEN_VERSION_CHECK = "always", or only for unsafe
+methods with "writes" (the default) so read-only requests stay free; a revoked
+token then keeps reading until it expires.
+"""
+
 from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils.functional import SimpleLazyObject, empty
+from django.utils.translation import gettext_lazy as _
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from . import user_cache
+
+# user flags copied into every token
+USER_CLAIMS = ("is_active", "is_staff", "is_superuser")
+TOKEN_VERSION_CLAIM = "token_version"
+
+DEFAULT_TOKEN_VERSION_CHECK = "writes"
+
+
+def add_user_claims(token, user):
+    """
+    Put the claims ClaimsUser answers from into `token`.
+    """
+    for claim in USER_CLAIMS:
+        token[claim] = getattr(user, claim)
+    token[TOKEN_VERSION_CLAIM] = user.token_version
+    return token
+
+
+def token_version_of(token):
+    # tokens issued before the claim existed belong to version 0
+    return token.get(TOKEN_VERSION_CLAIM, 0)
+
+
+def current_token_version(user_id):
+    """
+    token_version of the user, None if there is no such user.
+    """
+    return (
+        get_user_model()
+        ._default_manager.filter(pk=user_id)
+        .values_list("token_version", flat=True)
+        .first()
+    )
+
+
+class ClaimsUser(SimpleLazyObject):
+    """
+    The token's user, as far as its claims tell; any other attribute loads the
+    User (through accounts/user_cache.py) and is served from it.
+
+    Compare users by id: `==`, isinstance() and passing it to the ORM load the row.
+    """
+
+    def __init__(self, user_id, token):
+        def load():
+            user = user_cache.get_user(user_id)
+            if user is None:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found")
+            return user
+
+        super().__init__(load)
+        claims = {claim: token[claim] for claim in USER_CLAIMS}
+        claims.update(
+            id=user_id,
+            pk=user_id,
+            token_version=token_version_of(token),
+            is_authenticated=True,
+            is_anonymous=False,
+        )
+        self.__dict__["_claims"] = claims
+
+    def __getattr__(self, name):
+        if self._wrapped is empty:
+            claims = self.__dict__["_claims"]
+            if name in claims:
+                return claims[name]
+        return super().__getattr__(name)
+
+    def __bool__(self):
+        # `request.user and request.user.is_authenticated` in permissions
+        return True
+
 
 class CustomJWTAuthentication(JWTAuthentication):
     def authenticate(self, request):
         # Check the header first
         header = self.get_header(request)
-        
+
         if header is None:
             # If no header, check the cookie
             raw_token = request.COOKIES.get(settings.SIMPLE_JWT['AUTH_COOKIE']) or None
@@ -16,4 +117,62 @@ class CustomJWTAuthentication(JWTAuthentication):
             return None
 
         validated_token = self.get_validated_token(raw_token)
-        return self.get_user(validated_token), validated_token
\ No newline at end of file
+        return self.get_user(validated_token, request), validated_token
+
+    def get_user_id(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+        try:
+            return get_user_model()._meta.pk.to_python(user_id)
+        except Exception as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+    def get_user(self, validated_token, request=None):
+        """
+        Same checks as JWTAuthentication.get_user plus the token version, with the
+        user coming from accounts/user_cache.py (or the claims, see the module
+        docstring) instead of a query per request.
+        """
+        user_id = self.get_user_id(validated_token)
+
+        if getattr(settings, "AUTH_STATELESS_CLAIMS", False) and all(
+            claim in validated_token for claim in (*USER_CLAIMS, TOKEN_VERSION_CLAIM)
+        ):
+            return self.get_claims_user(user_id, validated_token, request)
+
+        # the revoke check compares against the password hash, which is never cached
+        user = user_cache.get_user(user_id, with_password=api_settings.CHECK_REVOKE_TOKEN)
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if token_version_of(validated_token) != user.token_version:
+            raise AuthenticationFailed(_("Token has been revoked."), code="token_revoked")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(
+                user.password
+            ):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
+
+        return user
+
+    def get_claims_user(self, user_id, validated_token, request=None):
+        if api_settings.CHECK_USER_IS_ACTIVE and not validated_token["is_active"]:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        check = getattr(settings, "AUTH_TOKEN_VERSION_CHECK", DEFAULT_TOKEN_VERSION_CHECK)
+        if check == "always" or request is None or request.method not in SAFE_METHODS:
+            version = current_token_version(user_id)
+            if version is None:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found")
+            if token_version_of(validated_token) != version:
+                raise AuthenticationFailed(_("Token has been revoked."), code="token_revoked")
+
+        return ClaimsUser(user_id, validated_token)
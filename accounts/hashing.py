@@ -0,0 +1,78 @@
+"""
+Bounded pool for password hashing, used by the async login and password change views.
+
+Checking or making a PBKDF2 hash keeps a CPU busy for tens to hundreds of
+milliseconds. Run on the event loop (Django's acheck_password does) it stalls
+every other request of the ASGI worker. Here it runs on a small thread pool
+instead (hashlib releases the GIL while hashing, the threads really run in
+parallel):
+
+- at most settings.AUTH_HASHING_WORKERS hashes run at once, which caps the CPU
+  authentication can take
+- at most settings.AUTH_HASHING_MAX_PENDING are running or waiting; past that
+  the request is refused right away with a 503 and a Retry-After header instead
+  of queueing behind a login storm
+
+Only the hashing happens in the pool, database work stays with the caller.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+DEFAULT_WORKERS = 2
+DEFAULT_MAX_PENDING = 32
+
+_executor = None
+_pending = None
+_lock = threading.Lock()
+
+
+class HashingBusy(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Too many sign-ins in progress, try again shortly."
+    default_code = "hashing_busy"
+    # seconds, sent as Retry-After by DRF's exception handler
+    wait = 1
+
+
+def _get_executor():
+    global _executor, _pending
+    with _lock:
+        if _executor is None:
+            workers = getattr(settings, "AUTH_HASHING_WORKERS", DEFAULT_WORKERS)
+            max_pending = getattr(settings, "AUTH_HASHING_MAX_PENDING", DEFAULT_MAX_PENDING)
+            _executor = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="password-hashing"
+            )
+            _pending = threading.BoundedSemaphore(max_pending)
+        return _executor, _pending
+
+
+async def _run(func, *args):
+    executor, pending = _get_executor()
+    if not pending.acquire(blocking=False):
+        raise HashingBusy()
+    try:
+        future = executor.submit(func, *args)
+    except BaseException:
+        pending.release()
+        raise
+    future.add_done_callback(lambda _: pending.release())
+    return await asyncio.wrap_future(future)
+
+
+async def verify_password(password, encoded):
+    """
+    (is the password correct, should the hash be upgraded) like hashers.verify_password.
+    """
+    return await _run(hashers.verify_password, password, encoded)
+
+
+async def make_password(password):
+    return await _run(hashers.make_password, password)
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from accounts import revocation
+
+
+class Command(BaseCommand):
+    """
+    Delete the revoked refresh tokens that have expired since, see
+    accounts/revocation.py. Meant to run periodically (cron).
+
+    Usage:
+        python manage.py prune_revoked_tokens
+    """
+
+    help = "Delete revoked refresh tokens past their expiry."
+
+    def handle(self, *args, **options):
+        deleted = revocation.prune()
+        self.stdout.write(self.style.SUCCESS(f"Pruned {deleted} revoked tokens."))
@@ -2,6 +2,9 @@
 import os.path
 
 from django.db import models
+from django.db.models import F
+from django.db.models.fields.files import FieldFile
+from django.db.models.functions import Lower
 from django.contrib.auth.models import (
     AbstractBaseUser,
     BaseUserManager,
@@ -9,7 +12,21 @@ from django.contrib.auth.models import (
     UserManager,
 )
 
+from accounts.auth import USER_CLAIMS
 from accounts.managers import CustomUserManager
+from accounts.user_cache import invalidate_user
+
+
+_NOT_LOADED = object()
+
+
+def _saved_value(field, value):
+    # what ends up in the column, a FieldFile compares by its name
+    if isinstance(value, FieldFile):
+        return value.name or ""
+    if isinstance(field, models.FileField):
+        return value or ""
+    return value
 
 
 def profile_image_upload_path(instance, filename):
@@ -47,8 +64,18 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # part of every token issued, bumping it revokes all of them (see accounts/auth.py)
+    token_version = models.PositiveIntegerField(default=0)
+
     objects = CustomUserManager()
 
+    class Meta:
+        indexes = [
+            # case-insensitive prefix search of the issue admin (issues/admin.py)
+            models.Index(Lower("email"), name="accounts_user_email_lower_idx"),
+            models.Index(Lower("first_name"), name="accounts_user_fname_lower_idx"),
+        ]
+
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = ["first_name"]
 
@@ -76,7 +103,99 @@ class User(AbstractBaseUser, PermissionsMixin):
         if profile:
             self.profile_pic.name = profile_image_upload_path(self, profile.name)
 
+        # only write what changed since the row was loaded: the instance may come
+        # from accounts/user_cache.py, its other values can be seconds old
+        if kwargs.get("update_fields") is None and not self._state.adding:
+            kwargs["update_fields"] = self._implicit_update_fields()
+
+        changed_claims = self._changed_claims(kwargs.get("update_fields"))
         super().save(*args, **kwargs)
+        self._remember(kwargs.get("update_fields"))
+
+        # tokens carry these flags (accounts/auth.py), a demoted staffer must not
+        # keep acting as staff with the tokens it already has
+        if changed_claims:
+            self.revoke_tokens()
+
+    @classmethod
+    def from_db(cls, db, field_names, values, **kwargs):
+        user = super().from_db(db, field_names, values, **kwargs)
+        # the values of the row, what save() compares against
+        user._loaded = {}
+        user._remember()
+        return user
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        super().refresh_from_db(using, fields, **kwargs)
+        self._remember(fields)
+
+    def _remember(self, update_fields=None):
+        loaded = self.__dict__.setdefault("_loaded", {})
+        deferred = self.get_deferred_fields()
+        for field in self._meta.concrete_fields:
+            if field.attname in deferred:
+                continue
+            if update_fields is None or field.attname in update_fields or field.name in update_fields:
+                loaded[field.attname] = _saved_value(field, getattr(self, field.attname))
+
+    def _implicit_update_fields(self):
+        """
+        Fields a save() without update_fields writes. token_version is only ever
+        written by revoke_tokens(); the claim flags only when changed on this
+        instance, never from stale values: writing them back could undo a
+        deactivation, or un-revoke the tokens.
+        """
+        if hasattr(self, "_loaded"):
+            fields = self._changed_fields()
+        else:
+            deferred = self.get_deferred_fields()
+            fields = [
+                field.attname
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.attname not in deferred
+                and field.attname not in USER_CLAIMS
+            ]
+        return [name for name in fields if name != "token_version"]
+
+    def _changed_fields(self):
+        """
+        attnames of the fields set to something else than what was loaded (or
+        set at all, for the fields that were not loaded).
+        """
+        deferred = self.get_deferred_fields()
+        changed = []
+        for field in self._meta.concrete_fields:
+            if field.primary_key or field.attname in deferred:
+                continue
+            value = getattr(self, field.attname)
+            if isinstance(value, FieldFile) and value and not value._committed:
+                # a new upload, even under the same name
+                changed.append(field.attname)
+            elif self._loaded.get(field.attname, _NOT_LOADED) != _saved_value(field, value):
+                changed.append(field.attname)
+        return changed
+
+    def _changed_claims(self, update_fields=None):
+        # claim fields this save changes, compared to the values loaded from the
+        # database (queryset.update() bypasses this, call revoke_tokens() after it)
+        loaded = getattr(self, "_loaded", {})
+        return [
+            claim
+            for claim in USER_CLAIMS
+            if claim in loaded
+            and (update_fields is None or claim in update_fields)
+            and getattr(self, claim) != loaded[claim]
+        ]
+
+    def revoke_tokens(self):
+        """
+        Invalidate every access and refresh token issued to the user so far.
+        """
+        User.objects.filter(pk=self.pk).update(token_version=F("token_version") + 1)
+        self.refresh_from_db(fields=["token_version"])
+        # update() sends no post_save
+        invalidate_user(self.pk)
 
     def create_superuser(self, email, password, **extra_fields):
         extra_fields.setdefault("is_staff", True)
@@ -98,3 +217,18 @@ class User(AbstractBaseUser, PermissionsMixin):
             "phone_number": self.phone_number,
             "profile_pic": self.profile_pic.url if self.profile_pic else None,
         }
+
+
+class RevokedToken(models.Model):
+    """
+    A refresh token that can't be used anymore, see accounts/revocation.py.
+    """
+
+    jti = models.CharField(max_length=255, unique=True)
+    # when the token expires anyway, the row can be pruned past it
+    expires_at = models.DateTimeField(db_index=True)
+    # the workers load the rows revoked since their last sync by it
+    revoked_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return self.jti
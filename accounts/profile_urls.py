@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path
 from djoser.views import UserViewSet
 
@@ -11,9 +12,13 @@ from accounts.update.views import (
     UpdateProfilePictureView,
     ProfileUpdateView,
     PasswordUpdateView,
+    AsyncPasswordUpdateView,
     FirstNameUpdateView,
 )
 
+# the async view hashes in a bounded pool, see accounts/hashing.py
+PasswordView = AsyncPasswordUpdateView if settings.AUTH_ASYNC_VIEWS else PasswordUpdateView
+
 urlpatterns = [
     path(
         "me/", UserViewSet.as_view({"get": "me", "put": "me", "patch": "me"}), name="me"
@@ -25,6 +30,6 @@ urlpatterns = [
         name="update_profile_pic",
     ),
     path("update/", ProfileUpdateView.as_view(), name="update_profile"),
-    path("update/password/", PasswordUpdateView.as_view(), name="update_password"),
+    path("update/password/", PasswordView.as_view(), name="update_password"),
     path("update/first_name/", FirstNameUpdateView.as_view(), name="update_first_name"),
 ]
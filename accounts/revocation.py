@@ -0,0 +1,157 @@
+"""
+Revoked refresh tokens, by jti.
+
+Rotation (CustomTokenRefreshSerializer with BLACKLIST_AFTER_ROTATION) and
+logout revoke the refresh token they are given, it can't be refreshed again.
+Rows stay in RevokedToken until the token would have expired anyway,
+`python manage.py prune_revoked_tokens` deletes them past that.
+
+is_revoked() asks an in-process Bloom filter of the revoked jtis first and only
+queries the table on a hit (a revoked token, or a false positive at
+settings.AUTH_REVOCATION_BLOOM_ERROR_RATE), refreshing a valid token costs no
+query. The filter picks up the revocations of the other workers by loading the
+recently revoked rows at most every settings.AUTH_REVOCATION_SYNC_INTERVAL
+seconds. That staleness doesn't let a token through rotation: revoke() is an
+insert on the unique jti, the refresh of a token that is already revoked (or
+replayed concurrently) fails there.
+"""
+
+import hashlib
+import math
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from accounts.models import RevokedToken
+
+DEFAULT_CAPACITY = 100_000
+DEFAULT_ERROR_RATE = 0.001
+DEFAULT_SYNC_INTERVAL = 10
+
+# rows are loaded by revoked_at, this margin covers late commits and clock skew
+SYNC_OVERLAP = timedelta(seconds=60)
+
+_filter = None
+_synced_at = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+class BloomFilter:
+    """
+    Set of strings answering "maybe" or "no", sized for `capacity` keys at
+    `error_rate` false positives.
+    """
+
+    def __init__(self, capacity, error_rate):
+        self.capacity = capacity
+        self.size = max(64, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key):
+        # the k positions derived from two halves of one digest (Kirsch-Mitzenmacher)
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, key):
+        if key in self:
+            return
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key):
+        return all(self.bits[p >> 3] & (1 << (p & 7)) for p in self._positions(key))
+
+
+def _rebuild():
+    global _filter, _synced_at
+    started = timezone.now()
+    revoked = RevokedToken.objects.filter(expires_at__gt=started)
+    capacity = max(
+        getattr(settings, "AUTH_REVOCATION_BLOOM_CAPACITY", DEFAULT_CAPACITY),
+        2 * revoked.count(),
+    )
+    bloom = BloomFilter(
+        capacity, getattr(settings, "AUTH_REVOCATION_BLOOM_ERROR_RATE", DEFAULT_ERROR_RATE)
+    )
+    for jti in revoked.values_list("jti", flat=True).iterator():
+        bloom.add(jti)
+    _filter, _synced_at = bloom, started
+
+
+def _sync():
+    global _synced_at
+    started = timezone.now()
+    recent = RevokedToken.objects.filter(revoked_at__gte=_synced_at - SYNC_OVERLAP)
+    for jti in recent.values_list("jti", flat=True).iterator():
+        _filter.add(jti)
+    _synced_at = started
+    if _filter.count > _filter.capacity:
+        # past capacity the false positive rate climbs, start over larger
+        _rebuild()
+
+
+def _get_filter():
+    global _checked_at
+    interval = getattr(settings, "AUTH_REVOCATION_SYNC_INTERVAL", DEFAULT_SYNC_INTERVAL)
+    with _lock:
+        now = time.monotonic()
+        if _filter is None:
+            _rebuild()
+            _checked_at = now
+        elif now - _checked_at >= interval:
+            _sync()
+            _checked_at = now
+        return _filter
+
+
+def is_revoked(jti):
+    if jti not in _get_filter():
+        return False
+    return RevokedToken.objects.filter(jti=jti).exists()
+
+
+def revoke(token):
+    """
+    Revoke a refresh token, False if it already was.
+    """
+    jti = token[api_settings.JTI_CLAIM]
+    try:
+        with transaction.atomic():
+            RevokedToken.objects.create(jti=jti, expires_at=datetime_from_epoch(token["exp"]))
+    except IntegrityError:
+        revoked = False
+    else:
+        revoked = True
+
+    with _lock:
+        if _filter is not None:
+            _filter.add(jti)
+    return revoked
+
+
+def prune():
+    """
+    Delete the rows of tokens expired by now, returns how many.
+    """
+    deleted, _ = RevokedToken.objects.filter(expires_at__lte=timezone.now()).delete()
+    # rebuilt without them on the next check
+    clear()
+    return deleted
+
+
+def clear():
+    global _filter
+    with _lock:
+        _filter = None
@@ -1,8 +1,16 @@
 from djoser.serializers import UserCreateSerializer as BaseUserCreateSerializer
 from rest_framework import serializers
 from .models import User
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
 from django.contrib.auth import get_user_model
+from django.contrib.auth.models import update_last_login
+from django.contrib.auth.signals import user_login_failed
+from django.utils.translation import gettext_lazy as _
+
+from . import revocation
+from .auth import add_user_claims, token_version_of
 
 def base_name_validator(value, field_name):
     #     we use regex to allow only letters, numbers, underscores, and hyphens in the base name
@@ -87,9 +95,28 @@ class UserSerializer(serializers.ModelSerializer):
 
 
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
+    @classmethod
+    def get_token(cls, user):
+        # claims for the stateless mode of accounts/auth.py, copied into the access token too
+        return add_user_claims(super().get_token(user), user)
+
     def validate(self, attrs):
-        email = attrs.get("email")
-        password = attrs.get("password")
+        """
+        One user lookup and one password check, the tokens are issued from that
+        same instance (TokenObtainPairSerializer.validate would authenticate()
+        through the backend and look the user up again).
+
+        AsyncCustomTokenObtainView runs the same steps with the hashing in a pool.
+        """
+        user_obj = self.get_login_user(attrs.get("email"))
+
+        # also upgrades the stored hash when the hasher settings changed
+        if not user_obj.check_password(attrs.get("password")):
+            self.password_incorrect(attrs.get("email"))
+
+        return self.login(user_obj)
+
+    def get_login_user(self, email):
         User = get_user_model()
 
         # Check if email exists
@@ -103,20 +130,77 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         if not user_obj.is_active:
             raise serializers.ValidationError({"detail": "Account is inactive."})
 
-        # passowrd check is handled by super class
-        # super().validate(attrs)
-        # if we pass wrong password it will raise ValidationError
-        try:
-            data = super().validate(attrs)
-        except serializers.ValidationError:
-            # If parent fails, it means the password was wrong
-            # (since we already checked email exists above) only possible failure is in password
-            raise serializers.ValidationError({
-                "detail" : {"password": "Password is incorrect for given email."}
-            })
+        return user_obj
+
+    def password_incorrect(self, email):
+        # what authenticate() would have signalled
+        user_login_failed.send(
+            sender=__name__,
+            credentials={"email": email},
+            request=self.context.get("request"),
+        )
+        raise serializers.ValidationError({
+            "detail" : {"password": "Password is incorrect for given email."}
+        })
+
+    def login(self, user_obj):
+        """
+        Tokens and user info of a user whose password was checked.
+        """
+        self.user = user_obj
+        refresh = self.get_token(user_obj)
+        data = {"refresh": str(refresh), "access": str(refresh.access_token)}
+
+        if api_settings.UPDATE_LAST_LOGIN:
+            update_last_login(None, user_obj)
 
         # 3. Add Custom Data
         data["user"] = user_obj.get_user_info()
 
         return data
 
+
+class CustomTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    TokenRefreshSerializer refusing revoked refresh tokens (token_version, and
+    the ones rotated or logged out, see accounts/revocation.py) and issuing
+    tokens with the user's current claims.
+    """
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+
+        if revocation.is_revoked(refresh[api_settings.JTI_CLAIM]):
+            raise AuthenticationFailed(_("Token is blacklisted"), "token_blacklisted")
+
+        User = get_user_model()
+        try:
+            user = User.objects.get(pk=refresh[api_settings.USER_ID_CLAIM])
+        except (KeyError, User.DoesNotExist):
+            raise AuthenticationFailed(
+                self.error_messages["no_active_account"], "no_active_account"
+            )
+
+        if not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(
+                self.error_messages["no_active_account"], "no_active_account"
+            )
+        if token_version_of(refresh) != user.token_version:
+            raise AuthenticationFailed(_("Token has been revoked."), "token_revoked")
+
+        add_user_claims(refresh, user)
+        data = {"access": str(refresh.access_token)}
+
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            # the unique jti also stops a token refreshed twice at the same time
+            if api_settings.BLACKLIST_AFTER_ROTATION and not revocation.revoke(refresh):
+                raise AuthenticationFailed(_("Token is blacklisted"), "token_blacklisted")
+
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            refresh.outstand()
+
+            data["refresh"] = str(refresh)
+
+        return data
@@ -1,3 +1,325 @@
-from django.test import TestCase
+import io
+import json
+from datetime import timedelta
 
-# Create your tests here.
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+
+from accounts import hashing, revocation, user_cache
+from accounts.models import RevokedToken, User
+from accounts.serializers import CustomTokenObtainPairSerializer
+from accounts.update.views import AsyncPasswordUpdateView
+from accounts.views import AsyncCustomTokenObtainView
+from issues.models import Issue
+
+
+def user_queries(queries):
+    # queries reading users themselves, not the joins of issue queries
+    return [q['sql'] for q in queries.captured_queries if f'FROM "{User._meta.db_table}"' in q['sql']]
+
+
+@pytest.mark.django_db
+class TestAuthUserCache:
+
+    def test_cached_user_no_auth_query(self, user1, user1_client):
+        print("\n--- Test: Auth User Cache Hot Path ---")
+        first = user1_client.get("/profile/me/")
+        assert first.status_code == 200
+
+        with CaptureQueriesContext(connection) as queries:
+            again = user1_client.get("/profile/me/")
+        assert again.status_code == 200
+        assert again.json() == first.json()
+        assert user_queries(queries) == []
+
+    def test_cache_invalidated_on_save(self, user1, user1_client, django_capture_on_commit_callbacks):
+        print("\n--- Test: Auth User Cache Invalidation ---")
+        assert user1_client.get("/profile/me/").status_code == 200
+
+        # what UserAdmin does when is_active is unticked
+        with django_capture_on_commit_callbacks(execute=True):
+            user1.is_active = False
+            user1.save()
+        assert user1_client.get("/profile/me/").status_code == 401
+
+        with django_capture_on_commit_callbacks(execute=True):
+            user1.is_active = True
+            user1.first_name = "Renamed"
+            user1.save()
+        # changing is_active revoked the tokens issued before
+        assert user1_client.get("/profile/me/").status_code == 401
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {CustomTokenObtainPairSerializer.get_token(user1).access_token}")
+        assert client.get("/profile/me/").json()['response']['first_name'] == "Renamed"
+
+    def test_cached_user_saves_only_its_changes(self, user1):
+        print("\n--- Test: Cached User Partial Save ---")
+        cached = user_cache.get_user(user1.id)
+
+        # changed meanwhile, e.g. in the admin served by another worker
+        User.objects.filter(pk=user1.pk).update(phone_number="5550100", last_name="Admin")
+
+        cached.first_name = "Renamed"
+        cached.save()
+        row = User.objects.get(pk=user1.pk)
+        assert (row.first_name, row.phone_number, row.last_name) == ("Renamed", "5550100", "Admin")
+
+    def test_cached_user_save_keeps_deactivation(self, user1, django_capture_on_commit_callbacks):
+        print("\n--- Test: Cached User Save After Deactivation ---")
+        cached = user_cache.get_user(user1.id)
+
+        # deactivated in the admin meanwhile, which also revokes the tokens
+        with django_capture_on_commit_callbacks(execute=True):
+            admin_copy = User.objects.get(pk=user1.pk)
+            admin_copy.is_active = False
+            admin_copy.save()
+
+        # the profile edit of a request holding the cached user
+        cached.first_name = "Renamed"
+        cached.save()
+        row = User.objects.get(pk=user1.pk)
+        assert (row.is_active, row.token_version, row.first_name) == (False, 1, "Renamed")
+
+    def test_password_change_with_cached_user(self, user1, user1_client):
+        print("\n--- Test: Password Change With Cached User ---")
+        assert user1_client.get("/profile/me/").status_code == 200
+
+        resp = user1_client.patch(
+            "/profile/update/password/",
+            {"current_password": "Gwen@12345", "new_password": "N3w-Secret!pass"},
+        )
+        assert resp.status_code == 200
+
+        user1.refresh_from_db()
+        assert user1.check_password("N3w-Secret!pass")
+        # saved from the cached instance, nothing else overwritten
+        assert user1.email == "shristi500@gmail.com" and user1.is_active
+        assert user1_client.get("/profile/me/").status_code == 200
+
+
+@pytest.mark.django_db
+class TestStatelessClaims:
+
+    @pytest.fixture(autouse=True)
+    def claims_mode(self, settings):
+        settings.AUTH_STATELESS_CLAIMS = True
+
+    def login(self, user):
+        refresh = CustomTokenObtainPairSerializer.get_token(user)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {refresh.access_token}")
+        return client, refresh
+
+    def test_reads_without_user_lookup(self, user1):
+        print("\n--- Test: Stateless Claims Reads ---")
+        client, _ = self.login(user1)
+        Issue.objects.create(title="Mine", description="D", reported_by=user1)
+
+        with CaptureQueriesContext(connection) as queries:
+            assert client.get("/issues/feed/").status_code == 200
+            assert client.get("/issues/mine/").json()['response']['results'][0]['title'] == "Mine"
+        assert user_queries(queries) == []
+
+        # anything outside the claims loads the user
+        assert client.get("/profile/me/").json()['response']['email'] == user1.email
+
+    def test_owner_check_on_ids(self, user1, user2):
+        print("\n--- Test: Stateless Claims Owner Check ---")
+        issue = Issue.objects.create(title="Mine", description="D", reported_by=user1)
+        owner, _ = self.login(user1)
+        other, _ = self.login(user2)
+
+        assert other.patch(f"/issues/update/{issue.id}/", {"title": "Theirs"}).status_code == 403
+        assert owner.patch(f"/issues/update/{issue.id}/", {"title": "Renamed"}).status_code == 200
+
+    def test_token_version_revocation(self, user1, settings):
+        print("\n--- Test: Token Version Revocation ---")
+        issue = Issue.objects.create(title="Liked", description="D", reported_by=user1)
+        client, refresh = self.login(user1)
+        assert client.post("/issues/likes/toggle/", {"issue_id": issue.id}).status_code == 200
+
+        user1.revoke_tokens()
+        # writes check the version, reads only with "always"
+        assert client.post("/issues/likes/toggle/", {"issue_id": issue.id}).status_code == 401
+        assert client.get("/issues/feed/").status_code == 200
+        settings.AUTH_TOKEN_VERSION_CHECK = "always"
+        assert client.get("/issues/feed/").status_code == 401
+
+        # the stateful path and the refresh endpoint refuse it too
+        settings.AUTH_STATELESS_CLAIMS = False
+        assert client.get("/issues/feed/").status_code == 401
+        resp = APIClient().post("/auth/token/refresh/", {"refresh": str(refresh)}, format='json')
+        assert resp.status_code == 401
+
+        fresh, _ = self.login(user1)
+        assert fresh.get("/issues/feed/").status_code == 200
+
+    def test_demoted_staff_loses_rights(self, user1, django_capture_on_commit_callbacks):
+        print("\n--- Test: Demoted Staff Tokens Revoked ---")
+        staff = User.objects.create_user(email="staff@example.com", password="Staff@12345", is_staff=True)
+        issue = Issue.objects.create(title="Theirs", description="D", reported_by=user1)
+        client, _ = self.login(staff)
+        assert client.patch(f"/issues/update/{issue.id}/", {"title": "Moderated"}).status_code == 200
+
+        # what UserAdmin does when is_staff is unticked
+        staff = User.objects.get(pk=staff.pk)
+        with django_capture_on_commit_callbacks(execute=True):
+            staff.is_staff = False
+            staff.save()
+        assert client.patch(f"/issues/update/{issue.id}/", {"title": "Again"}).status_code == 401
+        assert client.delete(f"/issues/delete/{issue.id}/").status_code == 401
+
+        # other edits leave the tokens alone
+        fresh, _ = self.login(staff)
+        staff.first_name = "Renamed"
+        staff.save()
+        assert fresh.get("/issues/feed/").status_code == 200
+        assert fresh.delete(f"/issues/delete/{issue.id}/").status_code == 403
+
+
+@pytest.mark.django_db
+class TestLogin:
+
+    def test_login_single_lookup(self, user1):
+        print("\n--- Test: Login Single Lookup ---")
+        client = APIClient()
+        with CaptureQueriesContext(connection) as queries:
+            resp = client.post("/auth/login/", {"email": user1.email, "password": "Gwen@12345"}, format='json')
+        assert resp.status_code == 200
+        data = resp.json()['response']
+        assert data['user']['email'] == user1.email
+        assert resp.cookies['townspark_access_token'].value == data['access']
+        assert len(user_queries(queries)) == 1
+
+        # the issued access token works
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {data['access']}")
+        assert client.get("/profile/me/").status_code == 200
+
+    def test_login_errors(self, user1):
+        print("\n--- Test: Login Error Messages ---")
+        client = APIClient()
+
+        resp = client.post("/auth/login/", {"email": "nobody@example.com", "password": "x"}, format='json')
+        assert resp.status_code == 400
+        assert "nobody@example.com" in str(resp.json()['error'])
+
+        resp = client.post("/auth/login/", {"email": user1.email, "password": "wrong"}, format='json')
+        assert resp.status_code == 400
+        assert "Password is incorrect" in str(resp.json()['error'])
+
+        user1.is_active = False
+        user1.save()
+        resp = client.post("/auth/login/", {"email": user1.email, "password": "Gwen@12345"}, format='json')
+        assert resp.status_code == 400
+        assert "inactive" in str(resp.json()['error'])
+
+
+@pytest.mark.django_db
+class TestAsyncHashing:
+
+    @pytest.fixture(autouse=True)
+    def fresh_pool(self):
+        # the pool is sized from the settings when first used
+        hashing._executor = None
+        yield
+        hashing._executor = None
+
+    def call(self, view_class, method, path, data, user=None):
+        request = getattr(APIRequestFactory(), method)(path, data, format='json')
+        if user is not None:
+            force_authenticate(request, user=user)
+        response = async_to_sync(view_class.as_view())(request)
+        response.render()
+        return response
+
+    def test_async_login_matches_sync(self, user1):
+        print("\n--- Test: Async Login ---")
+        resp = self.call(AsyncCustomTokenObtainView, 'post', "/auth/login/",
+                         {"email": user1.email, "password": "Gwen@12345"})
+        assert resp.status_code == 200
+        data = json.loads(resp.content)['response']
+        assert data['user']['email'] == user1.email
+        assert resp.cookies['townspark_access_token'].value == data['access']
+
+        bad = {"email": user1.email, "password": "wrong"}
+        resp = self.call(AsyncCustomTokenObtainView, 'post', "/auth/login/", bad)
+        expected = APIClient().post("/auth/login/", bad, format='json')
+        assert resp.status_code == expected.status_code == 400
+        assert json.loads(resp.content) == expected.json()
+
+    def test_async_password_change(self, user1):
+        print("\n--- Test: Async Password Change ---")
+        path = "/profile/update/password/"
+        resp = self.call(AsyncPasswordUpdateView, 'patch', path,
+                         {"current_password": "wrong", "new_password": "short"}, user=user1)
+        assert resp.status_code == 400
+        errors = json.loads(resp.content)['error']['details']
+        assert set(errors) == {"current_password", "new_password"}
+
+        resp = self.call(AsyncPasswordUpdateView, 'patch', path,
+                         {"current_password": "Gwen@12345", "new_password": "N3w-Secret!pass"}, user=user1)
+        assert resp.status_code == 200
+        user1.refresh_from_db()
+        assert user1.check_password("N3w-Secret!pass")
+
+    def test_sheds_when_pool_is_full(self, user1, settings):
+        print("\n--- Test: Hashing Pool Shedding ---")
+        settings.AUTH_HASHING_MAX_PENDING = 0
+        resp = self.call(AsyncCustomTokenObtainView, 'post', "/auth/login/",
+                         {"email": user1.email, "password": "Gwen@12345"})
+        assert resp.status_code == 503
+        assert resp['Retry-After'] == "1"
+
+
+@pytest.mark.django_db
+class TestRefreshRevocation:
+
+    def refresh(self, token):
+        return APIClient().post("/auth/token/refresh/", {"refresh": token}, format='json')
+
+    def revoked_table_queries(self, queries):
+        return [q['sql'] for q in queries.captured_queries if RevokedToken._meta.db_table in q['sql']]
+
+    def test_rotation_revokes_used_token(self, user1):
+        print("\n--- Test: Refresh Rotation Revocation ---")
+        first = str(CustomTokenObtainPairSerializer.get_token(user1))
+        resp = self.refresh(first)
+        assert resp.status_code == 200
+        second = resp.json()['response']['refresh']
+
+        # a token that isn't revoked is checked without querying the table
+        with CaptureQueriesContext(connection) as queries:
+            assert self.refresh(second).status_code == 200
+        assert [sql for sql in self.revoked_table_queries(queries) if sql.startswith("SELECT")] == []
+
+        assert self.refresh(first).status_code == 401
+        assert self.refresh(second).status_code == 401
+
+    def test_logout_revokes_refresh_cookie(self, user1):
+        print("\n--- Test: Logout Revokes Refresh Token ---")
+        client = APIClient()
+        resp = client.post("/auth/login/", {"email": user1.email, "password": "Gwen@12345"}, format='json')
+        refresh = resp.json()['response']['refresh']
+
+        assert client.post("/auth/logout/").status_code == 200
+        assert self.refresh(refresh).status_code == 401
+
+    def test_other_workers_and_pruning(self, user1, settings):
+        print("\n--- Test: Revocation Sync And Pruning ---")
+        token = CustomTokenObtainPairSerializer.get_token(user1)
+        assert not revocation.is_revoked(token['jti'])
+
+        # revoked by another worker, seen at the next sync
+        settings.AUTH_REVOCATION_SYNC_INTERVAL = 0
+        RevokedToken.objects.create(jti=token['jti'], expires_at=timezone.now() + timedelta(days=1))
+        assert revocation.is_revoked(token['jti'])
+        assert self.refresh(str(token)).status_code == 401
+
+        RevokedToken.objects.create(jti="expired", expires_at=timezone.now() - timedelta(seconds=1))
+        call_command("prune_revoked_tokens", stdout=io.StringIO())
+        assert list(RevokedToken.objects.values_list("jti", flat=True)) == [token['jti']]
@@ -54,6 +54,18 @@ class PasswordUpdateSerializer(serializers.Serializer):
         return instance
 
 
+class AsyncPasswordUpdateSerializer(PasswordUpdateSerializer):
+    """
+    PasswordUpdateSerializer for AsyncPasswordUpdateView, which checks the
+    current password and hashes the new one in the hashing pool itself.
+    """
+
+    def validate_current_password(self, value):
+        # kept for the view, which runs when the new password is invalid too
+        self.current_password_value = value
+        return value
+
+
 class FirstNameUpdateSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
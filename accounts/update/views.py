@@ -2,6 +2,8 @@
 This module contains views for updating user profiles in the accounts application.
 """
 
+from asgiref.sync import sync_to_async
+from django.contrib.auth.password_validation import password_changed
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
@@ -9,11 +11,19 @@ from rest_framework.views import APIView
 from accounts.update.serializers import (
     ProfilePictureUpdateSerializer,
     PasswordUpdateSerializer,
+    AsyncPasswordUpdateSerializer,
     FirstNameUpdateSerializer,
 )
+from accounts import hashing, user_cache
 from accounts.serializers import UserSerializer
 from rest_framework.parsers import MultiPartParser, FormParser
 
+from core.asyncviews import AsyncAPIView
+from core.uploads import StreamingUploadMixin
+
+# same limit as ProfilePictureUpdateSerializer, enforced while streaming
+PROFILE_PICTURE_MAX_SIZE = 5 * 1024 * 1024
+
 
 class ProfileUpdateView(APIView):
     """
@@ -49,12 +59,14 @@ class ProfileUpdateView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class ProfilePictureUpdateView(APIView):
+class ProfilePictureUpdateView(StreamingUploadMixin, APIView):
     """
     View to handle updating the profile picture separately.
     """
 
     permission_classes = [IsAuthenticated]
+    upload_max_file_size = PROFILE_PICTURE_MAX_SIZE
+    upload_max_request_size = PROFILE_PICTURE_MAX_SIZE + 64 * 1024
 
     def patch(self, request):
         """
@@ -95,6 +107,46 @@ class PasswordUpdateView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class AsyncPasswordUpdateView(AsyncAPIView):
+    """
+    PasswordUpdateView with both hashes (checking the current password, making
+    the new one) done in the hashing pool, see accounts/hashing.py. Serves
+    `update/password/` when settings.AUTH_ASYNC_VIEWS is on.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    async def patch(self, request):
+        """
+        Handle password update with current password verification.
+        """
+        user = await sync_to_async(user_cache.get_user)(request.user.id, with_password=True)
+        serializer = AsyncPasswordUpdateSerializer(user, data=request.data)
+
+        await sync_to_async(serializer.is_valid)()
+        errors = dict(serializer.errors)
+
+        # same errors as PasswordUpdateSerializer, current password included
+        if "current_password" not in errors:
+            correct, _ = await hashing.verify_password(
+                serializer.current_password_value, user.password
+            )
+            if not correct:
+                errors["current_password"] = ["Current password is incorrect."]
+
+        if errors:
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+        new_password = serializer.validated_data["new_password"]
+        user.password = await hashing.make_password(new_password)
+        await user.asave()
+        password_changed(new_password, user=user)
+
+        return Response(
+            {"detail": "Password updated successfully."}, status=status.HTTP_200_OK
+        )
+
+
 class FirstNameUpdateView(APIView):
     """
     View to handle updating the user's first name.
@@ -116,9 +168,11 @@ class FirstNameUpdateView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class UpdateProfilePictureView(APIView):
+class UpdateProfilePictureView(StreamingUploadMixin, APIView):
     permission_classes = [IsAuthenticated]
     parser_classes = (MultiPartParser, FormParser)
+    upload_max_file_size = PROFILE_PICTURE_MAX_SIZE
+    upload_max_request_size = PROFILE_PICTURE_MAX_SIZE + 64 * 1024
 
     def post(self, request):
         return self._update_picture(request)
@@ -1,8 +1,10 @@
+from django.conf import settings
 from django.urls import path
 from djoser.views import UserViewSet
 
 from accounts.views import (
     CustomTokenObtainView,
+    AsyncCustomTokenObtainView,
     CustomTokenRefreshView,
     LogoutView,
     CustomTokenVerifyView,
@@ -12,10 +14,13 @@ from accounts.update.views import (
     UpdateProfilePictureView,
 )
 
+# the async view hashes in a bounded pool, see accounts/hashing.py
+LoginView = AsyncCustomTokenObtainView if settings.AUTH_ASYNC_VIEWS else CustomTokenObtainView
+
 urlpatterns = [
     # Auth
     path("register/", CustomSignupViewSet.as_view({"post": "create"}), name="register"),
-    path("login/", CustomTokenObtainView.as_view(), name="login"),
+    path("login/", LoginView.as_view(), name="login"),
     # Token management
     path("token/refresh/", CustomTokenRefreshView.as_view(), name="token_refresh"),
     path("token/verify/", CustomTokenVerifyView.as_view(), name="token_verify"),
@@ -0,0 +1,197 @@
+"""
+Cache of the users CustomJWTAuthentication resolves from access tokens.
+
+Without it every authenticated request starts with a SELECT of the token's user.
+Users are kept instead:
+
+- in a per-process LRU of settings.AUTH_USER_CACHE_SIZE users, each for at most
+  settings.AUTH_USER_CACHE_TTL seconds (0 turns the cache off)
+- optionally in the shared cache alias settings.AUTH_USER_CACHE_ALIAS, so a
+  worker that has never seen the user does not have to query it either
+
+What is cached are the field values, never User instances: every request gets
+its own instance (Model.from_db) and can change it freely. Saving it only
+writes the fields changed on it (User.save), the other cached values may be
+older than the row and must not overwrite it. The password hash is left out,
+it is loaded the first time something reads it (check_password, the password
+change...).
+
+Entries are dropped on post_save / post_delete of a User (profile edits, password
+change through PasswordUpdateSerializer, is_active toggled in UserAdmin...),
+right away and again once the transaction commits. queryset.update() sends no
+signal, call invalidate_user() after it. Other processes drop their copy of the
+LRU only when the TTL runs out, which bounds how long a deactivated user keeps
+working there.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import router, transaction
+
+DEFAULT_SIZE = 10000
+DEFAULT_TTL = 30
+
+# never cached, see the module docstring
+UNCACHED_FIELDS = ("password",)
+
+_MISSING = object()
+
+
+def _key(user_id):
+    return f"auth:user:{user_id}"
+
+
+def _ttl():
+    return getattr(settings, "AUTH_USER_CACHE_TTL", DEFAULT_TTL)
+
+
+def _shared_cache():
+    alias = getattr(settings, "AUTH_USER_CACHE_ALIAS", None)
+    return caches[alias] if alias else None
+
+
+def _field_names():
+    return [
+        field.attname
+        for field in get_user_model()._meta.concrete_fields
+        if field.attname not in UNCACHED_FIELDS
+    ]
+
+
+class UserCache:
+    """
+    LRU of {user id: (expiry, field values)}, thread safe.
+    """
+
+    def __init__(self, size=DEFAULT_SIZE):
+        self.size = size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # bumped by every invalidation, a load that started before one is not stored
+        self._epoch = 0
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            expires, values = entry
+            if expires < time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return values
+
+    def put(self, user_id, values, ttl, epoch):
+        with self._lock:
+            if epoch != self._epoch:
+                return
+            self._entries[user_id] = (time.monotonic() + ttl, values)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def epoch(self):
+        with self._lock:
+            return self._epoch
+
+    def discard(self, user_id):
+        with self._lock:
+            self._epoch += 1
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._epoch += 1
+            self._entries.clear()
+
+
+_cache = UserCache(getattr(settings, "AUTH_USER_CACHE_SIZE", DEFAULT_SIZE))
+
+
+def _load(user_id):
+    """
+    {field: value} of the user, with the password hash under "password",
+    None when there is no such user.
+    """
+    names = _field_names()
+    row = (
+        get_user_model()
+        ._default_manager.filter(pk=user_id)
+        .values_list(*names, *UNCACHED_FIELDS)
+        .first()
+    )
+    if row is None:
+        return None
+    return dict(zip([*names, *UNCACHED_FIELDS], row))
+
+
+def _build(values):
+    User = get_user_model()
+    # from_db takes the values in the order of the model's fields
+    names = [field.attname for field in User._meta.concrete_fields if field.attname in values]
+    return User.from_db(
+        router.db_for_read(User), names, [values[name] for name in names]
+    )
+
+
+def get_user(user_id, with_password=False):
+    """
+    The User with primary key `user_id`, None if it does not exist.
+
+    `with_password` loads the password hash along, for callers that need it anyway.
+    """
+    ttl = _ttl()
+    if not ttl or with_password:
+        values = _load(user_id)
+        if values is None:
+            return None
+        return _build(values)
+
+    key = str(user_id)
+    values = _cache.get(key)
+    if values is None:
+        epoch = _cache.epoch()
+        shared = _shared_cache()
+        values = shared.get(_key(key), _MISSING) if shared is not None else _MISSING
+        if values is _MISSING:
+            values = _load(user_id)
+            if values is None:
+                return None
+            values = {
+                name: value for name, value in values.items() if name not in UNCACHED_FIELDS
+            }
+            if shared is not None:
+                shared.set(_key(key), values, timeout=ttl)
+        _cache.put(key, values, ttl, epoch)
+
+    return _build(values)
+
+
+def _discard(user_id):
+    key = str(user_id)
+    _cache.discard(key)
+    shared = _shared_cache()
+    if shared is not None:
+        shared.delete(_key(key))
+
+
+def invalidate_user(user_id):
+    """
+    Forget the cached user, now and once the current transaction commits
+    (a request reading the old row in between could otherwise store it again).
+    """
+    _discard(user_id)
+    transaction.on_commit(lambda: _discard(user_id))
+
+
+def clear():
+    """
+    Forget every user cached by this process.
+    """
+    _cache.clear()
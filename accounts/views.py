@@ -1,17 +1,46 @@
 from djoser.views import UserViewSet
-from accounts.serializers import CustomTokenObtainPairSerializer
+from accounts.serializers import CustomTokenObtainPairSerializer, CustomTokenRefreshSerializer
 from rest_framework import status
 from rest_framework_simplejwt.views import TokenObtainPairView
 
 from django.conf import settings
 from rest_framework_simplejwt.views import TokenRefreshView
 from rest_framework_simplejwt.views import TokenVerifyView
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.tokens import RefreshToken
 
 from rest_framework.views import APIView
 from rest_framework.response import Response
+from asgiref.sync import sync_to_async
+
+from accounts import hashing, revocation
+from core.asyncviews import AsyncAPIView
 
 
 # Create your views here.
+def set_auth_cookies(response, access_token, refresh_token=None):
+    """
+    Set the access (and refresh) token cookies on a login or refresh response.
+    """
+    response.set_cookie(
+        key=settings.SIMPLE_JWT["AUTH_COOKIE"],
+        value=access_token,
+        expires=settings.SIMPLE_JWT["ACCESS_TOKEN_LIFETIME"],
+        secure=settings.SIMPLE_JWT["AUTH_COOKIE_SECURE"],
+        httponly=settings.SIMPLE_JWT["AUTH_COOKIE_HTTP_ONLY"],
+        samesite=settings.SIMPLE_JWT["AUTH_COOKIE_SAMESITE"],
+    )
+    if refresh_token is not None:
+        response.set_cookie(
+            key=settings.SIMPLE_JWT["AUTH_COOKIE_REFRESH"],
+            value=refresh_token,
+            expires=settings.SIMPLE_JWT["REFRESH_TOKEN_LIFETIME"],
+            secure=settings.SIMPLE_JWT["AUTH_COOKIE_SECURE"],
+            httponly=settings.SIMPLE_JWT["AUTH_COOKIE_HTTP_ONLY"],
+            samesite=settings.SIMPLE_JWT["AUTH_COOKIE_SAMESITE"],
+        )
+
+
 class CustomSignupViewSet(UserViewSet):
     """
     Custom signup viewset to handle user registration.
@@ -53,29 +82,48 @@ class CustomTokenObtainView(TokenObtainPairView):
         response = super().post(request, *args, **kwargs)
 
         if response.status_code == status.HTTP_200_OK:
-            # extract tokens from response data
-            access_token = response.data.get("access")
-            refresh_token = response.data.get("refresh")
-
-            # Set Access Token Cookie
-            response.set_cookie(
-                key=settings.SIMPLE_JWT["AUTH_COOKIE"],
-                value=access_token,
-                expires=settings.SIMPLE_JWT["ACCESS_TOKEN_LIFETIME"],
-                secure=settings.SIMPLE_JWT["AUTH_COOKIE_SECURE"],
-                httponly=settings.SIMPLE_JWT["AUTH_COOKIE_HTTP_ONLY"],
-                samesite=settings.SIMPLE_JWT["AUTH_COOKIE_SAMESITE"],
-            )
-            # Set Refresh Token Cookie
-            response.set_cookie(
-                key=settings.SIMPLE_JWT["AUTH_COOKIE_REFRESH"],
-                value=refresh_token,
-                expires=settings.SIMPLE_JWT["REFRESH_TOKEN_LIFETIME"],
-                secure=settings.SIMPLE_JWT["AUTH_COOKIE_SECURE"],
-                httponly=settings.SIMPLE_JWT["AUTH_COOKIE_HTTP_ONLY"],
-                samesite=settings.SIMPLE_JWT["AUTH_COOKIE_SAMESITE"],
+            set_auth_cookies(response, response.data.get("access"), response.data.get("refresh"))
+
+        return response
+
+
+class AsyncCustomTokenObtainView(AsyncAPIView):
+    """
+    CustomTokenObtainView with the password check done in the bounded hashing
+    pool (accounts/hashing.py) instead of on the worker, same requests, responses
+    and cookies. Serves `login/` when settings.AUTH_ASYNC_VIEWS is on.
+
+    Refused with a 503 and Retry-After when too many logins are already hashing.
+    """
+
+    # same as TokenObtainPairView
+    authentication_classes = ()
+    permission_classes = ()
+
+    async def post(self, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            return Response(
+                {"detail": "User is already logged in. You need to logout first."},
+                status=status.HTTP_400_BAD_REQUEST,
             )
 
+        serializer = CustomTokenObtainPairSerializer(context={"request": request})
+        # field validation only, the steps of CustomTokenObtainPairSerializer.validate follow
+        attrs = serializer.to_internal_value(request.data)
+
+        user = await sync_to_async(serializer.get_login_user)(attrs["email"])
+
+        correct, must_update = await hashing.verify_password(attrs["password"], user.password)
+        if not correct:
+            await sync_to_async(serializer.password_incorrect)(attrs["email"])
+        if must_update:
+            user.password = await hashing.make_password(attrs["password"])
+            await user.asave(update_fields=["password"])
+
+        data = await sync_to_async(serializer.login)(user)
+
+        response = Response(data, status=status.HTTP_200_OK)
+        set_auth_cookies(response, data["access"], data["refresh"])
         return response
 
 
@@ -85,6 +133,8 @@ class CustomTokenRefreshView(TokenRefreshView):
     and returns new tokens as cookies.
     """
 
+    serializer_class = CustomTokenRefreshSerializer
+
     def post(self, request, *args, **kwargs):
         # Try to get refresh token from cookie
         refresh_token = request.COOKIES.get(
@@ -106,28 +156,8 @@ class CustomTokenRefreshView(TokenRefreshView):
         response = super().post(request, *args, **kwargs)
 
         if response.status_code == 200:
-            # Set new access token cookie
-            access_token = response.data.get("access")
-            response.set_cookie(
-                key=settings.SIMPLE_JWT["AUTH_COOKIE"],
-                value=access_token,
-                expires=settings.SIMPLE_JWT["ACCESS_TOKEN_LIFETIME"],
-                secure=settings.SIMPLE_JWT["AUTH_COOKIE_SECURE"],
-                httponly=settings.SIMPLE_JWT["AUTH_COOKIE_HTTP_ONLY"],
-                samesite=settings.SIMPLE_JWT["AUTH_COOKIE_SAMESITE"],
-            )
-
-            # Set new refresh token cookie if rotation is enabled
-            if "refresh" in response.data:
-                refresh_token = response.data.get("refresh")
-                response.set_cookie(
-                    key=settings.SIMPLE_JWT["AUTH_COOKIE_REFRESH"],
-                    value=refresh_token,
-                    expires=settings.SIMPLE_JWT["REFRESH_TOKEN_LIFETIME"],
-                    secure=settings.SIMPLE_JWT["AUTH_COOKIE_SECURE"],
-                    httponly=settings.SIMPLE_JWT["AUTH_COOKIE_HTTP_ONLY"],
-                    samesite=settings.SIMPLE_JWT["AUTH_COOKIE_SAMESITE"],
-                )
+            # the refresh token is only there if rotation is enabled
+            set_auth_cookies(response, response.data.get("access"), response.data.get("refresh"))
 
         return response
 
@@ -156,10 +186,18 @@ class CustomTokenVerifyView(TokenVerifyView):
 
 class LogoutView(APIView):
     """
-    Clears authentication cookies on logout.
+    Revokes the refresh token cookie and clears authentication cookies on logout.
     """
 
     def post(self, request):
+        refresh_token = request.COOKIES.get(settings.SIMPLE_JWT["AUTH_COOKIE_REFRESH"])
+        if refresh_token:
+            try:
+                revocation.revoke(RefreshToken(refresh_token))
+            except TokenError:
+                # expired or not a token, nothing to revoke
+                pass
+
         response = Response(
             {"detail": "Successfully logged out."}, status=status.HTTP_200_OK
         )
@@ -0,0 +1,111 @@
+"""
+Benchmark of the JSON encoder backends (core/json_backends.py) on issue-list payloads.
+
+Builds feed pages shaped like IssueListSerializer output (plus the raw
+datetimes, Decimals and UUIDs some endpoints hand to the renderer), checks every
+available backend produces the same bytes as stdlib, then times them.
+
+Usage (from the repository root):
+    python benchmarks/json_encoding.py
+    python benchmarks/json_encoding.py --issues 100 --rounds 200
+"""
+
+import argparse
+import datetime
+import decimal
+import os
+import sys
+import timeit
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "main_app.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from core.json_backends import BACKENDS, get_backend, orjson  # noqa: E402
+
+
+def issue_page(size):
+    """
+    One envelope-wrapped feed page of `size` issues.
+    """
+    now = datetime.datetime(2025, 6, 1, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc)
+    results = []
+    for i in range(size):
+        image = f"/media/issue_images/cas/ab/{uuid.UUID(int=i).hex}"
+        results.append(
+            {
+                "id": i,
+                "title": f"Broken streetlight near the bus stop #{i}",
+                "description": "The light has been flickering for a week, it is "
+                "completely dark after 9pm. Ünïcode, emoji 🚧 and a quote \" too.",
+                "category": "Infrastructure",
+                "address": "Ward 4, Baneshwor, Kathmandu",
+                "latitude": 27.6915 + i / 10000,
+                "longitude": 85.3420 - i / 10000,
+                "is_resolved": i % 3 == 0,
+                "reported_by": f"reporter{i}@example.com",
+                "images": [
+                    {
+                        "id": i * 2 + n,
+                        "image": f"{image}{n}.jpg",
+                        "variants": {
+                            "thumb": f"{image}{n}_thumb.jpg",
+                            "thumb_webp": f"{image}{n}_thumb.webp",
+                            "medium": f"{image}{n}_medium.jpg",
+                            "medium_webp": f"{image}{n}_medium.webp",
+                        },
+                    }
+                    for n in range(2)
+                ],
+                "comments_count": i * 7 % 50,
+                "likes_count": i * 13 % 400,
+                "viewer_has_liked": i % 2 == 0,
+                "created_at": (now - datetime.timedelta(minutes=i)).isoformat(),
+                # raw values some views pass straight to the renderer
+                "time": now - datetime.timedelta(seconds=i),
+                "score": decimal.Decimal("12.50") + i,
+                "ref": uuid.UUID(int=i),
+            }
+        )
+    return {
+        "success": True,
+        "response": {"results": results, "next": "WzE3MTg0NTg2MTUsNDJd"},
+        "error": None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--issues", type=int, default=20, help="issues per page")
+    parser.add_argument("--rounds", type=int, default=500, help="encodes per backend")
+    args = parser.parse_args()
+
+    payload = issue_page(args.issues)
+    names = [name for name in BACKENDS if name != "orjson" or orjson is not None]
+    if orjson is None:
+        print("orjson is not installed, only the stdlib backend is measured")
+
+    reference = get_backend("stdlib").dumps(payload)
+    print(f"payload: {args.issues} issues, {len(reference)} bytes\n")
+
+    baseline = None
+    for name in names:
+        backend = get_backend(name)
+        identical = backend.dumps(payload) == reference
+        seconds = min(
+            timeit.repeat(lambda: backend.dumps(payload), number=args.rounds, repeat=5)
+        )
+        per_call = seconds / args.rounds * 1e6
+        baseline = baseline or per_call
+        print(
+            f"{name:>8}: {per_call:9.1f} us/encode  "
+            f"{baseline / per_call:5.1f}x  identical={identical}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark of the login path (CustomTokenObtainPairSerializer).
+
+Compares the previous implementation, which looked the user up, then let
+TokenObtainPairSerializer authenticate() it through the backend (a second lookup),
+with the single-lookup one. Runs against a throwaway test database.
+
+Password hashing dominates a real login, so the default run uses a fast
+hasher to show what the login path itself costs; pass --hasher default to
+measure with the configured PBKDF2 one.
+
+Usage (from the repository root):
+    python benchmarks/login.py
+    python benchmarks/login.py --logins 2000 --hasher default
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "main_app.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test.utils import CaptureQueriesContext, override_settings  # noqa: E402
+from rest_framework import serializers  # noqa: E402
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer  # noqa: E402
+
+from accounts.serializers import CustomTokenObtainPairSerializer  # noqa: E402
+
+EMAIL = "bench@example.com"
+PASSWORD = "Bench@12345"
+
+
+class PreviousTokenObtainPairSerializer(CustomTokenObtainPairSerializer):
+    """
+    The login path before the single-lookup change.
+    """
+
+    def validate(self, attrs):
+        User = get_user_model()
+        try:
+            user_obj = User.objects.get(email=attrs.get("email"))
+        except User.DoesNotExist:
+            raise serializers.ValidationError({"detail": {"email": "not found"}})
+        if not user_obj.is_active:
+            raise serializers.ValidationError({"detail": "Account is inactive."})
+
+        data = TokenObtainPairSerializer.validate(self, attrs)
+        data["user"] = user_obj.get_user_info()
+        return data
+
+
+def login(serializer_class):
+    serializer = serializer_class(data={"email": EMAIL, "password": PASSWORD})
+    serializer.is_valid(raise_exception=True)
+    return serializer.validated_data
+
+
+def measure(name, serializer_class, logins):
+    with CaptureQueriesContext(connection) as queries:
+        login(serializer_class)
+
+    start = time.perf_counter()
+    for _ in range(logins):
+        login(serializer_class)
+    seconds = time.perf_counter() - start
+
+    print(
+        f"{name:>9}: {logins / seconds:8.1f} logins/s  "
+        f"{seconds / logins * 1e3:7.2f} ms/login  {len(queries)} queries"
+    )
+    return seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--logins", type=int, default=500)
+    parser.add_argument(
+        "--hasher", choices=["fast", "default"], default="fast",
+        help="fast: MD5 hasher, isolates the login path; default: settings.PASSWORD_HASHERS",
+    )
+    args = parser.parse_args()
+
+    hashers = (
+        ["django.contrib.auth.hashers.MD5PasswordHasher"]
+        if args.hasher == "fast"
+        else settings.PASSWORD_HASHERS
+    )
+    logins = args.logins if args.hasher == "fast" else min(args.logins, 20)
+
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        with override_settings(PASSWORD_HASHERS=hashers):
+            get_user_model().objects.create_user(email=EMAIL, password=PASSWORD, first_name="Bench")
+            print(f"{logins} logins, {args.hasher} hasher\n")
+            before = measure("previous", PreviousTokenObtainPairSerializer, logins)
+            after = measure("current", CustomTokenObtainPairSerializer, logins)
+            print(f"\nspeedup: {before / after:.2f}x")
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == "__main__":
+    main()
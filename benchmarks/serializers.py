@@ -0,0 +1,123 @@
+"""
+Benchmark of the compiled serializers (core/fastserializers.py) against DRF.
+
+Builds issues in memory (with their reporter, images and variants already
+"prefetched", so no database is involved), checks the compiled output equals
+IssueListSerializer(...).data, then times both at each size.
+
+Usage (from the repository root):
+    python benchmarks/serializers.py
+    python benchmarks/serializers.py --sizes 1000 10000 --rounds 5
+"""
+
+import argparse
+import datetime
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "main_app.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+
+from issues.models import Issue, IssueComment, IssueImage  # noqa: E402
+from issues.serializers import (  # noqa: E402
+    IssueCommentSerializer,
+    IssueListSerializer,
+    comment_data,
+    issue_list_data,
+)
+
+User = get_user_model()
+
+
+def build_issues(size):
+    """
+    `size` unsaved issues shaped like a feed page, two images each.
+    """
+    now = datetime.datetime(2025, 6, 1, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc)
+    reporters = [User(id=n, email=f"reporter{n}@example.com") for n in range(50)]
+    issues = []
+    for i in range(size):
+        issue = Issue(
+            id=i + 1,
+            title=f"Broken streetlight near the bus stop #{i}",
+            description="The light has been flickering for a week.",
+            category="Infrastructure",
+            address="Ward 4, Baneshwor, Kathmandu",
+            latitude=27.6915 + i / 10000 if i % 5 else None,
+            longitude=85.3420 - i / 10000 if i % 5 else None,
+            is_resolved=i % 3 == 0,
+            comments_count=i * 7 % 50,
+            likes_count=i * 13 % 400,
+            created_at=now - datetime.timedelta(minutes=i),
+        )
+        issue.reported_by = reporters[i % len(reporters)]
+        issue.viewer_has_liked = i % 2 == 0
+        issue._prefetched_objects_cache = {
+            "images": [
+                IssueImage(
+                    id=i * 2 + n,
+                    issue_id=issue.id,
+                    image=f"issue_images/cas/ab/{i:08x}{n}.jpg",
+                    variants={"thumb": f"issue_images/cas/ab/{i:08x}{n}_thumb.jpg"} if n else {},
+                )
+                for n in range(2)
+            ]
+        }
+        issues.append(issue)
+    return issues
+
+
+def build_comments(size):
+    now = datetime.datetime(2025, 6, 1, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc)
+    commenter = User(id=1, email="commenter@example.com")
+    comments = []
+    for i in range(size):
+        comment = IssueComment(id=i + 1, issue_id=1, text=f"Same here #{i}", created_at=now)
+        comment.commented_by = commenter
+        comments.append(comment)
+    return comments
+
+
+def measure(label, rows, drf, fast, rounds):
+    identical = fast(rows) == drf(rows)
+    drf_seconds = min(timeit.repeat(lambda: drf(rows), number=rounds, repeat=3)) / rounds
+    fast_seconds = min(timeit.repeat(lambda: fast(rows), number=rounds, repeat=3)) / rounds
+    print(
+        f"{label:>9} x {len(rows):>6}: drf {drf_seconds * 1e3:9.1f} ms  "
+        f"compiled {fast_seconds * 1e3:8.1f} ms  "
+        f"{drf_seconds / fast_seconds:5.1f}x  identical={identical}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000], help="rows per run")
+    parser.add_argument("--rounds", type=int, default=3, help="serializations per timing")
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        measure(
+            "issues",
+            build_issues(size),
+            lambda rows: IssueListSerializer(rows, many=True).data,
+            issue_list_data.many,
+            args.rounds,
+        )
+        measure(
+            "comments",
+            build_comments(size),
+            lambda rows: IssueCommentSerializer(rows, many=True).data,
+            comment_data.many,
+            args.rounds,
+        )
+
+
+if __name__ == "__main__":
+    main()
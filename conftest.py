@@ -33,6 +33,34 @@ class SREClientWrapper:
     def delete(self, url, *args, **kwargs): return self._request('delete', url, *args, **kwargs)
 
 
+@pytest.fixture(scope="session")
+def django_db_modify_db_settings(django_db_modify_db_settings_parallel_suffix, tmp_path_factory):
+    """
+    Run tests on a file based SQLite database instead of the shared-cache in-memory
+    one, whose table locks fail immediately: concurrency tests need real locking.
+    """
+    from django.conf import settings
+
+    settings.DATABASES["default"].setdefault("TEST", {})
+    settings.DATABASES["default"]["TEST"]["NAME"] = str(tmp_path_factory.mktemp("db") / "test.sqlite3")
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """
+    Test databases reuse primary keys between tests, never let cached
+    payloads of one test leak into the next.
+    """
+    from django.core.cache import caches
+
+    from accounts import revocation, user_cache
+
+    for cache in caches.all():
+        cache.clear()
+    user_cache.clear()
+    revocation.clear()
+
+
 # --- Reusable User Fixtures ---
 
 @pytest.fixture
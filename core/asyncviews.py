@@ -0,0 +1,53 @@
+"""
+APIView with coroutine handlers, for endpoints that mostly wait (on a pool, a
+remote service...) and should not hold a worker thread meanwhile.
+
+    class LoginView(AsyncAPIView):
+        async def post(self, request):
+            ...
+            return Response(data)
+
+Authentication, permissions and throttling, which may query the database, run
+in a thread (sync_to_async) before the handler; parsers, the exception handler
+and the renderers are the usual DRF ones, so responses look exactly like those of
+the sync views. Inside the handler the ORM has to be called through
+sync_to_async (or the a* methods) like in any async Django view.
+
+Under WSGI these views still work, Django runs each request in its own event
+loop, they only pay off under the ASGI application (main_app/asgi.py).
+"""
+
+import inspect
+
+from asgiref.sync import sync_to_async
+from rest_framework.views import APIView
+
+
+class AsyncAPIView(APIView):
+    # View.as_view marks the view function as a coroutine function
+    view_is_async = True
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            response = handler(request, *args, **kwargs)
+            if inspect.isawaitable(response):
+                response = await response
+
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
@@ -0,0 +1,276 @@
+"""
+Batch requests: several API calls in one round trip.
+
+    POST /batch/
+    {
+        "requests": [
+            {"method": "GET", "path": "/issues/of/12/"},
+            {"method": "GET", "path": "/issues/comments/of/12/", "query": {"limit": 10}},
+            {"method": "POST", "path": "/issues/likes/toggle/", "body": {"issue_id": 12}},
+            {"method": "GET", "path": "/profile/me/", "headers": {"If-None-Match": "\"...\""}}
+        ],
+        "parallel": false
+    }
+
+Sub-requests are dispatched in-process to the regular API views:
+
+- the batch is authenticated once, sub-requests reuse its user and token
+  (DRF forced authentication) instead of decoding the JWT again
+- middleware and GlobalResponseRenderer run once, for the batch; sub-responses
+  are collected unrendered from `response.data`
+- by default they run in order inside one transaction, on one connection, so
+  reads see one consistent snapshot and later requests see earlier writes; each
+  one gets its own savepoint, a failing write does not undo the others
+- a batch of GET requests gets that snapshot from a read transaction: the
+  IMMEDIATE transaction mode (settings DATABASES) would take the write lock at
+  BEGIN and block every writer for the whole batch, it is started DEFERRED
+- with "parallel": true a batch of GET requests runs on a small thread pool
+  instead, each thread on its own connection: it gives up the shared snapshot,
+  every request reads the latest committed state when it runs
+- views streaming their response (`streams_response = True`, the exports) and
+  async views can't be batched
+
+Response, in the usual envelope:
+
+    {"results": [{"status": 200, "body": {...}, "headers": {"ETag": "..."}}, ...]}
+"""
+
+import io
+import json
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.http import HttpRequest, QueryDict
+from django.urls import Resolver404, resolve
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+DEFAULT_MAX_REQUESTS = 20
+DEFAULT_MAX_WORKERS = 4
+
+METHODS = ("GET", "POST", "PUT", "PATCH", "DELETE")
+
+# conditional request headers a sub-request may carry
+FORWARDED_HEADERS = ("If-None-Match", "If-Modified-Since")
+
+# response headers worth handing back
+RETURNED_HEADERS = ("ETag", "Last-Modified")
+
+
+def _error(status, detail):
+    return {"status": status, "body": {"detail": detail}, "headers": {}}
+
+
+@contextmanager
+def _read_transaction(using=DEFAULT_DB_ALIAS):
+    """
+    transaction.atomic() for blocks that only read: on SQLite it begins DEFERRED
+    whatever the configured transaction_mode, the first read takes a shared lock
+    and writers keep going.
+    """
+    connection = connections[using]
+    mode = getattr(connection, "transaction_mode", None)
+    if mode is None or connection.in_atomic_block:
+        with transaction.atomic(using=using):
+            yield
+        return
+
+    # read when atomic() issues BEGIN, see DatabaseWrapper._start_transaction_under_autocommit
+    connection.transaction_mode = "DEFERRED"
+    try:
+        with transaction.atomic(using=using):
+            connection.transaction_mode = mode
+            yield
+    finally:
+        connection.transaction_mode = mode
+
+
+def _resolve_api_view(path):
+    """
+    The view function and kwargs serving `path`, None if it is not an API view
+    that can be batched.
+    """
+    try:
+        match = resolve(path)
+    except Resolver404:
+        return None
+
+    # APIView.as_view() sets view_class, ViewSet.as_view() sets cls
+    view_class = getattr(match.func, "view_class", None) or getattr(match.func, "cls", None)
+    if view_class is None or not issubclass(view_class, APIView):
+        return None
+    # BatchView itself, async views which can't be called from the batch threads
+    # and streaming views, whose body is not in response.data
+    if (
+        issubclass(view_class, BatchView)
+        or getattr(view_class, "view_is_async", False)
+        or getattr(view_class, "streams_response", False)
+    ):
+        return None
+    return match
+
+
+def _parse(item):
+    """
+    Validate one sub-request spec, returns (method, path, query, body, headers).
+    """
+    if not isinstance(item, dict):
+        raise ValidationError({"requests": "Every request must be an object."})
+
+    method = str(item.get("method", "GET")).upper()
+    if method not in METHODS:
+        raise ValidationError({"requests": f"Unsupported method {method}."})
+
+    path = item.get("path")
+    if not isinstance(path, str) or not path.startswith("/"):
+        raise ValidationError({"requests": "Every request needs an absolute path."})
+
+    query = item.get("query") or {}
+    headers = item.get("headers") or {}
+    if not isinstance(query, dict) or not isinstance(headers, dict):
+        raise ValidationError({"requests": "query and headers must be objects."})
+
+    return method, path, query, item.get("body"), headers
+
+
+class BatchView(APIView):
+    """
+    Run several API requests in one round trip, see the module docstring.
+
+    **Request Format (JSON):**
+    {
+        "requests": list of {"method", "path", "query", "body", "headers"}
+                    (required, at most settings.BATCH_MAX_REQUESTS),
+        "parallel": boolean (optional, only for batches of GET requests)
+    }
+
+    **Response:**
+    {
+        "results": list of {"status", "body", "headers"}, in request order
+    }
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        items = request.data.get("requests")
+        max_requests = getattr(settings, "BATCH_MAX_REQUESTS", DEFAULT_MAX_REQUESTS)
+
+        if not isinstance(items, list) or not items:
+            raise ValidationError({"requests": "requests must be a non-empty list."})
+        if len(items) > max_requests:
+            raise ValidationError(
+                {"requests": f"At most {max_requests} requests are allowed per batch."}
+            )
+
+        specs = [_parse(item) for item in items]
+
+        if request.data.get("parallel"):
+            if any(method != "GET" for method, *_ in specs):
+                raise ValidationError(
+                    {"parallel": "Only batches of GET requests can run in parallel."}
+                )
+            results = self._run_parallel(request, specs)
+        else:
+            results = self._run_sequential(request, specs)
+
+        return Response({"results": results})
+
+    def _run_sequential(self, request, specs):
+        if all(method == "GET" for method, *_ in specs):
+            # read only, one snapshot without the write lock
+            with _read_transaction():
+                return [self._dispatch(request, *spec) for spec in specs]
+
+        results = []
+        with transaction.atomic():
+            for spec in specs:
+                with transaction.atomic():
+                    results.append(self._dispatch(request, *spec))
+        return results
+
+    def _run_parallel(self, request, specs):
+        workers = getattr(settings, "BATCH_MAX_WORKERS", DEFAULT_MAX_WORKERS)
+
+        def run(spec):
+            try:
+                return self._dispatch(request, *spec)
+            finally:
+                connections.close_all()
+
+        with ThreadPoolExecutor(max_workers=min(workers, len(specs))) as executor:
+            return list(executor.map(run, specs))
+
+    def _build_request(self, request, method, path, query, body, headers):
+        sub = HttpRequest()
+        sub.method = method
+        sub.path = sub.path_info = path
+
+        # everything describing the client and the connection, nothing describing the body
+        sub.META = {
+            key: value
+            for key, value in request.META.items()
+            if key not in ("CONTENT_TYPE", "CONTENT_LENGTH", "QUERY_STRING")
+            and not key.startswith("HTTP_IF_")
+        }
+        sub.META["REQUEST_METHOD"] = method
+        sub.META["PATH_INFO"] = path
+
+        params = QueryDict(mutable=True)
+        for key, value in query.items():
+            if isinstance(value, list):
+                params.setlist(key, [str(v) for v in value])
+            else:
+                params[key] = str(value)
+        sub.GET = params
+        sub.META["QUERY_STRING"] = params.urlencode()
+
+        forwarded = {name.lower() for name in FORWARDED_HEADERS}
+        for name, value in headers.items():
+            if name.lower() in forwarded:
+                sub.META["HTTP_" + name.upper().replace("-", "_")] = str(value)
+
+        if body is not None:
+            raw = json.dumps(body).encode()
+            sub._body = raw
+            sub._stream = io.BytesIO(raw)
+            sub._read_started = False
+            sub.META["CONTENT_TYPE"] = "application/json"
+            sub.META["CONTENT_LENGTH"] = str(len(raw))
+
+        sub.COOKIES = request.COOKIES
+        # authenticated once for the whole batch, see rest_framework.request.Request
+        sub._force_auth_user = request.user
+        sub._force_auth_token = request.auth
+        return sub
+
+    def _dispatch(self, request, method, path, query, body, headers):
+        match = _resolve_api_view(path)
+        if match is None:
+            return _error(404, f"{path} is not an API endpoint that can be batched.")
+
+        sub = self._build_request(request, method, path, query, body, headers)
+        sub.resolver_match = match
+        response = match.func(sub, *match.args, **match.kwargs)
+
+        if response.streaming:
+            # a streaming view without `streams_response`, its body would be lost
+            return _error(400, f"{path} streams its response and can't be batched.")
+
+        if hasattr(response, "data"):
+            body = response.data
+        else:
+            # a bare HttpResponse, e.g. a 304 from the conditional GET decorator
+            body = None
+
+        return {
+            "status": response.status_code,
+            "body": body,
+            "headers": {
+                name: response[name] for name in RETURNED_HEADERS if response.has_header(name)
+            },
+        }
@@ -0,0 +1,160 @@
+"""
+Sparse fieldsets, `?fields=` and `?exclude=` on the read endpoints.
+
+    GET /issues/feed/?fields=id,title,reported_by,created_at
+    GET /issues/feed/?exclude=description,images
+
+The selection shrinks the response and the work behind it: only the chosen
+fields are serialized (FastSerializer compiles just those, see
+core/fastserializers.py), and Fieldset.apply() makes the queryset load only the
+columns they read, join a relation only when a chosen field follows it and
+prefetch a reverse relation only when a chosen field lists it.
+
+Both parameters take comma separated top-level field names; `exclude` is applied
+after `fields`. Unknown names are a 400.
+"""
+
+import functools
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework.exceptions import ValidationError
+
+FIELDS_PARAM = "fields"
+EXCLUDE_PARAM = "exclude"
+
+
+class FieldPlan:
+    """
+    What one serializer field needs from the queryset.
+    """
+
+    def __init__(self, columns=(), select_related=(), prefetch_related=(), everything=False):
+        self.columns = tuple(columns)
+        self.select_related = tuple(select_related)
+        self.prefetch_related = tuple(prefetch_related)
+        # the field may read any column (source="*", a model property...)
+        self.everything = everything
+
+
+def _field_plan(model, field):
+    attrs = field.source_attrs
+    if not attrs:
+        return FieldPlan(everything=True)
+
+    name = attrs[0]
+    try:
+        model_field = model._meta.get_field(name)
+    except FieldDoesNotExist:
+        if hasattr(model, name):
+            # property or method of the model, no telling what it reads
+            return FieldPlan(everything=True)
+        # annotation or attribute set by the view
+        return FieldPlan()
+
+    if model_field.one_to_many or model_field.many_to_many:
+        return FieldPlan(prefetch_related=[name])
+
+    if model_field.many_to_one or model_field.one_to_one:
+        if len(attrs) == 1:
+            return FieldPlan(columns=[name])
+        related = model_field.related_model
+        try:
+            target = related._meta.get_field(attrs[1])
+        except FieldDoesNotExist:
+            target = None
+        if len(attrs) == 2 and target is not None and target.concrete and not target.is_relation:
+            return FieldPlan(columns=[f"{name}__{attrs[1]}"], select_related=[name])
+        return FieldPlan(select_related=[name], everything=True)
+
+    return FieldPlan(columns=[name])
+
+
+@functools.lru_cache(maxsize=None)
+def query_plan(serializer_class):
+    """
+    {field name: FieldPlan} of every readable field of a model serializer.
+    """
+    serializer = serializer_class()
+    model = serializer.Meta.model
+    return {field.field_name: _field_plan(model, field) for field in serializer._readable_fields}
+
+
+def _names(request, param, available):
+    raw = request.query_params.get(param)
+    if raw is None:
+        return None
+
+    names = [name.strip() for name in raw.split(",") if name.strip()]
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        raise ValidationError(
+            {param: f"Unknown field(s): {', '.join(unknown)}. "
+                    f"Available: {', '.join(available)}."}
+        )
+    return names
+
+
+class Fieldset:
+    """
+    The fields of `serializer_class` a request asked for, all of them by default.
+
+    Usage:
+        fieldset = Fieldset.from_request(request, IssueListSerializer)
+        issues = fieldset.apply(Issue.objects.all(), keep=("created_at",))
+        data = issue_list_data.many(issues, fields=fieldset.names)
+    """
+
+    def __init__(self, serializer_class, names=None):
+        self.serializer_class = serializer_class
+        # None means every field
+        self.names = None if names is None else frozenset(names)
+
+    @classmethod
+    def from_request(cls, request, serializer_class, extra=()):
+        """
+        Parse `?fields=` / `?exclude=`, `extra` are names the view adds to the
+        serialized output itself.
+        """
+        available = [*query_plan(serializer_class), *extra]
+        fields = _names(request, FIELDS_PARAM, available)
+        exclude = _names(request, EXCLUDE_PARAM, available)
+        if fields is None and exclude is None:
+            return cls(serializer_class)
+
+        selected = set(available if fields is None else fields) - set(exclude or ())
+        if selected == set(available):
+            return cls(serializer_class)
+        return cls(serializer_class, selected)
+
+    def __contains__(self, name):
+        return self.names is None or name in self.names
+
+    def prune(self, data):
+        """
+        Drop the fields not asked for from an already serialized dict.
+        """
+        if self.names is None:
+            return data
+        return {name: value for name, value in data.items() if name in self.names}
+
+    def apply(self, queryset, keep=()):
+        """
+        `queryset` loading only what the selected fields read, plus the `keep`
+        columns (e.g. the pagination keys).
+        """
+        plan = query_plan(self.serializer_class)
+        selected = [field_plan for name, field_plan in plan.items() if name in self]
+
+        select_related = {name for field_plan in selected for name in field_plan.select_related}
+        prefetch_related = {name for field_plan in selected for name in field_plan.prefetch_related}
+        if select_related:
+            queryset = queryset.select_related(*sorted(select_related))
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*sorted(prefetch_related))
+
+        if any(field_plan.everything for field_plan in selected):
+            return queryset
+
+        columns = {queryset.model._meta.pk.name, *keep}
+        columns.update(column for field_plan in selected for column in field_plan.columns)
+        return queryset.only(*sorted(columns))
@@ -0,0 +1,156 @@
+"""
+Pluggable JSON encoding for the API renderers (core/renderers.py).
+
+settings.JSON_ENCODER_BACKEND picks the encoder:
+
+- "stdlib" (default): DRF's JSONRenderer, i.e. the `json` module
+- "orjson": orjson, a native encoder, faster on list payloads;
+  refuses to start when it is not installed
+- "auto": orjson when it is installed, stdlib otherwise
+
+The orjson backend produces the same bytes as the stdlib one for the compact
+output the API serves: same separators, raw UTF-8, U+2028/U+2029 escaped, and
+datetimes, dates, times, Decimals, UUIDs, lazy strings and querysets go through
+DRF's own JSONEncoder.default. Where orjson itself differs, the payload is
+encoded by the stdlib backend instead:
+
+- floats below 1e-4 are spelled differently (0.00001 for 1e-05, 1e-7 for
+  1e-07)
+- NaN and Infinity are encoded as null where the stdlib encoder (allow_nan=False)
+  raises ValueError, which the fallback raises as well
+- ints outside 64 bits raise TypeError where the stdlib encodes them
+
+These are found by walking the payload before encoding (and what
+JSONEncoder.default returns, encoded by the stdlib in place), which costs about
+as much as orjson's own encoding and still leaves it faster than stdlib. Any
+other TypeError from orjson is retried with the stdlib backend, which encodes
+the value or raises its own error.
+
+Indented output (browsable API, `; indent=` media types) always uses the stdlib
+encoder.
+
+    python benchmarks/json_encoding.py
+"""
+
+import math
+import threading
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+DEFAULT_BACKEND = "stdlib"
+
+# leaves that can't be (or hold) a number, skipped without isinstance checks
+_LEAVES = frozenset((str, bool, type(None)))
+
+# the ints orjson encodes, it raises TypeError outside them
+_INT_MIN = -(2**63)
+_INT_MAX = 2**64 - 1
+
+
+def _needs_stdlib(data):
+    """
+    Whether `data` holds a number orjson does not encode like the stdlib: NaN,
+    Infinity, a float spelled in exponent notation below 1e-4 or an int
+    outside 64 bits. At any depth, dict keys included.
+    """
+    stack = [(data,)]
+    while stack:
+        values = stack.pop()
+        if isinstance(values, dict):
+            # keys too, OPT_NON_STR_KEYS encodes number keys the same way
+            stack.append(values.keys())
+            values = values.values()
+        for value in values:
+            kind = type(value)
+            if kind in _LEAVES:
+                continue
+            if kind is int:
+                if not _INT_MIN <= value <= _INT_MAX:
+                    return True
+            elif kind is float or isinstance(value, float):
+                size = abs(value)
+                if size != size or size == math.inf or 0 < size < 1e-4:
+                    return True
+            elif isinstance(value, (dict, list, tuple)):
+                stack.append(value)
+    return False
+
+
+class StdlibBackend:
+    name = "stdlib"
+
+    def __init__(self):
+        self.renderer = JSONRenderer()
+
+    def dumps(self, data):
+        return JSONRenderer.render(self.renderer, data)
+
+
+class OrjsonBackend:
+    name = "orjson"
+
+    def __init__(self):
+        if orjson is None:
+            raise ImproperlyConfigured(
+                "JSON_ENCODER_BACKEND is 'orjson' but orjson is not installed."
+            )
+        # everything orjson does not encode exactly like DRF is handed back to DRF
+        self.encoder_default = JSONEncoder().default
+        self.options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        self.fallback = StdlibBackend()
+
+    def default(self, obj):
+        encoded = self.encoder_default(obj)
+        if _needs_stdlib(encoded):
+            # encoded in place, the value may be an iterator already consumed
+            return orjson.Fragment(self.fallback.dumps(encoded))
+        return encoded
+
+    def dumps(self, data):
+        if _needs_stdlib(data):
+            return self.fallback.dumps(data)
+        try:
+            encoded = orjson.dumps(data, default=self.default, option=self.options)
+        except TypeError as error:
+            if error.__cause__ is not None:
+                # raised by default(), the stdlib encoder would raise it too
+                raise error.__cause__
+            return self.fallback.dumps(data)
+        # same as JSONRenderer, these are valid json but not valid javascript
+        return encoded.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+            b"\xe2\x80\xa9", b"\\u2029"
+        )
+
+
+BACKENDS = {
+    "stdlib": StdlibBackend,
+    "orjson": OrjsonBackend,
+}
+
+_instances = {}
+_lock = threading.Lock()
+
+
+def get_backend(name=None):
+    """
+    The encoder backend configured in settings (or the one called `name`).
+    """
+    name = name or getattr(settings, "JSON_ENCODER_BACKEND", DEFAULT_BACKEND)
+    if name == "auto":
+        name = "orjson" if orjson is not None else "stdlib"
+    if name not in BACKENDS:
+        raise ImproperlyConfigured(f"Unknown JSON_ENCODER_BACKEND {name!r}.")
+
+    backend = _instances.get(name)
+    if backend is None:
+        with _lock:
+            backend = _instances.setdefault(name, BACKENDS[name]())
+    return backend
@@ -0,0 +1,68 @@
+import logging
+
+from django.conf import settings
+
+from core.queries import DEFAULT_N_PLUS_ONE_THRESHOLD, QueryRecorder
+
+logger = logging.getLogger(__name__)
+
+
+class QueryInspectionMiddleware:
+    """
+    Records the SQL queries of every request and checks them against the view's
+    declared query budget.
+
+    Views declare their budget with a class attribute:
+
+        class IssueDetailView(APIView):
+            query_budget = 4
+
+    When enabled (settings.QUERY_INSPECTION_ENABLED) every response gets an
+    `X-Query-Count` header and a `query_report` attribute (see
+    QueryRecorder.report). Requests going over budget or showing an N+1 pattern
+    are logged as warnings.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not getattr(settings, "QUERY_INSPECTION_ENABLED", False):
+            return self.get_response(request)
+
+        threshold = getattr(
+            settings, "QUERY_INSPECTION_N_PLUS_ONE_THRESHOLD", DEFAULT_N_PLUS_ONE_THRESHOLD
+        )
+        with QueryRecorder(n_plus_one_threshold=threshold) as recorder:
+            response = self.get_response(request)
+
+        budget = getattr(request, "_query_budget", None)
+        report = recorder.report(budget)
+
+        response["X-Query-Count"] = str(report["count"])
+        response.query_report = report
+
+        if report["over_budget"]:
+            logger.warning(
+                "%s %s ran %d queries, budget is %d",
+                request.method,
+                request.path,
+                report["count"],
+                budget,
+            )
+        for template, times in report["n_plus_one"]:
+            logger.warning(
+                "Possible N+1 on %s %s: %d x %s",
+                request.method,
+                request.path,
+                times,
+                template,
+            )
+
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # class based views expose the class as `view_class` on the view function
+        view_class = getattr(view_func, "view_class", None)
+        request._query_budget = getattr(view_class, "query_budget", None)
+        return None
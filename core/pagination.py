@@ -0,0 +1,154 @@
+"""
+Keyset (a.k.a. cursor) pagination.
+
+Instead of OFFSET we remember the sort key of the last row of a page and ask the
+database for rows "after" it. With a matching composite index the cost of a page
+stays the same no matter how deep into the list the client is.
+
+The cursor handed to clients is opaque (urlsafe base64 of a small json list), so
+we are free to change what goes inside it later.
+"""
+
+import base64
+import binascii
+import json
+
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(values):
+    raw = json.dumps(list(values), separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor, length):
+    """
+    Decode a cursor produced by encode_cursor back into a list of raw values.
+    Raises a 400 ValidationError if the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, binascii.Error, UnicodeDecodeError):
+        raise ValidationError({"cursor": "Invalid cursor."})
+
+    if not isinstance(values, list) or len(values) != length:
+        raise ValidationError({"cursor": "Invalid cursor."})
+
+    return values
+
+
+def get_page_size(request, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    raw = request.query_params.get("limit")
+    if raw in (None, ""):
+        return default
+
+    try:
+        size = int(raw)
+    except ValueError:
+        raise ValidationError({"limit": "limit must be an integer."})
+
+    if size < 1:
+        raise ValidationError({"limit": "limit must be at least 1."})
+
+    return min(size, maximum)
+
+
+class KeysetPage:
+    def __init__(self, items, next_cursor):
+        self.items = items
+        self.next_cursor = next_cursor
+
+    def payload(self, results):
+        """
+        The response body for this page, `results` being the serialized items.
+        """
+        return {"results": results, "next": self.next_cursor}
+
+
+class KeysetPaginator:
+    """
+    Paginates a queryset over a composite sort key, `("created_at", "id")` by default.
+
+    The last key must be unique (the primary key) so that rows sharing the same
+    timestamp are never skipped or repeated between pages.
+
+    Usage:
+        page = KeysetPaginator().paginate(queryset, request)
+        return Response(page.payload(Serializer(page.items, many=True).data))
+    """
+
+    cursor_query_param = "cursor"
+
+    def __init__(self, keys=("created_at", "id"), descending=True, page_size=None):
+        self.keys = tuple(keys)
+        self.descending = descending
+        self.page_size = page_size
+
+    def get_ordering(self):
+        prefix = "-" if self.descending else ""
+        return [f"{prefix}{key}" for key in self.keys]
+
+    def get_key(self, item):
+        # works for both model instances and values() dicts
+        if isinstance(item, dict):
+            return [item[key] for key in self.keys]
+        return [getattr(item, key) for key in self.keys]
+
+    def parse_cursor(self, model, cursor):
+        raw_values = decode_cursor(cursor, len(self.keys))
+        values = []
+        for key, raw in zip(self.keys, raw_values):
+            field = model._meta.get_field(key)
+            try:
+                value = field.to_python(raw)
+            except Exception:
+                raise ValidationError({"cursor": "Invalid cursor."})
+            if value is None:
+                raise ValidationError({"cursor": "Invalid cursor."})
+            values.append(value)
+        return values
+
+    def seek_filter(self, values, index=0):
+        """
+        Build the "rows after this key" filter.
+
+        For keys (a, b) descending this is `a <= x AND (a < x OR b < y)`. The
+        leading range on the first key lets the database do an index range
+        scan, the rest only breaks ties.
+        """
+        key, value = self.keys[index], values[index]
+        op = "lt" if self.descending else "gt"
+
+        if index == len(self.keys) - 1:
+            return Q(**{f"{key}__{op}": value})
+
+        return Q(**{f"{key}__{op}e": value}) & (
+            Q(**{f"{key}__{op}": value}) | self.seek_filter(values, index + 1)
+        )
+
+    def paginate(self, queryset, request=None):
+        """
+        The page of `queryset` asked for by the request's cursor and limit.
+        Without a request, the first page of `page_size` items.
+        """
+        size = self.page_size or get_page_size(request)
+
+        cursor = request and request.query_params.get(self.cursor_query_param)
+        if cursor:
+            queryset = queryset.filter(
+                self.seek_filter(self.parse_cursor(queryset.model, cursor))
+            )
+
+        items = list(queryset.order_by(*self.get_ordering())[: size + 1])
+
+        next_cursor = None
+        if len(items) > size:
+            items = items[:size]
+            next_cursor = encode_cursor(self.get_key(items[-1]))
+
+        return KeysetPage(items, next_cursor)
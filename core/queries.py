@@ -0,0 +1,118 @@
+"""
+SQL query instrumentation.
+
+QueryRecorder records every query run on the database connections while it is
+active, groups them by SQL template (the statement with literals stripped) and
+flags templates repeated often enough to look like an N+1 pattern.
+
+It is used by core.middleware.QueryInspectionMiddleware for per request reports
+and can be used directly in tests:
+
+    with QueryRecorder() as recorder:
+        client.get("/issues/feed/")
+    assert recorder.count <= 3
+    assert not recorder.n_plus_one()
+"""
+
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.db import connections
+
+DEFAULT_N_PLUS_ONE_THRESHOLD = 3
+
+_IN_LIST = re.compile(r"\bIN \((?:%s|\?)(?:, ?(?:%s|\?))*\)", re.IGNORECASE)
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_SPACES = re.compile(r"\s+")
+
+
+def sql_template(sql):
+    """
+    Reduce a statement to its template so the same query with different
+    parameters (or a different IN list length) groups together.
+    """
+    sql = _STRING.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _IN_LIST.sub("IN (...)", sql)
+    return _SPACES.sub(" ", sql).strip()
+
+
+class RecordedQuery:
+    def __init__(self, sql, duration, alias):
+        self.sql = sql
+        self.template = sql_template(sql)
+        self.duration = duration
+        self.alias = alias
+
+
+class QueryRecorder:
+    """
+    Context manager recording the queries executed on every database connection.
+    Uses connection.execute_wrapper so it also works with DEBUG off.
+    """
+
+    def __init__(self, n_plus_one_threshold=DEFAULT_N_PLUS_ONE_THRESHOLD):
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.queries = []
+        self._stack = None
+
+    def __enter__(self):
+        self._stack = ExitStack()
+        for connection in connections.all():
+            self._stack.enter_context(
+                connection.execute_wrapper(self._wrapper(connection.alias))
+            )
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stack.close()
+        self._stack = None
+
+    def _wrapper(self, alias):
+        def record(execute, sql, params, many, context):
+            start = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                self.queries.append(
+                    RecordedQuery(sql, time.perf_counter() - start, alias)
+                )
+
+        return record
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    @property
+    def duration(self):
+        return sum(query.duration for query in self.queries)
+
+    def grouped(self):
+        """
+        List of (template, times executed), most repeated first.
+        """
+        return Counter(query.template for query in self.queries).most_common()
+
+    def n_plus_one(self):
+        """
+        SELECT templates executed at least `n_plus_one_threshold` times.
+        """
+        return [
+            (template, times)
+            for template, times in self.grouped()
+            if times >= self.n_plus_one_threshold
+            and template.upper().startswith("SELECT")
+        ]
+
+    def report(self, budget=None):
+        return {
+            "count": self.count,
+            "duration_ms": round(self.duration * 1000, 3),
+            "budget": budget,
+            "over_budget": budget is not None and self.count > budget,
+            "n_plus_one": self.n_plus_one(),
+        }
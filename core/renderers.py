@@ -1,4 +1,10 @@
+from django.http import StreamingHttpResponse
 from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from core.json_backends import get_backend
+
+DEFAULT_STREAM_CHUNK_SIZE = 500
 
 
 class GlobalResponseRenderer(JSONRenderer):
@@ -17,7 +23,7 @@ class GlobalResponseRenderer(JSONRenderer):
             and "success" in data
             and ("response" in data or "error" in data)
         ):
-            return super().render(data, accepted_media_type, renderer_context)
+            return self.encode(data, accepted_media_type, renderer_context)
 
         # check if there was success i.e status code is in 2xx range
         if success:
@@ -44,4 +50,68 @@ class GlobalResponseRenderer(JSONRenderer):
                 "error": {"message": message, "details": details},
             }
 
-        return super().render(wrapped_data, accepted_media_type, renderer_context)
+        return self.encode(wrapped_data, accepted_media_type, renderer_context)
+
+    def encode(self, data, accepted_media_type=None, renderer_context=None):
+        """
+        JSON-encode `data` with the configured encoder backend (core/json_backends.py).
+        """
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            # pretty printing is left to DRF
+            return super().render(data, accepted_media_type, renderer_context)
+        return get_backend().dumps(data)
+
+
+def stream_envelope(items, serialize, chunk_size=DEFAULT_STREAM_CHUNK_SIZE, **extra):
+    """
+    Yield the same bytes GlobalResponseRenderer would produce for
+    `{"results": serialize(items), **extra}`, a chunk of items at a time.
+
+    `items` is any iterable (typically `queryset.iterator(chunk_size)`) and
+    `serialize(chunk)` turns a list of items into a list of plain data, e.g.
+    `lambda chunk: IssueListSerializer(chunk, many=True).data`. Only one chunk of
+    objects and one chunk of encoded json are alive at any time.
+    """
+    renderer = GlobalResponseRenderer()
+    context = {"response": Response(status=200)}
+
+    # render the envelope once with no results and cut it open where they go,
+    # so the envelope bytes always match the non streaming renderer
+    empty = renderer.render({"results": [], **extra}, renderer_context=context)
+    split = empty.index(b'"results":[]') + len(b'"results":[')
+    prefix, suffix = empty[:split], empty[split:]
+
+    yield prefix
+
+    first = True
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= chunk_size:
+            yield _encode_chunk(renderer, serialize(chunk), first)
+            first = False
+            chunk = []
+    if chunk:
+        yield _encode_chunk(renderer, serialize(chunk), first)
+
+    yield suffix
+
+
+def _encode_chunk(renderer, data, first):
+    # "[a,b]" -> "a,b" (or ",a,b" after the first chunk)
+    encoded = renderer.encode(list(data))[1:-1]
+    return encoded if first else b"," + encoded
+
+
+class StreamingEnvelopeResponse(StreamingHttpResponse):
+    """
+    A {success, response: {results, ...}, error} json response streamed from an
+    iterable, see stream_envelope. Returned by views instead of a DRF Response
+    when the result list is too large to build in memory.
+    """
+
+    def __init__(self, items, serialize, chunk_size=DEFAULT_STREAM_CHUNK_SIZE, **extra):
+        super().__init__(
+            stream_envelope(items, serialize, chunk_size=chunk_size, **extra),
+            content_type="application/json",
+        )
@@ -0,0 +1,130 @@
+"""
+Streaming, bounded upload handling for image uploads.
+
+Django's default upload handlers keep small files in memory and only then check
+anything. StreamingImageUploadHandler instead:
+
+- rejects a request up front if its Content-Length is over the request limit
+- streams every file straight to a temporary file, chunk by chunk
+- enforces the per-file and per-request byte limits while streaming
+- sniffs the first bytes of every file and aborts on non-image payloads
+- hashes the content incrementally (`uploaded_file.content_hash`, sha256 hex)
+
+so the memory of a worker stays flat whatever is being uploaded.
+
+Views opt in with StreamingUploadMixin.
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+
+DEFAULT_MAX_FILE_SIZE = 15 * 1024 * 1024
+DEFAULT_MAX_REQUEST_SIZE = 100 * 1024 * 1024
+
+# bytes needed to recognise every format below
+SNIFF_LENGTH = 12
+
+
+def _is_image(head):
+    return (
+        head.startswith(b"\xff\xd8\xff")  # jpeg
+        or head.startswith(b"\x89PNG\r\n\x1a\n")  # png
+        or head[:6] in (b"GIF87a", b"GIF89a")  # gif
+        or (head[:4] == b"RIFF" and head[8:12] == b"WEBP")  # webp
+    )
+
+
+def _megabytes(size):
+    return f"{size / (1024 * 1024):g}MB"
+
+
+class PayloadTooLarge(APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = "Upload is too large."
+    default_code = "payload_too_large"
+
+
+class StreamingImageUploadHandler(TemporaryFileUploadHandler):
+    def __init__(self, request=None, max_file_size=None, max_request_size=None):
+        super().__init__(request)
+        self.max_file_size = max_file_size or getattr(
+            settings, "UPLOAD_MAX_FILE_SIZE", DEFAULT_MAX_FILE_SIZE
+        )
+        self.max_request_size = max_request_size or getattr(
+            settings, "UPLOAD_MAX_REQUEST_SIZE", DEFAULT_MAX_REQUEST_SIZE
+        )
+        self.request_size = 0
+
+    def handle_raw_input(
+        self, input_data, META, content_length, boundary, encoding=None
+    ):
+        if content_length and content_length > self.max_request_size:
+            raise PayloadTooLarge(
+                f"Upload is larger than {_megabytes(self.max_request_size)}."
+            )
+        return None
+
+    def new_file(self, field_name, file_name, *args, **kwargs):
+        super().new_file(field_name, file_name, *args, **kwargs)
+        self.file_size = 0
+        self.head = b""
+        self.hasher = hashlib.sha256()
+
+    def _check_head(self):
+        if not _is_image(self.head):
+            raise ValidationError({self.field_name: ["Only image files are allowed."]})
+
+    def receive_data_chunk(self, raw_data, start):
+        self.file_size += len(raw_data)
+        self.request_size += len(raw_data)
+
+        if self.file_size > self.max_file_size:
+            raise PayloadTooLarge(
+                f"{self.file_name} is larger than {_megabytes(self.max_file_size)}."
+            )
+        if self.request_size > self.max_request_size:
+            raise PayloadTooLarge(
+                f"Upload is larger than {_megabytes(self.max_request_size)}."
+            )
+
+        if len(self.head) < SNIFF_LENGTH:
+            self.head += raw_data[: SNIFF_LENGTH - len(self.head)]
+            if len(self.head) == SNIFF_LENGTH:
+                self._check_head()
+
+        self.hasher.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        if len(self.head) < SNIFF_LENGTH:
+            self._check_head()
+
+        uploaded = super().file_complete(file_size)
+        uploaded.content_hash = self.hasher.hexdigest()
+        return uploaded
+
+
+class StreamingUploadMixin:
+    """
+    APIView mixin installing StreamingImageUploadHandler for the view's requests.
+
+    The limits default to settings.UPLOAD_MAX_FILE_SIZE / UPLOAD_MAX_REQUEST_SIZE
+    and can be tightened per view.
+    """
+
+    upload_max_file_size = None
+    upload_max_request_size = None
+
+    def initialize_request(self, request, *args, **kwargs):
+        request.upload_handlers = [
+            StreamingImageUploadHandler(
+                request,
+                max_file_size=self.upload_max_file_size,
+                max_request_size=self.upload_max_request_size,
+            )
+        ]
+        return super().initialize_request(request, *args, **kwargs)
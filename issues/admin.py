@@ -1,15 +1,28 @@
 
 from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Lower
+from django.db.models.lookups import GreaterThanOrEqual, LessThan
 from django.utils.html import format_html
 from unfold.admin import ModelAdmin, TabularInline
 from unfold.decorators import display
 from .models import Issue, IssueComment, IssueImage, IssueLike
+from .cache import invalidate_issue
+from .search import build_match_query, matching_ids_sql
 
 """
 We are using django-unfold for a better admin interface.
 Refer: https://django-unfold.readthedocs.io/en/latest/
 """
 
+def _prefix_of(field, prefix):
+    # lower(field) LIKE 'prefix%' as a range, which an index on lower(field) serves
+    value = Lower(field)
+    return Q(GreaterThanOrEqual(value, prefix)) & Q(LessThan(value, prefix + "\U0010ffff"))
+
+
 class IssueImageInline(TabularInline):
     model = IssueImage
     extra = 1
@@ -62,6 +75,10 @@ class IssueAdmin(ModelAdmin):
         (None, {
             "fields": ("title", "description", "category", "is_resolved")
         }),
+        ("Location", {
+            "fields": ("address", "latitude", "longitude"),
+            "classes": ["collapse"]
+        }),
         ("Reporter Info", {
             "fields": ("reported_by",),
             "classes": ["collapse"]
@@ -72,6 +89,41 @@ class IssueAdmin(ModelAdmin):
         }),
     )
 
+    # admin edits (including inlines) change the issue payload served by the API
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        invalidate_issue(form.instance.id)
+
+    def delete_model(self, request, obj):
+        issue_id = obj.id
+        super().delete_model(request, obj)
+        invalidate_issue(issue_id)
+
+    def delete_queryset(self, request, queryset):
+        issue_ids = list(queryset.values_list("id", flat=True))
+        super().delete_queryset(request, queryset)
+        for issue_id in issue_ids:
+            invalidate_issue(issue_id)
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Search through the FTS index instead of LIKE scans over the issue table.
+        The reporter is matched on a case-insensitive prefix of their email or
+        first name, as range scans of the lower() indexes of the User model.
+        """
+        match = build_match_query(search_term)
+        if match is None:
+            return queryset, False
+
+        prefix = search_term.strip().lower()
+        reporters = get_user_model()._default_manager.filter(
+            _prefix_of("email", prefix) | _prefix_of("first_name", prefix)
+        )
+
+        matches = Q(id__in=RawSQL(matching_ids_sql(), (match,)))
+        matches |= Q(reported_by__in=reporters.values("id"))
+        return queryset.filter(matches), False
+
     def get_change_form_template(self, request, obj=None, **kwargs):
         """
         Override the change form template to show the custom details page
@@ -81,17 +133,18 @@ class IssueAdmin(ModelAdmin):
             return "admin/issues/issue/change_form.html"
         return super().get_change_form_template(request, obj, **kwargs)
 
+    # counters are denormalized on the issue row, no per-row COUNT queries needed
     @display(description="Images")
     def image_count(self, obj):
-        return obj.images.count()
+        return obj.images_count
 
     @display(description="Comments")
     def comment_count(self, obj):
-        return obj.comments.count()
+        return obj.comments_count
 
     @display(description="Likes")
     def like_count(self, obj):
-        return obj.likes.count()
+        return obj.likes_count
 
 @admin.register(IssueComment)
 class IssueCommentAdmin(ModelAdmin):
@@ -1,5 +1,20 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+def _ensure_search_index(sender, using, **kwargs):
+    from django.db import connections
+
+    from .search import install_search_index
+
+    install_search_index(connections[using])
 
 
 class IssuesConfig(AppConfig):
     name = 'issues'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+
+        # keep the FTS triggers in place even after migrations that rebuild the table
+        post_migrate.connect(_ensure_search_index, sender=self)
@@ -0,0 +1,96 @@
+"""
+Versioned cache of serialized issue payloads.
+
+Every issue has a version number in the cache and payloads are stored under a key
+that contains it:
+
+    issue:<id>:version          -> 1718000000000000001
+    issue:<id>:v<version>:detail -> serialized IssueDetailSerializer data
+
+Writes never delete payloads, they bump the version (see invalidate_issue) so
+readers simply stop looking at the old key and it expires on its own.
+A reader that fetched the version before a write and the data during it can only
+store its stale payload under the old version, which nobody reads anymore.
+
+The backend is whatever cache alias settings.ISSUE_CACHE_ALIAS points to, it
+has to be shared by all the workers (file based, the database cache table...,
+see CACHES in settings): a bump made by one worker must retire the payloads of
+every other. Pointed at a per-process locmem cache the detail payloads are not
+cached at all. Versions are bumped by setting a new clock value rather than
+incr(), which is a non-atomic get + set on those backends.
+"""
+
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+
+DEFAULT_DETAIL_TIMEOUT = 300
+
+
+def _cache():
+    return caches[getattr(settings, "ISSUE_CACHE_ALIAS", "default")]
+
+
+def _version_key(issue_id):
+    return f"issue:{issue_id}:version"
+
+
+def _detail_key(issue_id, version):
+    return f"issue:{issue_id}:v{version}:detail"
+
+
+def _initial_version():
+    # start from the clock instead of 1, so an evicted version key can never
+    # bring an old payload back to life
+    return time.time_ns()
+
+
+def get_version(issue_id):
+    cache = _cache()
+    key = _version_key(issue_id)
+
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _initial_version(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(issue_id):
+    # any fresh value invalidates older payloads, two concurrent bumps can't
+    # both land on the value a reader has seen like two incr() could
+    _cache().set(_version_key(issue_id), _initial_version(), timeout=None)
+
+
+def invalidate_issue(issue_id):
+    """
+    Make cached payloads of an issue stale.
+    Call this from every write path that changes what the issue payload shows.
+
+    The version is bumped right away and again once the transaction commits: a
+    reader slipping in between the two can only cache uncommitted-state data
+    under the intermediate version, which the second bump retires.
+    """
+    bump_version(issue_id)
+    transaction.on_commit(lambda: bump_version(issue_id))
+
+
+def _shared():
+    # a locmem cache is per process, other workers would never see the bumps
+    return not isinstance(_cache(), LocMemCache)
+
+
+def get_detail(issue_id, version):
+    if not _shared():
+        return None
+    return _cache().get(_detail_key(issue_id, version))
+
+
+def set_detail(issue_id, version, payload):
+    if not _shared():
+        return
+    timeout = getattr(settings, "ISSUE_DETAIL_CACHE_TIMEOUT", DEFAULT_DETAIL_TIMEOUT)
+    _cache().set(_detail_key(issue_id, version), payload, timeout=timeout)
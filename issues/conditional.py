@@ -0,0 +1,111 @@
+"""
+Conditional GET (ETag / Last-Modified) for the issue read endpoints.
+
+Validators are computed from one small query on the issue row, never from the
+response body:
+
+- `updated_at`, which every write path touching the issue or its likes and
+  comments moves forward (see issues/counters.py)
+- the likes/comments/images counters
+- the highest like and comment ids, the high-water marks of the child tables
+
+Like intents still in the write-behind buffer (issues/like_buffer.py) are part
+of the validators too.
+
+When the client already has the current representation it gets a bare 304 and
+the view, its serializers and GlobalResponseRenderer never run.
+"""
+
+import hashlib
+from functools import wraps
+
+from django.db.models import OuterRef, Subquery
+from django.http import Http404
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+from .likes import pending_for_issue
+from .models import Issue, IssueComment, IssueLike
+
+
+def _last_id(model):
+    return Subquery(
+        model.objects.filter(issue_id=OuterRef("pk")).order_by("-id").values("id")[:1]
+    )
+
+
+def issue_validators(issue_id, scope, viewer_id=None):
+    """
+    (etag, last_modified timestamp) of an issue resource, None if the issue does not exist.
+    `scope` tells apart the different resources (detail, comments, likes) of one issue,
+    `viewer_id` the user asking, responses differ per user (viewer_has_liked).
+    """
+    row = (
+        Issue.objects.filter(id=issue_id)
+        .annotate(last_like_id=_last_id(IssueLike), last_comment_id=_last_id(IssueComment))
+        .values_list(
+            "updated_at",
+            "likes_count",
+            "comments_count",
+            "images_count",
+            "last_like_id",
+            "last_comment_id",
+        )
+        .first()
+    )
+    if row is None:
+        return None
+
+    last_modified = row[0]
+    raw = ":".join([scope, str(issue_id), str(viewer_id), *(str(value) for value in row)])
+
+    pending = pending_for_issue(int(issue_id))
+    if pending:
+        raw += ":" + repr(sorted((user_id, liked) for user_id, (liked, _) in pending.items()))
+        last_modified = max(last_modified, *(at for _, at in pending.values()))
+
+    etag = quote_etag(hashlib.sha1(raw.encode()).hexdigest())
+    return etag, int(last_modified.timestamp())
+
+
+def _set_validator_headers(response, etag, last_modified):
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    # the body depends on who is asking
+    patch_vary_headers(response, ("Authorization", "Cookie"))
+
+
+def conditional_issue_get(scope, lookup="id", must_exist=False):
+    """
+    Decorator for the `get` method of an issue read view.
+
+    `lookup` is the name of the url kwarg holding the issue id. With `must_exist`
+    a missing issue is a 404 right away, the view does not run.
+    Answers If-None-Match / If-Modified-Since with a 304 before the view runs and
+    adds ETag / Last-Modified headers to regular 200 responses.
+    """
+
+    def decorator(get):
+        @wraps(get)
+        def wrapper(self, request, *args, **kwargs):
+            validators = issue_validators(kwargs[lookup], scope, request.user.id)
+            if validators is None and must_exist:
+                raise Http404(f"No {Issue._meta.object_name} matches the given query.")
+
+            if validators is not None:
+                not_modified = get_conditional_response(
+                    request, etag=validators[0], last_modified=validators[1]
+                )
+                if not_modified is not None:
+                    _set_validator_headers(not_modified, *validators)
+                    return not_modified
+
+            response = get(self, request, *args, **kwargs)
+
+            if validators is not None and response.status_code == 200:
+                _set_validator_headers(response, *validators)
+            return response
+
+        return wrapper
+
+    return decorator
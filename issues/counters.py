@@ -0,0 +1,51 @@
+"""
+Helpers for the denormalized counters on Issue (likes_count, comments_count, images_count).
+
+Counters are always changed with an F() expression so concurrent writers never
+overwrite each other, and callers are expected to run them in the same
+transaction as the row insert/delete they account for.
+
+Changing a counter also moves `Issue.updated_at` forward, which makes it the
+last-activity timestamp the conditional GET validators rely on.
+"""
+
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from .models import Issue, IssueComment, IssueImage, IssueLike
+
+# counter field on Issue -> child model it counts
+COUNTED_MODELS = {
+    "likes_count": IssueLike,
+    "comments_count": IssueComment,
+    "images_count": IssueImage,
+}
+
+
+def adjust_counter(issue_id, field, delta):
+    """
+    Add `delta` (can be negative) to a counter of an issue.
+    Never lets the counter go below zero. Returns the number of updated rows.
+    """
+    if delta == 0:
+        return 0
+
+    return Issue.objects.filter(id=issue_id).update(
+        updated_at=timezone.now(), **{field: Greatest(F(field) + delta, 0)}
+    )
+
+
+def actual_count(field):
+    """
+    Subquery expression computing the real value of a counter from the child table.
+    """
+    model = COUNTED_MODELS[field]
+    counts = (
+        model.objects.filter(issue_id=OuterRef("pk"))
+        .order_by()
+        .values("issue_id")
+        .annotate(total=Count("*"))
+        .values("total")
+    )
+    return Coalesce(Subquery(counts), 0)
@@ -0,0 +1,163 @@
+"""
+Resized derivatives (thumbnails, medium size, WebP) of issue images.
+
+Derivatives are generated after the issue is committed, by a small bounded
+thread pool outside of the request path. They are stored next to the original
+(content addressed, see issues/storage.py) so every row sharing a blob shares them:
+
+    issue_images/cas/ab/<hash>.jpg
+    issue_images/cas/ab/<hash>_thumb.jpg
+    issue_images/cas/ab/<hash>_thumb.webp
+    ...
+
+and recorded on `IssueImage.variants` as {variant name: storage path}. Until a
+variant exists the API serves the original in its place.
+"""
+
+import io
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connections, transaction
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from . import cache as issue_cache
+from .models import Issue, IssueImage
+
+logger = logging.getLogger(__name__)
+
+# variant size name -> bounding box, the aspect ratio is kept
+SIZES = {
+    "thumb": (320, 320),
+    "medium": (1024, 1024),
+}
+
+# every size is produced in the original family (jpeg, or png with transparency) and as webp
+VARIANT_NAMES = [name for size in SIZES for name in (size, f"{size}_webp")]
+
+DEFAULT_WORKERS = 2
+DEFAULT_MAX_PENDING = 100
+
+_executor = None
+_pending = None
+_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor, _pending
+    with _lock:
+        if _executor is None:
+            workers = getattr(settings, "ISSUE_IMAGE_VARIANT_WORKERS", DEFAULT_WORKERS)
+            max_pending = getattr(
+                settings, "ISSUE_IMAGE_VARIANT_MAX_PENDING", DEFAULT_MAX_PENDING
+            )
+            _executor = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="issue-image-variants"
+            )
+            _pending = threading.BoundedSemaphore(max_pending)
+        return _executor, _pending
+
+
+def _encode(image, image_format):
+    buffer = io.BytesIO()
+    if image_format == "JPEG":
+        image.convert("RGB").save(buffer, "JPEG", quality=82, optimize=True)
+    elif image_format == "PNG":
+        image.save(buffer, "PNG", optimize=True)
+    else:
+        image.save(buffer, "WEBP", quality=80, method=4)
+    return buffer.getvalue()
+
+
+def generate_variants(image_id):
+    """
+    Build and store every variant of one IssueImage. Safe to call again, existing
+    files are simply replaced by fresh ones.
+    """
+    issue_image = IssueImage.objects.filter(id=image_id).first()
+    if issue_image is None or not issue_image.image:
+        return None
+
+    # the same bytes were uploaded before, their variants are already there
+    if issue_image.content_hash:
+        existing = (
+            IssueImage.objects.filter(content_hash=issue_image.content_hash)
+            .exclude(id=image_id)
+            .exclude(variants={})
+            .values_list("variants", flat=True)
+            .first()
+        )
+        if existing and all(name in existing for name in VARIANT_NAMES):
+            _store_variants(issue_image, existing)
+            return existing
+
+    storage = issue_image.image.storage
+    stem = os.path.splitext(issue_image.image.name)[0]
+
+    with issue_image.image.open("rb") as original:
+        with Image.open(original) as source:
+            source = ImageOps.exif_transpose(source)
+            has_alpha = source.mode in ("RGBA", "LA", "P")
+            base_format, base_ext = ("PNG", "png") if has_alpha else ("JPEG", "jpg")
+
+            variants = {}
+            for size, box in SIZES.items():
+                resized = source.copy()
+                resized.thumbnail(box, Image.Resampling.LANCZOS)
+
+                for name, image_format, ext in (
+                    (size, base_format, base_ext),
+                    (f"{size}_webp", "WEBP", "webp"),
+                ):
+                    path = f"{stem}_{size}.{ext}"
+                    if storage.exists(path):
+                        storage.delete(path)
+                    variants[name] = storage.save(
+                        path, ContentFile(_encode(resized, image_format))
+                    )
+
+    _store_variants(issue_image, variants)
+    return variants
+
+
+def _store_variants(issue_image, variants):
+    IssueImage.objects.filter(id=issue_image.id).update(variants=variants)
+
+    # the issue payload now points at the variants
+    Issue.objects.filter(id=issue_image.issue_id).update(updated_at=timezone.now())
+    issue_cache.bump_version(issue_image.issue_id)
+
+
+def _run(image_id, pending):
+    try:
+        generate_variants(image_id)
+    except Exception:
+        logger.exception("Could not generate variants of issue image %s", image_id)
+    finally:
+        pending.release()
+        connections.close_all()
+
+
+def _submit(image_ids):
+    executor, pending = _get_executor()
+    for image_id in image_ids:
+        # never let the queue grow unbounded, the originals keep being served and
+        # `manage.py generate_issue_image_variants` can catch up later
+        if not pending.acquire(blocking=False):
+            logger.warning("Variant queue is full, skipping issue image %s", image_id)
+            continue
+        executor.submit(_run, image_id, pending)
+
+
+def schedule_variants(image_ids):
+    """
+    Queue variant generation of the given images once the current transaction commits.
+    """
+    image_ids = list(image_ids)
+    if image_ids:
+        transaction.on_commit(lambda: _submit(image_ids))
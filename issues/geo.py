@@ -0,0 +1,87 @@
+"""
+Grid based spatial index for "issues near me" that works on plain SQLite.
+
+The globe is cut into CELL_DEGREES x CELL_DEGREES cells and every issue stores
+the number of the cell it falls in (`Issue.geo_cell`, indexed). Cells are
+numbered row by row, so the cells of one row that cover a search box form a
+contiguous range. A radius search is therefore a handful of index range scans
+(one per row, usually 3) followed by an exact haversine check on the few
+candidates that come back.
+"""
+
+import math
+
+EARTH_RADIUS_M = 6_371_008.8
+
+# ~555m of latitude per cell, close to the default search radius
+CELL_DEGREES = 0.005
+ROWS = math.ceil(180 / CELL_DEGREES)
+COLUMNS = math.ceil(360 / CELL_DEGREES)
+
+
+def _row(lat):
+    return min(int(math.floor((lat + 90) / CELL_DEGREES)), ROWS - 1)
+
+
+def _column(lon):
+    return min(int(math.floor((lon + 180) / CELL_DEGREES)), COLUMNS - 1)
+
+
+def cell_for(lat, lon):
+    """
+    Number of the grid cell containing the point, None if a coordinate is missing.
+    """
+    if lat is None or lon is None:
+        return None
+    return _row(lat) * COLUMNS + _column(lon)
+
+
+def distance_m(lat1, lon1, lat2, lon2):
+    """
+    Great circle (haversine) distance between two points in meters.
+    """
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+
+    a = (
+        math.sin(d_phi / 2) ** 2
+        + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(min(1.0, a)))
+
+
+def cell_ranges(lat, lon, radius_m):
+    """
+    List of inclusive (first_cell, last_cell) ranges covering every point within
+    `radius_m` of (lat, lon). May cover more than the circle, never less.
+    """
+    d_lat = math.degrees(radius_m / EARTH_RADIUS_M)
+    min_lat, max_lat = max(lat - d_lat, -90.0), min(lat + d_lat, 90.0)
+
+    # the longitude span of the box grows towards the poles
+    widest_lat = max(abs(min_lat), abs(max_lat))
+    cos_lat = math.cos(math.radians(widest_lat))
+    if cos_lat < 1e-9:
+        d_lon = 180.0
+    else:
+        d_lon = min(math.degrees(radius_m / (EARTH_RADIUS_M * cos_lat)), 180.0)
+
+    if d_lon >= 180.0:
+        column_spans = [(0, COLUMNS - 1)]
+    else:
+        west, east = lon - d_lon, lon + d_lon
+        if west < -180.0:
+            # the box crosses the antimeridian, split it in two
+            column_spans = [(_column(west + 360), COLUMNS - 1), (0, _column(east))]
+        elif east >= 180.0:
+            column_spans = [(_column(west), COLUMNS - 1), (0, _column(east - 360))]
+        else:
+            column_spans = [(_column(west), _column(east))]
+
+    ranges = []
+    for row in range(_row(min_lat), _row(max_lat) + 1):
+        base = row * COLUMNS
+        for first, last in column_spans:
+            ranges.append((base + first, base + last))
+    return ranges
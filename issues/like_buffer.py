@@ -0,0 +1,371 @@
+"""
+Write-behind buffering of like/unlike intents, for viral spikes.
+
+With settings.ISSUE_LIKE_WRITE_BEHIND on, the like endpoints do not write to
+IssueLike. They record the intent ("user U now likes / no longer likes issue I")
+and answer right away:
+
+- the intent is appended to a local append-only log and fsynced, so an
+  acknowledged like survives a crash
+- it replaces any earlier intent of the same (issue, user) in memory, so a user
+  tapping ten times in a second costs at most one row change
+- a background thread flushes the coalesced intents every
+  ISSUE_LIKE_FLUSH_INTERVAL seconds: one bulk_create, a few bulk deletes, one
+  counter recomputation per touched issue, all in a single transaction
+
+Intents are absolute states, not toggles, so replaying a log twice is harmless.
+
+Every process writes its own log (`likes-<pid>.log`) in ISSUE_LIKE_BUFFER_DIR
+and holds an flock on it. A process starting up adopts the logs nobody holds a
+lock on anymore, i.e. those left behind by a crashed or stopped worker.
+
+Reads merge the intents still pending in this process with the database (see
+`pending_for_issue`); intents buffered by other worker processes become visible
+once flushed, at most a flush interval later.
+"""
+
+import atexit
+import glob
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timezone as dt_timezone
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import cache as issue_cache
+from .counters import actual_count
+from .models import Issue, IssueLike
+
+try:
+    import fcntl
+except ImportError:  # windows: no locking, logs are then never adopted by another process
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FLUSH_INTERVAL = 1.0
+
+# rows per DELETE statement when flushing unlikes
+DELETE_BATCH_SIZE = 200
+
+
+def enabled():
+    return getattr(settings, "ISSUE_LIKE_WRITE_BEHIND", False)
+
+
+def _try_lock(file):
+    if fcntl is None:
+        return True
+    try:
+        fcntl.flock(file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        return False
+    return True
+
+
+def _read_intents(file):
+    intents = []
+    for line in file:
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            # a torn last line from a crash in the middle of a write
+            continue
+        intents.append(entry)
+    return intents
+
+
+def write_intents(intents):
+    """
+    Apply {(issue_id, user_id): liked} to the database in one transaction.
+    Intents on issues or users deleted in the meantime are dropped.
+    """
+    issue_ids = {issue_id for issue_id, _ in intents}
+    user_ids = {user_id for _, user_id in intents}
+
+    with transaction.atomic():
+        issue_ids = set(Issue.objects.filter(id__in=issue_ids).values_list("id", flat=True))
+        user_ids = set(
+            get_user_model().objects.filter(id__in=user_ids).values_list("id", flat=True)
+        )
+        keys = [key for key in intents if key[0] in issue_ids and key[1] in user_ids]
+
+        IssueLike.objects.bulk_create(
+            [
+                IssueLike(issue_id=issue_id, liked_by_id=user_id)
+                for issue_id, user_id in keys
+                if intents[(issue_id, user_id)]
+            ],
+            batch_size=500,
+            ignore_conflicts=True,
+        )
+
+        unliked = [key for key in keys if not intents[key]]
+        for start in range(0, len(unliked), DELETE_BATCH_SIZE):
+            batch = unliked[start : start + DELETE_BATCH_SIZE]
+            IssueLike.objects.filter(
+                reduce(or_, (Q(issue_id=i, liked_by_id=u) for i, u in batch))
+            ).delete()
+
+        # recomputed rather than adjusted, the buffered intents say nothing
+        # about what was already in the table
+        Issue.objects.filter(id__in=issue_ids).update(
+            likes_count=actual_count("likes_count"), updated_at=timezone.now()
+        )
+        for issue_id in issue_ids:
+            issue_cache.invalidate_issue(issue_id)
+
+
+class LikeBuffer:
+    def __init__(self, directory, flush_interval=DEFAULT_FLUSH_INTERVAL, fsync=True):
+        self.directory = str(directory)
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        # (issue_id, user_id) -> (liked, time of the intent)
+        self._pending = {}
+        # the batch being written by flush(), still visible to readers until committed
+        self._inflight = {}
+        # bumped after every committed flush, see update()
+        self._epoch = 0
+
+        self._log_path = os.path.join(self.directory, f"likes-{os.getpid()}.log")
+        self._log = None
+        self._stop = threading.Event()
+        self._thread = None
+
+        os.makedirs(self.directory, exist_ok=True)
+        orphans = self._adopt_orphans()
+        self._log = self._open_log()
+        if orphans:
+            for entry in sorted(orphans, key=lambda entry: entry["at"]):
+                self._append(
+                    (entry["issue"], entry["user"]),
+                    entry["liked"],
+                    datetime.fromtimestamp(entry["at"], dt_timezone.utc),
+                )
+            for path, file in self._orphan_files:
+                os.remove(path)
+                file.close()
+        self._orphan_files = []
+
+    # --- log files ---
+
+    def _open_log(self):
+        log = open(self._log_path, "a", encoding="utf-8")
+        if not _try_lock(log):
+            log.close()
+            raise RuntimeError(f"{self._log_path} is locked by another process")
+        return log
+
+    def _adopt_orphans(self):
+        self._orphan_files = []
+        intents = []
+        if fcntl is None:
+            return intents
+        for path in sorted(glob.glob(os.path.join(self.directory, "likes-*"))):
+            try:
+                file = open(path, "r", encoding="utf-8")
+            except FileNotFoundError:
+                # flushed and removed by its owner in the meantime
+                continue
+            if not _try_lock(file):
+                file.close()
+                continue
+            intents.extend(_read_intents(file))
+            if path == self._log_path:
+                # left by a dead process that had our pid, make room for our log
+                os.rename(path, f"{path}.adopted")
+                path = f"{path}.adopted"
+            # kept open, and locked, until the intents are safe in our own log
+            self._orphan_files.append((path, file))
+        return intents
+
+    def _write_line(self, entry):
+        self._log.write(json.dumps(entry) + "\n")
+        self._log.flush()
+        if self.fsync:
+            os.fsync(self._log.fileno())
+
+    def _append(self, key, liked, at):
+        # called with self._lock held (or during __init__)
+        self._write_line(
+            {"issue": key[0], "user": key[1], "liked": liked, "at": at.timestamp()}
+        )
+        self._pending[key] = (liked, at)
+
+    def _rotate(self):
+        """
+        Move the current log aside for the flush in progress and start a new one.
+        The old file stays open, and locked, until the flush is committed.
+        """
+        flushing_path = f"{self._log_path}.{self._epoch}.flushing"
+        os.rename(self._log_path, flushing_path)
+        flushing = self._log
+        self._log = self._open_log()
+        return flushing_path, flushing
+
+    # --- state ---
+
+    def _known(self, key):
+        if key in self._pending:
+            return self._pending[key][0]
+        if key in self._inflight:
+            return self._inflight[key][0]
+        return None
+
+    def update(self, issue_id, user_id, decide, load):
+        """
+        Record a new intent for (issue, user) from its current state.
+
+        `load()` reads the state from the database: True/False, or None when the
+        issue does not exist. `decide(current)` returns the new state, or None to
+        leave it as is. Returns (current, new) with new None when nothing was
+        recorded, or None when `load` said the issue does not exist.
+        """
+        key = (issue_id, user_id)
+        while True:
+            with self._lock:
+                current = self._known(key)
+                if current is not None:
+                    return current, self._decide(key, current, decide)
+                epoch = self._epoch
+
+            # read outside the lock, the flush may be holding the database
+            stored = load()
+            if stored is None:
+                return None
+
+            with self._lock:
+                current = self._known(key)
+                if current is None:
+                    if epoch != self._epoch:
+                        # a flush committed while we were reading, read again
+                        continue
+                    current = stored
+                return current, self._decide(key, current, decide)
+
+    def _decide(self, key, current, decide):
+        new = decide(current)
+        if new is not None:
+            self._append(key, new, timezone.now())
+        self._ensure_flusher()
+        return new
+
+    def pending_for_issue(self, issue_id):
+        """
+        {user_id: (liked, time)} of the intents on an issue not committed yet.
+        """
+        with self._lock:
+            merged = {**self._inflight, **self._pending}
+        return {user_id: state for (i, user_id), state in merged.items() if i == issue_id}
+
+    def pending_for_user(self, user_id):
+        """
+        {issue_id: (liked, time)} of the intents of a user not committed yet.
+        """
+        with self._lock:
+            merged = {**self._inflight, **self._pending}
+        return {issue_id: state for (issue_id, u), state in merged.items() if u == user_id}
+
+    # --- flushing ---
+
+    def flush(self):
+        """
+        Write every pending intent to the database. Returns the number of intents written.
+        """
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending:
+                    return 0
+                batch = self._pending
+                self._pending = {}
+                self._inflight = batch
+                flushing_path, flushing = self._rotate()
+
+            try:
+                write_intents({key: liked for key, (liked, _) in batch.items()})
+            except Exception:
+                with self._lock:
+                    # back into the live log, unless a newer intent replaced it
+                    for key, (liked, at) in batch.items():
+                        if key not in self._pending:
+                            self._append(key, liked, at)
+                    self._inflight = {}
+                raise
+            else:
+                with self._lock:
+                    self._inflight = {}
+                    self._epoch += 1
+            finally:
+                os.remove(flushing_path)
+                flushing.close()
+
+        return len(batch)
+
+    def _ensure_flusher(self):
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="issue-like-flusher", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Could not flush buffered likes")
+            finally:
+                close_old_connections()
+
+    def close(self, flush=True):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        if flush:
+            self.flush()
+        with self._lock:
+            if not self._pending:
+                # nothing left to adopt, removed while still holding the lock
+                os.remove(self._log_path)
+            self._log.close()
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_buffer():
+    global _buffer
+    with _buffer_lock:
+        if _buffer is None:
+            _buffer = LikeBuffer(
+                settings.ISSUE_LIKE_BUFFER_DIR,
+                flush_interval=getattr(
+                    settings, "ISSUE_LIKE_FLUSH_INTERVAL", DEFAULT_FLUSH_INTERVAL
+                ),
+            )
+            atexit.register(shutdown)
+        return _buffer
+
+
+def shutdown(flush=True):
+    """
+    Flush (unless told not to) and close the buffer of this process.
+    """
+    global _buffer
+    with _buffer_lock:
+        if _buffer is not None:
+            _buffer.close(flush=flush)
+            _buffer = None
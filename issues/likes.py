@@ -0,0 +1,214 @@
+"""
+Race-free like writes.
+
+A like toggle used to be exists() + delete()/create(), three queries with a window
+where two concurrent taps both decide to insert and one of them dies on the
+(issue, liked_by) unique constraint. Here every write is a single conditional
+statement and the database decides the outcome:
+
+- like:   INSERT ... SELECT FROM issue ... ON CONFLICT DO NOTHING
+          (inserts only if the issue exists and the like does not)
+- unlike: DELETE ... (its rowcount tells whether there was a like)
+
+followed, in the same transaction, by the counter update (issues/counters.py)
+and the cache invalidation. ON CONFLICT is supported by SQLite and PostgreSQL.
+
+With settings.ISSUE_LIKE_WRITE_BEHIND on, the same functions record intents in
+the write-behind buffer instead (issues/like_buffer.py), and the read helpers at
+the bottom merge what is still buffered with the database.
+"""
+
+from django.db import connection, transaction
+from django.db.models import BooleanField, Exists, OuterRef, Value
+from django.utils import timezone
+
+from . import cache as issue_cache
+from . import like_buffer
+from .counters import adjust_counter
+from .models import Issue, IssueLike
+
+LIKED = "liked"
+UNLIKED = "unliked"
+ALREADY_LIKED = "already_liked"
+NOT_FOUND = "not_found"
+
+
+def _insert_like(issue_id, user_id):
+    """
+    Insert the like unless it exists or the issue does not. Returns True if inserted.
+    """
+    like_table = connection.ops.quote_name(IssueLike._meta.db_table)
+    issue_table = connection.ops.quote_name(Issue._meta.db_table)
+    now = IssueLike._meta.get_field("created_at").get_db_prep_value(
+        timezone.now(), connection
+    )
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {like_table} (issue_id, liked_by_id, created_at, updated_at) "
+            f"SELECT id, %s, %s, %s FROM {issue_table} WHERE id = %s "
+            f"ON CONFLICT (issue_id, liked_by_id) DO NOTHING",
+            [user_id, now, now, issue_id],
+        )
+        return cursor.rowcount == 1
+
+
+def _delete_like(issue_id, user_id):
+    """
+    Delete the like. Returns True if there was one.
+    """
+    deleted, _ = IssueLike.objects.filter(issue_id=issue_id, liked_by_id=user_id).delete()
+    return deleted > 0
+
+
+def _changed(issue_id, delta):
+    adjust_counter(issue_id, "likes_count", delta)
+    issue_cache.invalidate_issue(issue_id)
+
+
+def _stored_state(issue_id, user_id):
+    """
+    Whether the like is in the database, None if the issue does not exist.
+    """
+    return (
+        Issue.objects.filter(id=issue_id)
+        .annotate(
+            liked=Exists(
+                IssueLike.objects.filter(issue_id=OuterRef("pk"), liked_by_id=user_id)
+            )
+        )
+        .values_list("liked", flat=True)
+        .first()
+    )
+
+
+def _buffered(issue_id, user_id, decide):
+    return like_buffer.get_buffer().update(
+        issue_id, user_id, decide, lambda: _stored_state(issue_id, user_id)
+    )
+
+
+def add_like(issue_id, user_id):
+    """
+    Like an issue once. Returns LIKED, ALREADY_LIKED or NOT_FOUND.
+    """
+    if like_buffer.enabled():
+        state = _buffered(issue_id, user_id, lambda liked: None if liked else True)
+        if state is None:
+            return NOT_FOUND
+        return ALREADY_LIKED if state[1] is None else LIKED
+
+    with transaction.atomic():
+        if _insert_like(issue_id, user_id):
+            _changed(issue_id, 1)
+            return LIKED
+
+    # nothing inserted: rare path, find out why
+    if Issue.objects.filter(id=issue_id).exists():
+        return ALREADY_LIKED
+    return NOT_FOUND
+
+
+def toggle_like(issue_id, user_id):
+    """
+    Flip the like of a user on an issue. Returns LIKED, UNLIKED or NOT_FOUND.
+
+    Tries the insert first: when the like already exists (or a concurrent tap just
+    created it) the insert is a no-op and the delete removes it, so two
+    simultaneous taps end up as like + unlike instead of an IntegrityError.
+    """
+    if like_buffer.enabled():
+        state = _buffered(issue_id, user_id, lambda liked: not liked)
+        if state is None:
+            return NOT_FOUND
+        return LIKED if state[1] else UNLIKED
+
+    with transaction.atomic():
+        if _insert_like(issue_id, user_id):
+            _changed(issue_id, 1)
+            return LIKED
+
+        if _delete_like(issue_id, user_id):
+            _changed(issue_id, -1)
+            return UNLIKED
+
+    # neither inserted nor deleted, only possible when the issue is gone
+    return NOT_FOUND
+
+
+def pending_for_issue(issue_id):
+    """
+    {user_id: (liked, time)} of the buffered, not yet written, intents on an issue.
+    Always empty without write-behind.
+    """
+    if not like_buffer.enabled():
+        return {}
+    return like_buffer.get_buffer().pending_for_issue(issue_id)
+
+
+def likes_count_delta(issue_id, pending):
+    """
+    How much the pending intents will change the stored likes_count of an issue.
+    """
+    if not pending:
+        return 0
+
+    stored = set(
+        IssueLike.objects.filter(issue_id=issue_id, liked_by_id__in=pending).values_list(
+            "liked_by_id", flat=True
+        )
+    )
+    delta = 0
+    for user_id, (liked, _) in pending.items():
+        if liked and user_id not in stored:
+            delta += 1
+        elif not liked and user_id in stored:
+            delta -= 1
+    return delta
+
+
+def with_viewer_has_liked(queryset, user):
+    """
+    Annotate issues with `viewer_has_liked`, one EXISTS subquery for the whole page.
+    """
+    if not user.is_authenticated:
+        return queryset.annotate(viewer_has_liked=Value(False, output_field=BooleanField()))
+    return queryset.annotate(
+        viewer_has_liked=Exists(
+            IssueLike.objects.filter(issue_id=OuterRef("pk"), liked_by_id=user.id)
+        )
+    )
+
+
+def apply_pending_viewer_state(issues, user):
+    """
+    Correct `viewer_has_liked` of annotated issues with the viewer's buffered intents.
+    """
+    if not like_buffer.enabled() or not user.is_authenticated:
+        return issues
+
+    pending = like_buffer.get_buffer().pending_for_user(user.id)
+    for issue in issues:
+        if issue.id in pending:
+            issue.viewer_has_liked = pending[issue.id][0]
+    return issues
+
+
+def liked_issue_ids(user, issue_ids):
+    """
+    The subset of `issue_ids` the user likes, buffered intents included.
+    """
+    if not user.is_authenticated:
+        return set()
+
+    liked = set(
+        IssueLike.objects.filter(liked_by_id=user.id, issue_id__in=issue_ids).values_list(
+            "issue_id", flat=True
+        )
+    )
+    if like_buffer.enabled():
+        wanted = set(issue_ids)
+        for issue_id, (state, _) in like_buffer.get_buffer().pending_for_user(user.id).items():
+            if issue_id in wanted:
+                (liked.add if state else liked.discard)(issue_id)
+    return liked
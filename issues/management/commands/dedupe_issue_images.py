@@ -0,0 +1,117 @@
+import os
+
+from django.core.files import File
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from issues import cache as issue_cache
+from issues.models import IssueImage
+from issues.storage import CAS_PREFIX, blob_name, content_hash_of
+
+
+class Command(BaseCommand):
+    """
+    Move issue images stored before content addressing into the content-addressed
+    layout (issues/storage.py), keeping one file per distinct content.
+
+    Every legacy file is hashed; the first file with a given hash is moved to its
+    blob name, later duplicates are deleted and their rows pointed at that blob.
+    Variants are moved along with their original. Legacy files are only deleted
+    once their row points at the blob, an interrupted run can simply be rerun.
+
+    Usage:
+        python manage.py dedupe_issue_images
+        python manage.py dedupe_issue_images --dry-run
+    """
+
+    help = "Deduplicate issue images into content-addressed storage."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report what would be moved and reclaimed.",
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options["dry_run"]
+        storage = IssueImage._meta.get_field("image").storage
+
+        moved = 0
+        deduplicated = 0
+        reclaimed = 0
+        missing = 0
+        # blob names already in place, also those a dry run would have created
+        present = set()
+
+        def exists(name):
+            return name in present or storage.exists(name)
+
+        def relocate(old, new):
+            # copies `old` to `new` if needed, returns the bytes freed once `old`
+            # is deleted, which only happens after the row points at `new`
+            nonlocal moved
+            if exists(new):
+                return storage.size(old)
+            if not dry_run:
+                with storage.open(old, "rb") as source:
+                    storage.save(new, File(source))
+            present.add(new)
+            moved += 1
+            return 0
+
+        def release(paths):
+            for path in paths:
+                # unless another row still names the legacy file
+                if not IssueImage.objects.filter(image=path).exists():
+                    storage.delete(path)
+
+        images = (
+            IssueImage.objects.exclude(image__startswith=f"{CAS_PREFIX}/")
+            .exclude(image="")
+            .order_by("id")
+        )
+        for issue_image in images.iterator(chunk_size=200):
+            old_name = issue_image.image.name
+            if not storage.exists(old_name):
+                missing += 1
+                self.stderr.write(f"Issue image {issue_image.id}: {old_name} is missing")
+                continue
+
+            with storage.open(old_name, "rb") as source:
+                content_hash = content_hash_of(source)
+            new_name = blob_name(content_hash, old_name)
+
+            duplicate = exists(new_name)
+            reclaimed += relocate(old_name, new_name)
+            deduplicated += duplicate
+            replaced = [old_name]
+
+            old_stem = os.path.splitext(old_name)[0]
+            new_stem = os.path.splitext(new_name)[0]
+            variants = {}
+            for variant, path in issue_image.variants.items():
+                if not path.startswith(old_stem) or not storage.exists(path):
+                    continue
+                # "<old stem>_thumb.webp" -> "<hash>_thumb.webp"
+                variants[variant] = new_stem + path[len(old_stem):]
+                reclaimed += relocate(path, variants[variant])
+                replaced.append(path)
+
+            if not dry_run:
+                # the legacy files go once the row points at their copies, an
+                # interrupted run leaves both and the next run picks the row up again
+                with transaction.atomic():
+                    IssueImage.objects.filter(id=issue_image.id).update(
+                        image=new_name, content_hash=content_hash, variants=variants
+                    )
+                    transaction.on_commit(lambda paths=replaced: release(paths))
+                issue_cache.bump_version(issue_image.issue_id)
+
+        prefix = "[dry run] " if dry_run else ""
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{prefix}Moved {moved} files, deduplicated {deduplicated} images, "
+                f"reclaimed {reclaimed} bytes, {missing} missing."
+            )
+        )
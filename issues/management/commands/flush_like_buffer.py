@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from issues.like_buffer import LikeBuffer
+
+
+class Command(BaseCommand):
+    """
+    Write the like intents left in the write-behind logs to the database.
+
+    Running workers flush their own buffer on their own; this adopts and flushes
+    the logs of workers that are gone, e.g. after turning ISSUE_LIKE_WRITE_BEHIND
+    off or scaling down.
+
+    Usage:
+        python manage.py flush_like_buffer
+    """
+
+    help = "Flush like intents left in the write-behind logs of stopped workers."
+
+    def handle(self, *args, **options):
+        buffer = LikeBuffer(settings.ISSUE_LIKE_BUFFER_DIR)
+        try:
+            written = buffer.flush()
+        finally:
+            buffer.close(flush=False)
+
+        self.stdout.write(self.style.SUCCESS(f"Flushed {written} like intents."))
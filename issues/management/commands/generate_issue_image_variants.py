@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand
+
+from issues.derivatives import VARIANT_NAMES, generate_variants
+from issues.models import IssueImage
+
+
+class Command(BaseCommand):
+    """
+    Generate the resized variants of issue images that do not have them yet.
+
+    Uploads are normally processed in the background right after the issue is
+    created, this catches up on images skipped while the queue was full, images
+    uploaded before variants existed, or all of them with --all.
+
+    Usage:
+        python manage.py generate_issue_image_variants
+        python manage.py generate_issue_image_variants --all
+    """
+
+    help = "Generate missing thumbnail/medium/WebP variants of issue images."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Regenerate the variants of every image, not only the missing ones.",
+        )
+
+    def handle(self, *args, **options):
+        generated = 0
+        failed = 0
+
+        images = IssueImage.objects.order_by("id").values_list("id", "variants")
+        for image_id, variants in images.iterator(chunk_size=500):
+            if not options["all"] and all(name in variants for name in VARIANT_NAMES):
+                continue
+
+            try:
+                generate_variants(image_id)
+                generated += 1
+            except Exception as e:
+                failed += 1
+                self.stderr.write(f"Issue image {image_id}: {e}")
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Generated variants of {generated} images, {failed} failed.")
+        )
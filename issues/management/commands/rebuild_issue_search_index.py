@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from issues.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    """
+    Rebuild the FTS5 search index of issues from scratch.
+
+    The index is kept in sync by triggers, this is only needed after bulk loads
+    done with triggers disabled or if the index is suspected to be corrupt.
+
+    Usage:
+        python manage.py rebuild_issue_search_index
+    """
+
+    help = "Rebuild the full-text search index of issues."
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite":
+            raise CommandError("The issue search index is only available on SQLite.")
+
+        rebuild_search_index()
+        self.stdout.write(self.style.SUCCESS("Issue search index rebuilt."))
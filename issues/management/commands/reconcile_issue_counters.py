@@ -0,0 +1,81 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Q
+
+from issues.counters import COUNTED_MODELS, actual_count
+from issues.models import Issue
+
+
+class Command(BaseCommand):
+    """
+    Repair drift between the denormalized counters on Issue and the real child rows.
+
+    Walks the issue table in primary key batches, finds rows whose counters do not
+    match and rewrites only those rows. The new value is computed inside the UPDATE
+    statement itself so a like/comment landing meanwhile is never lost.
+
+    Usage:
+        python manage.py reconcile_issue_counters
+        python manage.py reconcile_issue_counters --batch-size 500 --dry-run
+    """
+
+    help = "Recompute likes/comments/images counters on issues that drifted."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report drifted issues, do not write anything.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        dry_run = options["dry_run"]
+
+        if batch_size < 1:
+            raise CommandError("--batch-size must be at least 1")
+
+        fields = list(COUNTED_MODELS)
+        drift = Q()
+        for field in fields:
+            drift |= ~Q(**{field: actual_count(field)})
+
+        last_id = 0
+        scanned = 0
+        repaired = 0
+
+        while True:
+            batch = list(
+                Issue.objects.filter(id__gt=last_id)
+                .order_by("id")
+                .values_list("id", flat=True)[:batch_size]
+            )
+            if not batch:
+                break
+
+            last_id = batch[-1]
+            scanned += len(batch)
+
+            drifted = list(
+                Issue.objects.filter(id__in=batch)
+                .filter(drift)
+                .values_list("id", flat=True)
+            )
+            if not drifted:
+                continue
+
+            self.stdout.write(f"Issues with drifted counters: {drifted}")
+
+            if not dry_run:
+                with transaction.atomic():
+                    Issue.objects.filter(id__in=drifted).update(
+                        **{field: actual_count(field) for field in fields}
+                    )
+
+            repaired += len(drifted)
+
+        action = "would be repaired" if dry_run else "repaired"
+        self.stdout.write(
+            self.style.SUCCESS(f"Scanned {scanned} issues, {repaired} {action}.")
+        )
@@ -0,0 +1,31 @@
+# Generated by Django 6.1.2 on 2026-10-17 02:57
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('issues', '0002_issue_address_alter_issue_category_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='issue',
+            index=models.Index(fields=['-created_at', '-id'], name='issue_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='issue',
+            index=models.Index(fields=['category', '-created_at', '-id'], name='issue_category_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='issue',
+            index=models.Index(fields=['is_resolved', '-created_at', '-id'], name='issue_resolved_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='issue',
+            index=models.Index(fields=['reported_by', '-created_at', '-id'], name='issue_reporter_feed_idx'),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 6.1.2 on 2026-10-17 02:58
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    Issue = apps.get_model("issues", "Issue")
+    counted = {
+        "likes_count": apps.get_model("issues", "IssueLike"),
+        "comments_count": apps.get_model("issues", "IssueComment"),
+        "images_count": apps.get_model("issues", "IssueImage"),
+    }
+
+    updates = {}
+    for field, model in counted.items():
+        counts = (
+            model.objects.filter(issue_id=OuterRef("pk"))
+            .order_by()
+            .values("issue_id")
+            .annotate(total=Count("*"))
+            .values("total")
+        )
+        updates[field] = Coalesce(Subquery(counts), 0)
+
+    Issue.objects.update(**updates)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('issues', '0003_issue_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='issue',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='issue',
+            name='images_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='issue',
+            name='likes_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
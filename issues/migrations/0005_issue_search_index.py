@@ -0,0 +1,26 @@
+from django.db import migrations
+
+from issues.search import drop_search_index, install_search_index
+
+
+def create_index(apps, schema_editor):
+    install_search_index(schema_editor.connection)
+
+
+def remove_index(apps, schema_editor):
+    drop_search_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+    """
+    SQLite FTS5 index over issue title/description/address, see issues/search.py.
+    Does nothing on other database backends.
+    """
+
+    dependencies = [
+        ('issues', '0004_issue_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, remove_index),
+    ]
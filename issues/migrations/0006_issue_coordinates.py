@@ -0,0 +1,28 @@
+# Generated by Django 6.1.2 on 2026-10-17 03:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('issues', '0005_issue_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='issue',
+            name='geo_cell',
+            field=models.BigIntegerField(blank=True, db_index=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='issue',
+            name='latitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='issue',
+            name='longitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.1.2 on 2026-10-17 03:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('issues', '0006_issue_coordinates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='issueimage',
+            name='variants',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
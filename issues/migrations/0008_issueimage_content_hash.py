@@ -0,0 +1,25 @@
+# Generated by Django 6.1.2 on 2026-10-17 03:12
+
+import issues.models
+import issues.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('issues', '0007_issueimage_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='issueimage',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=64),
+        ),
+        migrations.AlterField(
+            model_name='issueimage',
+            name='image',
+            field=models.ImageField(storage=issues.storage.ContentAddressedStorage(), upload_to=issues.models.issue_image_upload_path),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 6.1.2 on 2026-10-17 03:24
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('issues', '0008_issueimage_content_hash'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='issuecomment',
+            options={'ordering': ['created_at', 'id']},
+        ),
+        migrations.AddIndex(
+            model_name='issuecomment',
+            index=models.Index(fields=['issue', 'created_at', 'id'], name='issue_comment_thread_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 6.1.2 on 2026-10-17 03:28
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('issues', '0009_comment_thread_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='issuelike',
+            index=models.Index(fields=['issue', 'created_at', 'id'], name='issue_like_recent_idx'),
+        ),
+    ]
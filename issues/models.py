@@ -1,5 +1,7 @@
-from django.db import models
-from uuid import uuid4
+from django.db import models, transaction
+
+from . import geo
+from .storage import blob_name, content_hash_of, issue_image_storage
 
 """
 For simplicity, we will keep all issue related models in this single file.
@@ -9,8 +11,10 @@ In future, if the models grow too much we can split them into multiple files.
 
 
 def issue_image_upload_path(instance, filename):
-    ext = filename.split(".")[-1]
-    return f"issue_images/{instance.issue_id}/{uuid4().hex}.{ext}"
+    # images are content addressed, the same bytes always land on the same path
+    if not instance.content_hash:
+        instance.content_hash = content_hash_of(instance.image)
+    return blob_name(instance.content_hash, filename)
 
 
 # Create your models here.
@@ -38,9 +42,53 @@ class Issue(BaseTimedModel):
 
     address = models.CharField(max_length=255, blank=True, null=True)
 
+    # optional WGS84 coordinates of the issue
+    latitude = models.FloatField(blank=True, null=True)
+    longitude = models.FloatField(blank=True, null=True)
+
+    # grid cell of the coordinates, derived in save() (see issues/geo.py)
+    # this is the spatial index used by the "nearby" search
+    geo_cell = models.BigIntegerField(blank=True, null=True, editable=False, db_index=True)
+
+    # denormalized counters so list/detail views do not have to count child rows
+    # they are kept in sync with F() updates by the views (see issues/counters.py)
+    # and can be repaired with `manage.py reconcile_issue_counters`
+    likes_count = models.PositiveIntegerField(default=0)
+    comments_count = models.PositiveIntegerField(default=0)
+    images_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        # composite indexes backing the keyset paginated feeds, see core/pagination.py
+        # each one matches a (filter, created_at, id) access path of the feed views
+        indexes = [
+            models.Index(fields=["-created_at", "-id"], name="issue_feed_idx"),
+            models.Index(
+                fields=["category", "-created_at", "-id"], name="issue_category_feed_idx"
+            ),
+            models.Index(
+                fields=["is_resolved", "-created_at", "-id"],
+                name="issue_resolved_feed_idx",
+            ),
+            models.Index(
+                fields=["reported_by", "-created_at", "-id"],
+                name="issue_reporter_feed_idx",
+            ),
+        ]
+
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        self.geo_cell = geo.cell_for(self.latitude, self.longitude)
+
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and (
+            "latitude" in update_fields or "longitude" in update_fields
+        ):
+            kwargs["update_fields"] = {*update_fields, "geo_cell"}
+
+        super().save(*args, **kwargs)
+
 
 # seperate tables for those items that can have multiple entries per issue
 class IssueComment(BaseTimedModel):
@@ -55,7 +103,14 @@ class IssueComment(BaseTimedModel):
     )
 
     class Meta:
-        ordering = ["created_at"]
+        # id breaks ties between comments posted in the same instant, it is also
+        # the cursor key of the paginated comment threads
+        ordering = ["created_at", "id"]
+        indexes = [
+            models.Index(
+                fields=["issue", "created_at", "id"], name="issue_comment_thread_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"Comment on {self.issue.title} at {self.created_at}"
@@ -63,18 +118,32 @@ class IssueComment(BaseTimedModel):
 
 class IssueImage(BaseTimedModel):
     """
-    We will store the images in a media folder as below
-    <media>/issue_images/<issue_id>/<image_number>.<extension>
-
-    1. issue_id will be the id of the issue to which the image belongs
-    2. image_number will be a sequential number for each image of the issue
-    no matter what the image is named when uploaded we will rename it to image_1, image_2 etc
-    3. extension will be the original extension of the uploaded image
-    4. We will create a function to handle the upload path
+    We store the images content addressed in the media folder, see issues/storage.py
+    <media>/issue_images/cas/<hash prefix>/<sha256 of the bytes>.<extension>
+
+    1. the same photo uploaded twice (or on several issues) is stored only once
+    2. content_hash is the sha256 of the bytes, rows sharing it (and the extension) share the file
+    3. the file is deleted only when the last row using it is deleted (issues/signals.py)
+    4. extension is the original extension of the uploaded image
     """
 
     issue = models.ForeignKey(Issue, related_name="images", on_delete=models.CASCADE)
-    image = models.ImageField(upload_to=issue_image_upload_path)
+    image = models.ImageField(
+        upload_to=issue_image_upload_path, storage=issue_image_storage
+    )
+
+    # sha256 of the image bytes, filled while uploading (must stay after `image`)
+    content_hash = models.CharField(max_length=64, blank=True, default="", db_index=True)
+
+    # resized derivatives of the image, {variant name: storage path}
+    # filled in the background after upload, see issues/derivatives.py
+    variants = models.JSONField(default=dict, blank=True)
+
+    def save(self, *args, **kwargs):
+        # the file is written (or found already there) and the row inserted under
+        # the same write lock as release_blob's reference check (issues/signals.py)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
 
     def __str__(self):
         return f"Image for {self.issue.title} at {self.created_at}"
@@ -91,6 +160,8 @@ class IssueLike(BaseTimedModel):
         indexes = [
             models.Index(fields=["issue"]),
             models.Index(fields=["liked_by"]),
+            # cursor pages of the likers list, see IssueLikesView
+            models.Index(fields=["issue", "created_at", "id"], name="issue_like_recent_idx"),
         ]
 
     def __str__(self):
@@ -10,11 +10,11 @@ class IsOwnerOrStaff(BasePermission):
         if request.user.is_staff or request.user.is_superuser:
             return True
 
-        # object owner check
-        if hasattr(obj, "reported_by"):
-            return obj.reported_by == request.user
+        # object owner check, on ids: neither side has to load a User for it
+        if hasattr(obj, "reported_by_id"):
+            return obj.reported_by_id == request.user.id
 
-        if hasattr(obj, "commented_by"):
-            return obj.commented_by == request.user
+        if hasattr(obj, "commented_by_id"):
+            return obj.commented_by_id == request.user.id
 
         return False
@@ -0,0 +1,162 @@
+"""
+Full-text search over issues backed by an SQLite FTS5 index.
+
+The index is an external-content FTS5 table (`issues_issue_fts`) over the title,
+description and address of `issues_issue`. Triggers on `issues_issue` keep it in
+sync for every write path, including queryset.update() and raw SQL, so nothing
+in the views has to remember to touch it.
+
+Results are ranked with BM25, title matches weighing the most.
+"""
+
+import re
+
+from django.db import connection
+
+FTS_TABLE = "issues_issue_fts"
+ISSUE_TABLE = "issues_issue"
+INDEXED_COLUMNS = ("title", "description", "address")
+TRIGGER_NAMES = (f"{FTS_TABLE}_ai", f"{FTS_TABLE}_ad", f"{FTS_TABLE}_au")
+
+# bm25 weight of each column in INDEXED_COLUMNS, higher weighs more
+COLUMN_WEIGHTS = (10.0, 1.0, 2.0)
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def _index_statements():
+    columns = ", ".join(INDEXED_COLUMNS)
+    new_values = ", ".join(f"new.{column}" for column in INDEXED_COLUMNS)
+    old_values = ", ".join(f"old.{column}" for column in INDEXED_COLUMNS)
+
+    delete_old = (
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {columns}) "
+        f"VALUES ('delete', old.id, {old_values});"
+    )
+    insert_new = (
+        f"INSERT INTO {FTS_TABLE}(rowid, {columns}) VALUES (new.id, {new_values});"
+    )
+
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+        f"{columns}, content='{ISSUE_TABLE}', content_rowid='id', "
+        f"tokenize='unicode61 remove_diacritics 2')",
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON {ISSUE_TABLE} "
+        f"BEGIN {insert_new} END",
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON {ISSUE_TABLE} "
+        f"BEGIN {delete_old} END",
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF {columns} "
+        f"ON {ISSUE_TABLE} BEGIN {delete_old} {insert_new} END",
+    ]
+
+
+def _missing_triggers(cursor):
+    cursor.execute(
+        "SELECT count(*) FROM sqlite_master WHERE type = 'trigger' AND name IN (%s, %s, %s)",
+        list(TRIGGER_NAMES),
+    )
+    return cursor.fetchone()[0] < len(TRIGGER_NAMES)
+
+
+def drop_search_index(using_connection=None):
+    conn = using_connection or connection
+    if conn.vendor != "sqlite":
+        return
+
+    with conn.cursor() as cursor:
+        for name in TRIGGER_NAMES:
+            cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+        cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+def install_search_index(using_connection=None):
+    """
+    Create the FTS table and its sync triggers if they do not exist yet.
+
+    Django rebuilds SQLite tables for some schema changes (e.g. adding a NOT NULL
+    column) which silently drops the triggers, so this runs after every migrate
+    (see IssuesConfig.ready) and repopulates the index if the triggers were gone.
+    """
+    conn = using_connection or connection
+    if conn.vendor != "sqlite":
+        return
+
+    with conn.cursor() as cursor:
+        needs_rebuild = _missing_triggers(cursor)
+        for statement in _index_statements():
+            cursor.execute(statement)
+        if needs_rebuild:
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def rebuild_search_index():
+    """
+    Repopulate the whole index from the issues table.
+    """
+    install_search_index()
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+
+
+def build_match_query(text):
+    """
+    Turn free user text into a safe FTS5 MATCH expression.
+
+    Every word is quoted (so FTS operators typed by users are taken literally)
+    and all of them must match. The last word is a prefix match so results show
+    up while the user is still typing. Returns None when there is nothing to search.
+    """
+    tokens = _TOKEN.findall(text or "")
+    if not tokens:
+        return None
+
+    terms = [f'"{token}"' for token in tokens]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+def matching_ids_sql():
+    """
+    SQL (with one parameter, the MATCH expression) selecting the ids of matching issues.
+    Used where ranking does not matter, e.g. as an `id__in` RawSQL filter.
+    """
+    return f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s"
+
+
+def search_issue_ids(match, category=None, is_resolved=None, after=None, limit=20):
+    """
+    Ranked page of matching issues as a list of (issue_id, rank) tuples.
+
+    Ordered by BM25 rank (lower is better) then id. `after` is the (rank, id) of
+    the last row of the previous page, which makes this a keyset paginated query.
+    """
+    weights = ", ".join(str(weight) for weight in COLUMN_WEIGHTS)
+
+    conditions = [f"{FTS_TABLE} MATCH %s"]
+    params = [match]
+
+    if category:
+        conditions.append("issue.category = %s")
+        params.append(category)
+
+    if is_resolved is not None:
+        conditions.append("issue.is_resolved = %s")
+        params.append(is_resolved)
+
+    ranked = (
+        f"SELECT issue.id AS id, bm25({FTS_TABLE}, {weights}) AS rank "
+        f"FROM {FTS_TABLE} JOIN {ISSUE_TABLE} AS issue ON issue.id = {FTS_TABLE}.rowid "
+        f"WHERE {' AND '.join(conditions)}"
+    )
+
+    sql = f"SELECT id, rank FROM ({ranked})"
+    if after is not None:
+        sql += " WHERE rank > %s OR (rank = %s AND id > %s)"
+        params.extend([after[0], after[0], after[1]])
+    sql += " ORDER BY rank, id LIMIT %s"
+    params.append(limit)
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
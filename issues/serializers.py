@@ -1,5 +1,32 @@
+from django.db import transaction
 from rest_framework import serializers
+from core.fastserializers import FastSerializer
+from .derivatives import VARIANT_NAMES, schedule_variants
 from .models import Issue, IssueImage, IssueComment
+from .storage import content_hash_of
+
+
+def validate_coordinates(attrs, instance=None):
+    """
+    Latitude and longitude only make sense together and within WGS84 bounds.
+    """
+    latitude = attrs.get("latitude", getattr(instance, "latitude", None))
+    longitude = attrs.get("longitude", getattr(instance, "longitude", None))
+
+    if (latitude is None) != (longitude is None):
+        raise serializers.ValidationError(
+            "latitude and longitude must be given together."
+        )
+
+    errors = {}
+    if latitude is not None and not -90 <= latitude <= 90:
+        errors["latitude"] = "latitude must be between -90 and 90."
+    if longitude is not None and not -180 <= longitude <= 180:
+        errors["longitude"] = "longitude must be between -180 and 180."
+    if errors:
+        raise serializers.ValidationError(errors)
+
+    return attrs
 
 
 class IssueCommentSerializer(serializers.ModelSerializer):
@@ -11,9 +38,31 @@ class IssueCommentSerializer(serializers.ModelSerializer):
 
 
 class IssueImageSerializer(serializers.ModelSerializer):
+    variants = serializers.SerializerMethodField()
+
     class Meta:
         model = IssueImage
-        fields = ["id", "image"]
+        fields = ["id", "image", "variants"]
+
+    def get_variants(self, obj):
+        """
+        URL of every variant, the original image stands in for the ones not generated yet.
+        """
+        storage = obj.image.storage
+        original = obj.image.url if obj.image else None
+
+        urls = {}
+        for name in VARIANT_NAMES:
+            path = obj.variants.get(name)
+            urls[name] = storage.url(path) if path else original
+
+        request = self.context.get("request")
+        if request is not None:
+            urls = {
+                name: request.build_absolute_uri(url) if url else url
+                for name, url in urls.items()
+            }
+        return urls
 
 
 class IssueCreateSerializer(serializers.ModelSerializer):
@@ -42,18 +91,35 @@ class IssueCreateSerializer(serializers.ModelSerializer):
             "description",
             "category",
             "address",
+            "latitude",
+            "longitude",
             "uploaded_images",
         ]
 
+    def validate(self, attrs):
+        return validate_coordinates(attrs, self.instance)
+
     def create(self, validated_data):
         images = validated_data.pop("uploaded_images", [])
         request = self.context["request"]
 
-        issue = Issue.objects.create(reported_by=request.user, **validated_data)
+        # the images counter is written together with the rows it counts
+        with transaction.atomic():
+            issue = Issue.objects.create(
+                reported_by=request.user, images_count=len(images), **validated_data
+            )
 
-        IssueImage.objects.bulk_create(
-            [IssueImage(issue=issue, image=image) for image in images]
-        )
+            created = IssueImage.objects.bulk_create(
+                [
+                    IssueImage(
+                        issue=issue, image=image, content_hash=content_hash_of(image)
+                    )
+                    for image in images
+                ]
+            )
+
+            # thumbnails and other sizes are built in the background after commit
+            schedule_variants(image.id for image in created)
 
         return issue
 
@@ -64,9 +130,9 @@ class IssueListSerializer(serializers.ModelSerializer):
     """
 
     images = IssueImageSerializer(many=True, read_only=True)
-    likes_count = serializers.IntegerField(source="likes.count", read_only=True)
-    comments_count = serializers.IntegerField(source="comments.count", read_only=True)
     reported_by = serializers.CharField(source="reported_by.email", read_only=True)
+    # annotated by the views, see issues/likes.py with_viewer_has_liked
+    viewer_has_liked = serializers.BooleanField(read_only=True, default=False)
 
     class Meta:
         model = Issue
@@ -76,11 +142,14 @@ class IssueListSerializer(serializers.ModelSerializer):
             "description",
             "category",
             "address",
+            "latitude",
+            "longitude",
             "is_resolved",
             "reported_by",
             "images",
             "comments_count",
             "likes_count",
+            "viewer_has_liked",
             "created_at",
         ]
 
@@ -91,9 +160,14 @@ class IssueDetailSerializer(serializers.ModelSerializer):
     """
 
     images = IssueImageSerializer(many=True, read_only=True)
-    comments = IssueCommentSerializer(many=True, read_only=True)
-    likes_count = serializers.IntegerField(source="likes.count", read_only=True)
+    # first page of the thread and the cursor of the next one, set by IssueDetailView
+    comments = IssueCommentSerializer(
+        source="first_comments", many=True, read_only=True, default=list
+    )
+    comments_next = serializers.CharField(read_only=True, allow_null=True, default=None)
     reported_by = serializers.CharField(source="reported_by.email", read_only=True)
+    # per viewer, IssueDetailView sets it on top of the cached payload
+    viewer_has_liked = serializers.BooleanField(read_only=True, default=False)
 
     class Meta:
         model = Issue
@@ -103,11 +177,15 @@ class IssueDetailSerializer(serializers.ModelSerializer):
             "description",
             "category",
             "address",
+            "latitude",
+            "longitude",
             "is_resolved",
             "reported_by",
             "images",
             "comments",
+            "comments_next",
             "likes_count",
+            "viewer_has_liked",
             "created_at",
         ]
 
@@ -124,5 +202,17 @@ class IssueUpdateSerializer(serializers.ModelSerializer):
             "description",
             "category",
             "address",
+            "latitude",
+            "longitude",
             "is_resolved",
         ]
+
+    def validate(self, attrs):
+        return validate_coordinates(attrs, self.instance)
+
+
+# compiled read paths for the list and detail endpoints, same output as .data,
+# see core/fastserializers.py
+issue_list_data = FastSerializer(IssueListSerializer)
+issue_detail_data = FastSerializer(IssueDetailSerializer)
+comment_data = FastSerializer(IssueCommentSerializer)
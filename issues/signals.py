@@ -0,0 +1,47 @@
+from django.db import transaction
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from .models import IssueImage
+
+
+def release_blob(name, content_hash, variants):
+    """
+    Delete an image file and its variants unless another IssueImage still uses them.
+
+    The same bytes uploaded with different extensions are stored under as many
+    names, so the file is referenced by the rows with its name; the variants are
+    named after the hash alone and shared by every row with that hash.
+
+    The check and the deletes run in one transaction, which takes the database
+    write lock (transaction_mode IMMEDIATE). Uploads save the file and insert
+    their row under that lock too (IssueImage.save, bulk_create), so an upload
+    reusing the file either commits before the check, or finds the file gone and
+    writes it again.
+    """
+    with transaction.atomic():
+        _release_blob(name, content_hash, variants)
+
+
+def _release_blob(name, content_hash, variants):
+    paths = []
+    if content_hash:
+        sharing = IssueImage.objects.filter(content_hash=content_hash)
+        if not sharing.filter(image=name).exists():
+            paths.append(name)
+        if not sharing.exists():
+            paths.extend(variants.values())
+    else:
+        paths = [name, *variants.values()]
+
+    storage = IssueImage._meta.get_field("image").storage
+    for path in paths:
+        if path:
+            storage.delete(path)
+
+
+@receiver(post_delete, sender=IssueImage)
+def delete_unreferenced_blob(sender, instance, **kwargs):
+    # also runs for every image of a deleted issue (cascade)
+    name, content_hash, variants = instance.image.name, instance.content_hash, dict(instance.variants)
+    transaction.on_commit(lambda: release_blob(name, content_hash, variants))
@@ -0,0 +1,81 @@
+"""
+Content-addressed storage of issue images.
+
+An image is stored under the sha256 of its bytes:
+
+    issue_images/cas/<first 2 hex chars>/<sha256>.<ext>
+
+so the same photo uploaded again, or attached to several issues, is stored once.
+`IssueImage.content_hash` records the hash; the IssueImage rows naming a blob
+are its references, and a blob is only deleted once the last row pointing at it
+is gone (its variants once no row has the hash anymore). Saving a file must happen in
+the transaction inserting its row, see issues/signals.py release_blob.
+"""
+
+import hashlib
+import os
+import re
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+CAS_PREFIX = "issue_images/cas"
+
+# names urljoin would leave untouched: relative, no empty/dot segments, nothing to quote
+_PLAIN_NAME = re.compile(r"[A-Za-z0-9_-]+(?:/[A-Za-z0-9_-]+)*(?:\.[A-Za-z0-9]+)?")
+
+
+def content_hash_of(file):
+    """
+    sha256 hex digest of an uploaded file or FieldFile.
+    Uses the hash computed while streaming the upload when there is one (core/uploads.py).
+    """
+    digest = getattr(file, "content_hash", None)
+    if digest:
+        return digest
+
+    hasher = hashlib.sha256()
+    file.seek(0)
+    for chunk in file.chunks():
+        hasher.update(chunk)
+    file.seek(0)
+    return hasher.hexdigest()
+
+
+def blob_name(content_hash, filename):
+    ext = os.path.splitext(filename)[1].lower() or ".bin"
+    return f"{CAS_PREFIX}/{content_hash[:2]}/{content_hash}{ext}"
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    File system storage where a name always holds the same bytes.
+
+    Saving a name that already exists is a no-op returning the same name, instead
+    of the default behaviour of picking a new suffixed name.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("allow_overwrite", True)
+        super().__init__(**kwargs)
+
+    def get_available_name(self, name, max_length=None):
+        return name
+
+    def _save(self, name, content):
+        if self.exists(name):
+            return name
+        # two concurrent uploads of the same bytes may both get here, with
+        # allow_overwrite the second one simply rewrites identical content
+        return super()._save(name, content)
+
+    def url(self, name):
+        # every image of a list response is turned into several urls, the
+        # names this storage generates do not need quoting or urljoin
+        if name and self.base_url is not None and _PLAIN_NAME.fullmatch(name):
+            return self.base_url + name
+        return super().url(name)
+
+
+issue_image_storage = ContentAddressedStorage()
@@ -1,5 +1,19 @@
+import math
+
 import pytest
+from django.core.management import call_command
+from core.queries import QueryRecorder
+from . import cache as issue_cache
 from .models import Issue, IssueComment, IssueLike
+from .views import (
+    IssueCommentsView,
+    IssueDetailView,
+    IssueFeedView,
+    IssueLikesView,
+    IssueNearbyView,
+    IssueSearchView,
+    MyIssuesView,
+)
 
 def is_sre(response_data):
     """Helper to check if response is from SRE system"""
@@ -61,6 +75,179 @@ class TestIssueLifecycle:
         print(f"Response Status: {response.status_code}")
         assert response.status_code == 401
 
+    def test_image_variants(self, user1_client, django_capture_on_commit_callbacks):
+        print("\n--- Test: Image Variants ---")
+        import io
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from PIL import Image
+        from .derivatives import VARIANT_NAMES, generate_variants
+        from .models import IssueImage
+
+        buffer = io.BytesIO()
+        Image.new("RGB", (2000, 1000), "red").save(buffer, "JPEG")
+        photo = SimpleUploadedFile("photo.jpg", buffer.getvalue(), content_type="image/jpeg")
+
+        with django_capture_on_commit_callbacks() as callbacks:
+            response = user1_client.post(
+                "/issues/create/",
+                {"title": "Big photo", "description": "D", "uploaded_images": [photo]},
+                format='multipart',
+            )
+        # generation is queued for after the commit, not done in the request
+        assert len(callbacks) == 1
+
+        image = response.json()['response']['images'][0]
+        assert set(image['variants']) == set(VARIANT_NAMES)
+        assert all(url == image['image'] for url in image['variants'].values())
+
+        variants = generate_variants(image['id'])
+        issue_image = IssueImage.objects.get(id=image['id'])
+        assert issue_image.variants == variants
+        with issue_image.image.storage.open(variants['thumb']) as thumb:
+            assert Image.open(thumb).size == (320, 160)
+        with issue_image.image.storage.open(variants['medium_webp']) as medium:
+            assert Image.open(medium).format == "WEBP"
+
+        issue_id = response.json()['response']['id']
+        detail = user1_client.get(f"/issues/of/{issue_id}/").json()['response']
+        served = detail['images'][0]['variants']
+        assert served['thumb'].endswith("_thumb.jpg")
+        assert served['thumb_webp'].endswith("_thumb.webp")
+
+    def test_upload_limits(self, user1_client, dummy_image, settings):
+        print("\n--- Test: Streaming Upload Limits ---")
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        not_image = SimpleUploadedFile("fake.jpg", b"#!/bin/sh\necho not an image\n", content_type="image/jpeg")
+        payload = {"title": "Fake", "description": "D", "uploaded_images": [not_image]}
+        response = user1_client.post("/issues/create/", payload, format='multipart')
+        assert response.status_code == 400
+        assert 'uploaded_images' in response.json()['error']['details']
+
+        settings.UPLOAD_MAX_FILE_SIZE = 100
+        payload = {"title": "Big", "description": "D", "uploaded_images": [dummy_image]}
+        response = user1_client.post("/issues/create/", payload, format='multipart')
+        assert response.status_code == 413
+        assert response.json()['success'] is False
+
+        settings.UPLOAD_MAX_FILE_SIZE = 1024
+        settings.UPLOAD_MAX_REQUEST_SIZE = 200
+        dummy_image.seek(0)
+        response = user1_client.post("/issues/create/", payload, format='multipart')
+        assert response.status_code == 413
+        assert Issue.objects.count() == 0
+
+    def test_upload_handler_hashes_content(self, dummy_image):
+        print("\n--- Test: Upload Handler Content Hash ---")
+        import hashlib
+        from core.uploads import StreamingImageUploadHandler
+
+        content = dummy_image.read()
+        handler = StreamingImageUploadHandler()
+        handler.new_file("uploaded_images", "a.jpg", "image/jpeg", len(content))
+        for start in range(0, len(content), 5):
+            handler.receive_data_chunk(content[start:start + 5], start)
+        uploaded = handler.file_complete(len(content))
+
+        assert uploaded.content_hash == hashlib.sha256(content).hexdigest()
+        uploaded.seek(0)
+        assert uploaded.read() == content
+
+    def test_images_deduplicated(self, user1_client, dummy_image, django_capture_on_commit_callbacks):
+        print("\n--- Test: Content-Addressed Image Storage ---")
+        from .models import IssueImage
+
+        ids = []
+        for title in ("First", "Second"):
+            dummy_image.seek(0)
+            payload = {"title": title, "description": "D", "uploaded_images": [dummy_image]}
+            ids.append(user1_client.post("/issues/create/", payload, format='multipart').json()['response']['id'])
+
+        first, second = IssueImage.objects.filter(issue_id__in=ids).order_by("id")
+        assert first.content_hash and first.content_hash == second.content_hash
+        assert first.image.name == second.image.name
+        assert first.image.name.startswith(f"issue_images/cas/{first.content_hash[:2]}/")
+        storage = first.image.storage
+        assert storage.exists(first.image.name)
+
+        # still referenced by the second issue
+        with django_capture_on_commit_callbacks(execute=True):
+            user1_client.delete(f"/issues/delete/{ids[0]}/")
+        assert storage.exists(first.image.name)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            user1_client.delete(f"/issues/delete/{ids[1]}/")
+        assert not storage.exists(first.image.name)
+
+    def test_blob_shared_across_extensions(self, user1, dummy_image, django_capture_on_commit_callbacks):
+        print("\n--- Test: Same Bytes, Different Extensions ---")
+        from django.core.files.base import ContentFile
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from .models import IssueImage
+
+        content = dummy_image.read()
+        images = []
+        for ext in ("jpg", "jpeg"):
+            issue = Issue.objects.create(title=ext, description="D", reported_by=user1)
+            upload = SimpleUploadedFile(f"photo.{ext}", content, content_type="image/jpeg")
+            images.append(IssueImage.objects.create(issue=issue, image=upload))
+        jpg, jpeg = images
+        assert jpg.content_hash == jpeg.content_hash and jpg.image.name != jpeg.image.name
+
+        storage = jpg.image.storage
+        stem = jpg.image.name.rsplit(".", 1)[0]
+        thumb = storage.save(f"{stem}_thumb.jpg", ContentFile(b"thumb"))
+        IssueImage.objects.filter(id__in=[jpg.id, jpeg.id]).update(variants={"thumb": thumb})
+
+        # its own file goes, the variants are still used by the other row
+        with django_capture_on_commit_callbacks(execute=True):
+            IssueImage.objects.get(id=jpg.id).delete()
+        assert not storage.exists(jpg.image.name)
+        assert storage.exists(jpeg.image.name) and storage.exists(thumb)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            IssueImage.objects.get(id=jpeg.id).delete()
+        assert not storage.exists(jpeg.image.name) and not storage.exists(thumb)
+
+    def test_dedupe_issue_images(self, user1, dummy_image, django_capture_on_commit_callbacks, monkeypatch):
+        print("\n--- Test: Dedupe Legacy Issue Images ---")
+        from django.core.files.base import ContentFile
+        from .models import IssueImage
+        from .storage import issue_image_storage
+
+        content = dummy_image.read()
+        legacy = []
+        for index in range(2):
+            issue = Issue.objects.create(title=f"Legacy {index}", description="D", reported_by=user1)
+            name = issue_image_storage.save(f"issue_images/{issue.id}/legacy{index}.jpg", ContentFile(content))
+            thumb = issue_image_storage.save(f"issue_images/{issue.id}/legacy{index}_thumb.jpg", ContentFile(b"thumb"))
+            legacy.append(IssueImage.objects.create(issue=issue, image=name, content_hash="", variants={"thumb": thumb}))
+        IssueImage.objects.filter(id__in=[image.id for image in legacy]).update(content_hash="")
+
+        call_command("dedupe_issue_images", "--dry-run")
+        assert all(issue_image_storage.exists(image.image.name) for image in legacy)
+
+        # interrupted before the first row is updated: nothing it names is gone
+        from django.db.models.query import QuerySet
+        def crash(*args, **kwargs):
+            raise RuntimeError("interrupted")
+        with monkeypatch.context() as patched:
+            patched.setattr(QuerySet, "update", crash)
+            with pytest.raises(RuntimeError), django_capture_on_commit_callbacks(execute=True):
+                call_command("dedupe_issue_images")
+        assert all(issue_image_storage.exists(image.image.name) for image in legacy)
+        assert all(issue_image_storage.exists(image.variants["thumb"]) for image in legacy)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            call_command("dedupe_issue_images")
+        first, second = IssueImage.objects.filter(id__in=[image.id for image in legacy]).order_by("id")
+        assert first.image.name == second.image.name
+        assert first.image.name.startswith("issue_images/cas/")
+        assert first.variants == second.variants
+        assert issue_image_storage.exists(first.image.name)
+        assert issue_image_storage.exists(first.variants["thumb"])
+        assert not any(issue_image_storage.exists(image.image.name) for image in legacy)
+
     # --- Update Tests ---
 
     def test_issue_update_owner(self, user1_client, dummy_image):
@@ -165,7 +352,8 @@ class TestIssueLifecycle:
         
         # Verify comment list
         list_resp = user1_client.get(f"/issues/comments/of/{issue_id}/")
-        comments = list_resp.json()['response']
+        comments = list_resp.json()['response']['results']
+        assert list_resp.json()['response']['next'] is None
         assert len(comments) == 1
         assert comments[0]['text'] == "Nice issue"
         comment_id = comments[0]['id']
@@ -179,6 +367,25 @@ class TestIssueLifecycle:
         assert del_resp.status_code == 204
         assert IssueComment.objects.count() == 0
 
+    def test_comments_cursor_pagination(self, user1, user2, user1_client):
+        print("\n--- Test: Comment Thread Pagination ---")
+        issue = Issue.objects.create(title="Long thread", description="D", reported_by=user1)
+        IssueComment.objects.bulk_create(
+            [IssueComment(issue=issue, text=f"Comment {i}", commented_by=user2) for i in range(45)]
+        )
+
+        detail = user1_client.get(f"/issues/of/{issue.id}/").json()['response']
+        assert [c['text'] for c in detail['comments']] == [f"Comment {i}" for i in range(20)]
+        assert detail['comments'][0]['user'] == user2.email
+        assert detail['comments_next']
+
+        texts, cursor = [c['text'] for c in detail['comments']], detail['comments_next']
+        while cursor:
+            page = user1_client.get(f"/issues/comments/of/{issue.id}/", {"cursor": cursor, "limit": 10}).json()['response']
+            texts += [c['text'] for c in page['results']]
+            cursor = page['next']
+        assert texts == [f"Comment {i}" for i in range(45)]
+
     # --- Like Tests ---
 
     def test_like_flow(self, user1_client, user2_client, dummy_image):
@@ -196,7 +403,7 @@ class TestIssueLifecycle:
 
         # Verify likes list
         list_resp = user1_client.get(f"/issues/likes/of/{issue_id}/")
-        likes = list_resp.json()['response']
+        likes = list_resp.json()['response']['results']
         assert len(likes) == 1
         assert likes[0]['user'] == "strela500@gmail.com" # user2 email
 
@@ -206,6 +413,117 @@ class TestIssueLifecycle:
         assert resp.json()['response']['liked'] is False
         assert IssueLike.objects.count() == 0
 
+    def test_likers_pagination(self, user1, user1_client):
+        print("\n--- Test: Likers Pagination ---")
+        from django.contrib.auth import get_user_model
+        User = get_user_model()
+
+        issue = Issue.objects.create(title="Popular", description="D", reported_by=user1)
+        fans = [User.objects.create_user(email=f"fan{i}@example.com", password="Gwen@12345") for i in range(25)]
+        IssueLike.objects.bulk_create([IssueLike(issue=issue, liked_by=fan) for fan in fans])
+        Issue.objects.filter(id=issue.id).update(likes_count=25)
+
+        emails, cursor = [], None
+        while True:
+            params = {"limit": 10, **({"cursor": cursor} if cursor else {})}
+            page = user1_client.get(f"/issues/likes/of/{issue.id}/", params).json()['response']
+            emails += [like['user'] for like in page['results']]
+            cursor = page['next']
+            if not cursor:
+                break
+        # newest first
+        assert emails == [fan.email for fan in reversed(fans)]
+
+        resp = user1_client.get(f"/issues/likes/of/{issue.id}/", {"count_only": "true"})
+        assert resp.json()['response'] == {"count": 25}
+
+    def test_like_create_and_missing_issue(self, user1, user2_client):
+        print("\n--- Test: Like Create / Missing Issue ---")
+        issue = Issue.objects.create(title="Once", description="D", reported_by=user1)
+
+        assert user2_client.post("/issues/likes/create/", {"issue_id": issue.id}).status_code == 201
+        assert user2_client.post("/issues/likes/create/", {"issue_id": issue.id}).status_code == 400
+        issue.refresh_from_db()
+        assert issue.likes_count == 1
+
+        from .likes import NOT_FOUND, toggle_like
+        assert toggle_like(issue.id + 1000, issue.reported_by_id) == NOT_FOUND
+        assert IssueLike.objects.count() == 1
+
+    def test_like_write_behind(self, user1, user2, user1_client, user2_client, settings, tmp_path, django_capture_on_commit_callbacks):
+        print("\n--- Test: Write-Behind Likes ---")
+        from . import like_buffer
+
+        settings.ISSUE_LIKE_WRITE_BEHIND = True
+        settings.ISSUE_LIKE_BUFFER_DIR = tmp_path
+        settings.ISSUE_LIKE_FLUSH_INTERVAL = 3600
+        issue = Issue.objects.create(title="Viral", description="D", reported_by=user1)
+        IssueLike.objects.create(issue=issue, liked_by=user1)
+        Issue.objects.filter(id=issue.id).update(likes_count=1)
+
+        try:
+            # acknowledged, but not written yet
+            assert user2_client.post("/issues/likes/toggle/", {"issue_id": issue.id}).json()['response']['liked'] is True
+            assert user1_client.post("/issues/likes/toggle/", {"issue_id": issue.id}).json()['response']['liked'] is False
+            assert user2_client.post("/issues/likes/create/", {"issue_id": issue.id}).status_code == 400
+            assert IssueLike.objects.get().liked_by == user1
+
+            # reads merge the buffered intents
+            detail = user1_client.get(f"/issues/of/{issue.id}/").json()['response']
+            assert detail['likes_count'] == 1
+            listed = user1_client.get(f"/issues/likes/of/{issue.id}/").json()['response']['results']
+            assert [like['user'] for like in listed] == [user2.email]
+            assert user1_client.get(f"/issues/likes/of/{issue.id}/", {"count_only": "true"}).json()['response'] == {"count": 1}
+
+            # a crashed worker: its log is adopted by the next buffer
+            like_buffer.shutdown(flush=False)
+            with django_capture_on_commit_callbacks(execute=True):
+                assert like_buffer.get_buffer().flush() == 2
+            assert IssueLike.objects.get().liked_by == user2
+            issue.refresh_from_db()
+            assert issue.likes_count == 1
+        finally:
+            like_buffer.shutdown()
+        assert list(tmp_path.iterdir()) == []
+
+    @pytest.mark.django_db(transaction=True)
+    def test_toggle_like_concurrent_taps(self, user1, user2):
+        print("\n--- Test: Concurrent Like Toggles ---")
+        import threading
+        from django.db import connections
+        from .likes import LIKED, UNLIKED, toggle_like
+
+        issue = Issue.objects.create(title="Tap tap", description="D", reported_by=user1)
+        taps = 8
+        barrier = threading.Barrier(taps * 2)
+        results, errors = [], []
+
+        def tap(user_id):
+            try:
+                barrier.wait()
+                results.append(toggle_like(issue.id, user_id))
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connections.close_all()
+
+        threads = [
+            threading.Thread(target=tap, args=(user.id,))
+            for user in (user1, user2)
+            for _ in range(taps)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        assert set(results) <= {LIKED, UNLIKED}
+        # an even number of taps per user always ends unliked
+        issue.refresh_from_db()
+        assert IssueLike.objects.filter(issue=issue).count() == 0
+        assert issue.likes_count == 0
+
     # --- Isolation Tests ---
 
     def test_my_issues_isolation(self, user1_client, user2_client, dummy_image):
@@ -221,16 +539,348 @@ class TestIssueLifecycle:
 
         # User1 checks mine
         resp1 = user1_client.get("/issues/mine/")
-        issues1 = resp1.json()['response']
+        issues1 = resp1.json()['response']['results']
         assert len(issues1) == 1
         assert issues1[0]['title'] == "U1"
 
         # User2 checks mine
         resp2 = user2_client.get("/issues/mine/")
-        issues2 = resp2.json()['response']
+        issues2 = resp2.json()['response']['results']
         assert len(issues2) == 1
         assert issues2[0]['title'] == "U2"
 
+    # --- Detail Cache Tests ---
+
+    def test_detail_cache_invalidation(self, user1, user2, user1_client, user2_client, settings):
+        print("\n--- Test: Detail Cache Invalidation ---")
+        settings.QUERY_INSPECTION_ENABLED = True
+        issue = Issue.objects.create(title="Cached", description="D", reported_by=user1)
+        url = f"/issues/of/{issue.id}/"
+
+        first = user1_client.get(url)
+        cached = user1_client.get(url)
+        assert cached.json() == first.json()
+        # only the auth user lookup is left once the payload is cached
+        assert cached.query_report["count"] < first.query_report["count"]
+
+        user2_client.post("/issues/comments/create/", {"issue_id": issue.id, "text": "Hey"})
+        assert len(user1_client.get(url).json()['response']['comments']) == 1
+
+        user2_client.post("/issues/likes/toggle/", {"issue_id": issue.id})
+        assert user1_client.get(url).json()['response']['likes_count'] == 1
+
+        user1_client.patch(f"/issues/update/{issue.id}/", {"title": "Edited"})
+        assert user1_client.get(url).json()['response']['title'] == "Edited"
+
+        comment_id = IssueComment.objects.get(issue=issue).id
+        user2_client.delete(f"/issues/comments/delete/{comment_id}/")
+        assert user1_client.get(url).json()['response']['comments'] == []
+
+        user1_client.delete(f"/issues/delete/{issue.id}/")
+        assert user1_client.client.get(url).status_code == 404
+
+        # unknown ids leave nothing behind in the cache
+        assert user1_client.client.get("/issues/of/999999/").status_code == 404
+        assert issue_cache._cache().get(issue_cache._version_key(999999)) is None
+
+    def test_detail_cache_off_on_locmem(self, user1, user1_client, settings):
+        print("\n--- Test: Detail Cache Needs A Shared Backend ---")
+        settings.QUERY_INSPECTION_ENABLED = True
+        settings.ISSUE_CACHE_ALIAS = "default"
+        issue = Issue.objects.create(title="Uncached", description="D", reported_by=user1)
+        url = f"/issues/of/{issue.id}/"
+
+        # the first request also loads the user into accounts/user_cache.py
+        user1_client.get(url)
+        first = user1_client.get(url)
+        again = user1_client.get(url)
+        assert again.json() == first.json()
+        assert again.query_report["count"] == first.query_report["count"]
+
+    # --- Conditional GET Tests ---
+
+    @pytest.mark.parametrize("url", ["/issues/of/{id}/", "/issues/comments/of/{id}/", "/issues/likes/of/{id}/"])
+    def test_conditional_get(self, user1, user1_client, user2_client, settings, url):
+        print(f"\n--- Test: Conditional GET {url} ---")
+        settings.QUERY_INSPECTION_ENABLED = True
+        issue = Issue.objects.create(title="Polled", description="D", reported_by=user1)
+        url = url.format(id=issue.id)
+
+        first = user1_client.get(url)
+        etag = first["ETag"]
+        assert first.status_code == 200
+        assert first.has_header("Last-Modified")
+
+        polled = user1_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert polled.status_code == 304
+        assert polled.content == b""
+        assert polled["ETag"] == etag
+        # the validators query, nothing else (the user comes from accounts/user_cache.py)
+        assert polled.query_report["count"] == 1
+
+        polled = user1_client.get(url, HTTP_IF_MODIFIED_SINCE=first["Last-Modified"])
+        assert polled.status_code == 304
+
+        user2_client.post("/issues/likes/toggle/", {"issue_id": issue.id})
+        user2_client.post("/issues/comments/create/", {"issue_id": issue.id, "text": "Hi"})
+
+        changed = user1_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert changed.status_code == 200
+        assert changed["ETag"] != etag
+        assert changed.json()['success'] is True
+
+    # --- Counter Tests ---
+
+    def test_counters_follow_writes(self, user1_client, user2_client, dummy_images):
+        print("\n--- Test: Denormalized Counters ---")
+        payload = {"title": "Count me", "description": "Desc", "uploaded_images": dummy_images}
+        create_resp = user1_client.post("/issues/create/", payload, format='multipart')
+        issue_id = create_resp.json()['response']['id']
+        assert Issue.objects.get(id=issue_id).images_count == 3
+
+        user2_client.post("/issues/comments/create/", {"issue_id": issue_id, "text": "One"})
+        user2_client.post("/issues/comments/create/", {"issue_id": issue_id, "text": "Two"})
+        user2_client.post("/issues/likes/toggle/", {"issue_id": issue_id})
+        user1_client.post("/issues/likes/create/", {"issue_id": issue_id})
+
+        issue = Issue.objects.get(id=issue_id)
+        assert issue.comments_count == 2
+        assert issue.likes_count == 2
+
+        comment_id = IssueComment.objects.filter(issue_id=issue_id).first().id
+        user2_client.delete(f"/issues/comments/delete/{comment_id}/")
+        user2_client.post("/issues/likes/toggle/", {"issue_id": issue_id})
+
+        data = user1_client.get(f"/issues/of/{issue_id}/").json()['response']
+        assert data['likes_count'] == 1
+        assert len(data['comments']) == 1
+
+        issue.refresh_from_db()
+        assert issue.comments_count == 1
+        assert issue.likes_count == 1
+
+    def test_reconcile_issue_counters(self, user1, user2):
+        print("\n--- Test: Reconcile Counters ---")
+        issue = Issue.objects.create(title="Drift", description="D", reported_by=user1)
+        IssueLike.objects.create(issue=issue, liked_by=user2)
+        IssueComment.objects.create(issue=issue, text="Hi", commented_by=user2)
+        Issue.objects.filter(id=issue.id).update(likes_count=7)
+
+        call_command("reconcile_issue_counters", "--dry-run", "--batch-size", "1")
+        issue.refresh_from_db()
+        assert issue.likes_count == 7
+
+        call_command("reconcile_issue_counters", "--batch-size", "1")
+        issue.refresh_from_db()
+        assert issue.likes_count == 1
+        assert issue.comments_count == 1
+        assert issue.images_count == 0
+
+    # --- Feed / Pagination Tests ---
+
+    def test_feed_cursor_pagination(self, user1, user2, user1_client):
+        print("\n--- Test: Feed Cursor Pagination ---")
+        for i in range(5):
+            Issue.objects.create(title=f"Issue {i}", description="D", reported_by=user1)
+            Issue.objects.create(title=f"Other {i}", description="D", reported_by=user2)
+        # force ties on created_at so the id tie-breaker is exercised
+        Issue.objects.update(created_at=Issue.objects.first().created_at)
+
+        seen = []
+        cursor = None
+        while True:
+            url = "/issues/feed/?limit=3" + (f"&cursor={cursor}" if cursor else "")
+            data = user1_client.get(url).json()['response']
+            assert len(data['results']) <= 3
+            seen.extend(issue['id'] for issue in data['results'])
+            cursor = data['next']
+            if cursor is None:
+                break
+
+        expected = list(Issue.objects.order_by("-created_at", "-id").values_list("id", flat=True))
+        assert seen == expected
+
+    def test_feed_filters(self, user1, user1_client):
+        print("\n--- Test: Feed Filters ---")
+        Issue.objects.create(title="Road", description="D", category="roads", reported_by=user1)
+        Issue.objects.create(title="Light", description="D", category="lights", reported_by=user1, is_resolved=True)
+
+        data = user1_client.get("/issues/feed/?category=roads").json()['response']
+        assert [issue['title'] for issue in data['results']] == ["Road"]
+
+        data = user1_client.get("/issues/feed/?is_resolved=true").json()['response']
+        assert [issue['title'] for issue in data['results']] == ["Light"]
+
+        resp = user1_client.get("/issues/feed/?is_resolved=maybe")
+        assert resp.status_code == 400
+
+    def test_viewer_has_liked(self, user1, user2, user1_client, user2_client):
+        print("\n--- Test: viewer_has_liked ---")
+        import base64
+        liked = Issue.objects.create(title="Liked", description="D", reported_by=user1)
+        other = Issue.objects.create(title="Other", description="D", reported_by=user1)
+        user2_client.post("/issues/likes/toggle/", {"issue_id": liked.id})
+
+        feed = user2_client.get("/issues/feed/").json()['response']['results']
+        assert {item['id']: item['viewer_has_liked'] for item in feed} == {liked.id: True, other.id: False}
+        feed = user1_client.get("/issues/feed/").json()['response']['results']
+        assert not any(item['viewer_has_liked'] for item in feed)
+
+        # the cached detail payload is shared, the flag is not
+        assert user2_client.get(f"/issues/of/{liked.id}/").json()['response']['viewer_has_liked'] is True
+        assert user1_client.get(f"/issues/of/{liked.id}/").json()['response']['viewer_has_liked'] is False
+
+        resp = user2_client.post("/issues/likes/state/", {"issue_ids": [other.id, liked.id, 999]}, format='json')
+        data = resp.json()['response']
+        assert data['liked'] == [liked.id]
+        assert base64.b64decode(data['bitmap']) == bytes([0b01000000])
+
+        resp = user2_client.post("/issues/likes/state/", {"issue_ids": list(range(501))}, format='json')
+        assert resp.status_code == 400
+
+    def test_feed_invalid_cursor(self, user1_client):
+        print("\n--- Test: Feed Invalid Cursor ---")
+        resp = user1_client.get("/issues/feed/?cursor=not-a-cursor")
+        assert resp.status_code == 400
+        assert resp.json()['success'] is False
+
+    def test_my_issues_paginated(self, user1, user2, user1_client):
+        print("\n--- Test: My Issues Paginated ---")
+        for i in range(4):
+            Issue.objects.create(title=f"Mine {i}", description="D", reported_by=user1)
+        Issue.objects.create(title="Not mine", description="D", reported_by=user2)
+
+        first = user1_client.get("/issues/mine/?limit=3").json()['response']
+        assert len(first['results']) == 3
+        assert first['next'] is not None
+
+        second = user1_client.get(f"/issues/mine/?limit=3&cursor={first['next']}").json()['response']
+        assert [issue['title'] for issue in second['results']] == ["Mine 0"]
+        assert second['next'] is None
+
+    # --- Search Tests ---
+
+    def test_search_ranked_and_synced(self, user1, user1_client):
+        print("\n--- Test: Full-Text Search ---")
+        in_title = Issue.objects.create(title="Pothole on Main", description="Deep", reported_by=user1)
+        in_text = Issue.objects.create(title="Road", description="A pothole near school", reported_by=user1)
+        Issue.objects.create(title="Streetlight", description="Broken", address="Main Road", reported_by=user1)
+
+        data = user1_client.get("/issues/search/?q=pothole").json()['response']
+        assert [issue['id'] for issue in data['results']] == [in_title.id, in_text.id]
+
+        # prefix match on the last word, address is indexed too
+        data = user1_client.get("/issues/search/?q=streetl").json()['response']
+        assert [issue['title'] for issue in data['results']] == ["Streetlight"]
+        data = user1_client.get("/issues/search/?q=main road").json()['response']
+        assert len(data['results']) == 1
+
+        # triggers keep the index in sync with updates and deletes
+        Issue.objects.filter(id=in_title.id).update(title="Crater on Main", description="Big")
+        in_text.delete()
+        data = user1_client.get("/issues/search/?q=pothole").json()['response']
+        assert data['results'] == []
+        data = user1_client.get("/issues/search/?q=crater").json()['response']
+        assert [issue['id'] for issue in data['results']] == [in_title.id]
+
+    def test_search_pagination_and_filters(self, user1, user1_client):
+        print("\n--- Test: Search Pagination ---")
+        for i in range(5):
+            Issue.objects.create(title=f"Flood {i}", description="Water", category="water", reported_by=user1)
+        Issue.objects.create(title="Flood fixed", description="Water", category="water", reported_by=user1, is_resolved=True)
+
+        seen = []
+        url = "/issues/search/?q=flood&is_resolved=false&limit=2"
+        cursor = None
+        while True:
+            data = user1_client.get(url + (f"&cursor={cursor}" if cursor else "")).json()['response']
+            seen.extend(issue['id'] for issue in data['results'])
+            cursor = data['next']
+            if cursor is None:
+                break
+        assert len(seen) == len(set(seen)) == 5
+
+        data = user1_client.get("/issues/search/?q=flood&category=roads").json()['response']
+        assert data['results'] == []
+
+        assert user1_client.get("/issues/search/?q=%20").status_code == 400
+
+    def test_rebuild_search_index_and_admin(self, user1):
+        print("\n--- Test: Rebuild Search Index / Admin Search ---")
+        from django.contrib.admin.sites import site
+        from django.db import connection
+
+        issue = Issue.objects.create(title="Graffiti wall", description="Paint", reported_by=user1)
+        with connection.cursor() as cursor:
+            cursor.execute("INSERT INTO issues_issue_fts(issues_issue_fts) VALUES ('delete-all')")
+
+        call_command("rebuild_issue_search_index")
+
+        issue_admin = site._registry[Issue]
+        queryset, _ = issue_admin.get_search_results(None, Issue.objects.all(), "graffiti")
+        assert list(queryset) == [issue]
+        # reporters by email or first name prefix, case-insensitive
+        user1.first_name = "Shristi"
+        user1.save()
+        for term in (user1.email, "SHRISTI500@", "shri"):
+            queryset, _ = issue_admin.get_search_results(None, Issue.objects.all(), term)
+            assert list(queryset) == [issue]
+
+    # --- Nearby Tests ---
+
+    def test_issue_creation_with_coordinates(self, user1_client, dummy_image):
+        print("\n--- Test: Create Issue With Coordinates ---")
+        payload = {
+            "title": "Located",
+            "description": "Desc",
+            "latitude": "27.7172",
+            "longitude": "85.3240",
+            "uploaded_images": [dummy_image],
+        }
+        response = user1_client.post("/issues/create/", payload, format='multipart')
+        assert response.status_code == 201
+        issue = Issue.objects.get(id=response.json()['response']['id'])
+        assert issue.geo_cell is not None
+
+        dummy_image.seek(0)
+        payload = {"title": "Half", "description": "Desc", "latitude": "27.7", "uploaded_images": [dummy_image]}
+        response = user1_client.post("/issues/create/", payload, format='multipart')
+        assert response.status_code == 400
+
+    def test_nearby_issues(self, user1, user1_client):
+        print("\n--- Test: Nearby Issues ---")
+        # 0.0018 degrees of latitude is ~200m
+        close = Issue.objects.create(title="Close", description="D", latitude=27.7190, longitude=85.3240, reported_by=user1)
+        closer = Issue.objects.create(title="Closer", description="D", latitude=27.7175, longitude=85.3240, reported_by=user1)
+        Issue.objects.create(title="Far", description="D", latitude=27.7300, longitude=85.3240, reported_by=user1)
+        Issue.objects.create(title="Nowhere", description="D", reported_by=user1)
+
+        data = user1_client.get("/issues/nearby/?lat=27.7172&lon=85.3240&radius=500").json()['response']
+        assert [issue['id'] for issue in data['results']] == [closer.id, close.id]
+        assert 190 < data['results'][1]['distance_m'] < 210
+
+        data = user1_client.get("/issues/nearby/?lat=27.7172&lon=85.3240&radius=2000").json()['response']
+        assert len(data['results']) == 3
+
+        assert user1_client.get("/issues/nearby/?lat=27.7172").status_code == 400
+        assert user1_client.get("/issues/nearby/?lat=27.7&lon=85.3&radius=99999").status_code == 400
+
+    def test_geo_cells_cover_radius(self):
+        print("\n--- Test: Geo Cells Cover Radius ---")
+        from . import geo
+
+        for lat, lon in [(27.7172, 85.324), (64.1, -21.9), (0.0, 179.999), (-33.9, -180.0)]:
+            ranges = geo.cell_ranges(lat, lon, 1000)
+            for bearing in range(0, 360, 15):
+                # a point ~990m away in every direction must fall in a covered cell
+                d_lat = 0.0089 * math.cos(math.radians(bearing))
+                d_lon = 0.0089 * math.sin(math.radians(bearing)) / math.cos(math.radians(lat))
+                p_lat, p_lon = lat + d_lat, (lon + d_lon + 180) % 360 - 180
+                if geo.distance_m(lat, lon, p_lat, p_lon) > 1000:
+                    continue
+                cell = geo.cell_for(p_lat, p_lon)
+                assert any(first <= cell <= last for first, last in ranges)
+
     # --- Edge Cases ---
 
     def test_create_comment_missing_fields(self, user1_client):
@@ -249,3 +899,300 @@ class TestIssueLifecycle:
         assert data['success'] is False
         assert data['error']['message'] == "No Issue matches the given query."
 
+    # --- Streaming Tests ---
+
+    def test_streaming_envelope_matches_renderer(self, user1):
+        print("\n--- Test: Streaming Envelope Parity ---")
+        from rest_framework.response import Response
+        from core.renderers import GlobalResponseRenderer, stream_envelope
+        from .serializers import IssueListSerializer
+
+        for i in range(7):
+            Issue.objects.create(title=f"Ünïcode {i}  ", description="D", reported_by=user1)
+        issues = Issue.objects.select_related("reported_by").prefetch_related("images").order_by("id")
+
+        def serialize(chunk):
+            return IssueListSerializer(chunk, many=True).data
+
+        expected = GlobalResponseRenderer().render(
+            {"results": serialize(list(issues)), "next": None},
+            renderer_context={"response": Response(status=200)},
+        )
+        for chunk_size in (1, 3, 100):
+            streamed = b"".join(stream_envelope(issues.iterator(chunk_size=chunk_size), serialize, chunk_size=chunk_size, next=None))
+            assert streamed == expected
+
+        empty = b"".join(stream_envelope([], serialize))
+        assert empty == GlobalResponseRenderer().render({"results": []}, renderer_context={"response": Response(status=200)})
+
+    def test_fast_serializers_match_drf(self, user1, user2, dummy_images):
+        print("\n--- Test: Compiled Serializer Parity ---")
+        from django.test import RequestFactory
+        from django.utils import timezone
+        from rest_framework.response import Response
+        from core.renderers import GlobalResponseRenderer
+        from .likes import with_viewer_has_liked
+        from .models import IssueImage
+        from .serializers import (
+            IssueCommentSerializer, IssueDetailSerializer, IssueListSerializer,
+            comment_data, issue_detail_data, issue_list_data,
+        )
+
+        located = Issue.objects.create(title="Ünïcode  ", description="D", reported_by=user1, latitude=27.7, longitude=85.3)
+        Issue.objects.create(title="Nowhere", description="", reported_by=user2, is_resolved=True)
+        for n, upload in enumerate(dummy_images[:2]):
+            image = IssueImage.objects.create(issue=located, image=upload, content_hash=f"{n}" * 64)
+        image.variants = {"thumb": "issue_images/cas/thumb.jpg"}
+        image.save(update_fields=["variants"])
+        for user in (user1, user2):
+            IssueComment.objects.create(issue=located, text="Hi", commented_by=user)
+
+        IssueLike.objects.create(issue=located, liked_by=user1)
+        issues = list(with_viewer_has_liked(
+            Issue.objects.select_related("reported_by").prefetch_related("images").order_by("id"), user1
+        ))
+        located = issues[0]
+        located.first_comments = list(located.comments.select_related("commented_by"))
+        located.comments_next = "abc"
+
+        def render(data):
+            return GlobalResponseRenderer().render(data, renderer_context={"response": Response(status=200)})
+
+        assert issue_list_data.many(issues) == IssueListSerializer(issues, many=True).data
+        assert render(issue_list_data.many(issues)) == render(IssueListSerializer(issues, many=True).data)
+        # the detail fields fall back to their defaults when the view did not set them
+        for issue in issues:
+            assert issue_detail_data.one(issue) == IssueDetailSerializer(issue).data
+        context = {"request": RequestFactory().get("/")}
+        assert issue_list_data.many(issues, context=context) == IssueListSerializer(issues, many=True, context=context).data
+        assert issue_list_data.many(issues, context=context)[0]["images"][0]["image"].startswith("http://testserver/")
+
+        with timezone.override("Asia/Kathmandu"):
+            assert issue_list_data.many(issues) == IssueListSerializer(issues, many=True).data
+
+        comments = located.first_comments
+        rows = IssueComment.objects.filter(issue=located).order_by("created_at", "id").values("id", "text", "created_at", "commented_by__email")
+        assert comment_data.many(rows) == comment_data.many(comments) == IssueCommentSerializer(comments, many=True).data
+
+    def test_sparse_fieldsets(self, user1, user1_client):
+        print("\n--- Test: Sparse Fieldsets ---")
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from .models import IssueImage
+
+        issue = Issue.objects.create(title="Sparse", description="Long text", reported_by=user1, latitude=27.7, longitude=85.3)
+        IssueComment.objects.create(issue=issue, text="Hi", commented_by=user1)
+
+        full = user1_client.get("/issues/feed/").json()['response']['results'][0]
+        with CaptureQueriesContext(connection) as queries:
+            resp = user1_client.get("/issues/feed/?fields=id,title,likes_count")
+        item = resp.json()['response']['results'][0]
+        assert item == {"id": issue.id, "title": "Sparse", "likes_count": 0}
+        page_sql = [q['sql'] for q in queries.captured_queries if f'FROM "{Issue._meta.db_table}"' in q['sql']][-1]
+        assert '"description"' not in page_sql and "JOIN" not in page_sql
+        assert IssueLike._meta.db_table not in page_sql
+        # no images prefetch
+        assert not any(IssueImage._meta.db_table in q['sql'] for q in queries.captured_queries)
+
+        item = user1_client.get("/issues/feed/?exclude=description,images").json()['response']['results'][0]
+        assert item == {k: v for k, v in full.items() if k not in ("description", "images")}
+
+        resp = user1_client.get("/issues/feed/?fields=id,secret")
+        assert resp.status_code == 400
+        assert "secret" in resp.json()['error']['details']['fields']
+
+        item = user1_client.get("/issues/nearby/?lat=27.7&lon=85.3&fields=title,distance_m").json()['response']['results'][0]
+        assert item == {"title": "Sparse", "distance_m": 0.0}
+
+        detail = user1_client.get(f"/issues/of/{issue.id}/?fields=title,likes_count,viewer_has_liked").json()['response']
+        assert detail == {"title": "Sparse", "likes_count": 0, "viewer_has_liked": False}
+
+        with CaptureQueriesContext(connection) as queries:
+            resp = user1_client.get(f"/issues/comments/of/{issue.id}/?fields=text")
+        assert resp.json()['response']['results'] == [{"text": "Hi"}]
+        assert not any(IssueComment._meta.db_table in q['sql'] and "JOIN" in q['sql'] for q in queries.captured_queries)
+
+    def test_json_backends_byte_identical(self, user1, user1_client, settings):
+        print("\n--- Test: JSON Encoder Backends ---")
+        pytest.importorskip("orjson")
+        import datetime
+        import decimal
+        import uuid
+        from django.utils.translation import gettext_lazy
+        from core.json_backends import get_backend
+
+        payload = {
+            "aware": datetime.datetime(2025, 1, 2, 3, 4, 5, 678901, tzinfo=datetime.timezone.utc),
+            "naive": datetime.datetime(2025, 1, 2, 3, 4, 5),
+            "date": datetime.date(2025, 1, 2),
+            "time": datetime.time(3, 4, 5, 6000),
+            "decimal": decimal.Decimal("12.345"),
+            "uuid": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+            "text": "Ünïcode 🚧     \x1f \"quoted\" </script>",
+            "lazy": gettext_lazy("Only image files are allowed."),
+            "numbers": [0, -1, 2 ** 53, 1.5, 27.6915, 1e20],
+            1: None,
+        }
+        assert get_backend("orjson").dumps(payload) == get_backend("stdlib").dumps(payload)
+
+        # numbers orjson encodes differently on its own are encoded by stdlib
+        # (the iterator goes through JSONEncoder.default, encoded only once)
+        values = [
+            lambda: 1e-05,
+            lambda: 1e-7,
+            lambda: [27.6915, -2.5e-06],
+            lambda: 2 ** 64,
+            lambda: -2 ** 63 - 1,
+            lambda: {1e-05: 2 ** 64},
+            lambda: iter([1e-7]),
+        ]
+        for value in values:
+            assert get_backend("orjson").dumps({"value": value()}) == get_backend("stdlib").dumps({"value": value()})
+        for value in [lambda: float("nan"), lambda: [1.5, float("inf")], lambda: {-float("inf"): 1}, lambda: iter([float("nan")])]:
+            for backend in ("stdlib", "orjson"):
+                with pytest.raises(ValueError, match="Out of range float values"):
+                    get_backend(backend).dumps({"value": value()})
+
+        Issue.objects.create(title="Encoded ü", description="D", reported_by=user1, latitude=27.7, longitude=85.3)
+        settings.JSON_ENCODER_BACKEND = "stdlib"
+        stdlib = user1_client.get("/issues/mine/").content
+        settings.JSON_ENCODER_BACKEND = "orjson"
+        assert user1_client.get("/issues/mine/").content == stdlib
+
+    def test_my_issues_export(self, user1, user2, user1_client):
+        print("\n--- Test: My Issues Export ---")
+        import json
+        for i in range(5):
+            Issue.objects.create(title=f"Mine {i}", description="D", reported_by=user1)
+        Issue.objects.create(title="Not mine", description="D", reported_by=user2)
+
+        resp = user1_client.get("/issues/mine/export/")
+        assert resp.status_code == 200
+        assert resp.streaming
+        data = json.loads(b"".join(resp.streaming_content))
+        assert data['success'] is True
+        assert [issue['title'] for issue in data['response']['results']] == [f"Mine {i}" for i in reversed(range(5))]
+
+    # --- Batch Tests ---
+
+    def test_batch_requests(self, user1, user2, user2_client):
+        print("\n--- Test: Batch Requests ---")
+        issue = Issue.objects.create(title="Batched", description="D", reported_by=user1)
+        IssueComment.objects.create(issue=issue, text="First", commented_by=user1)
+
+        requests = [
+            {"method": "GET", "path": f"/issues/of/{issue.id}/"},
+            {"method": "GET", "path": f"/issues/comments/of/{issue.id}/", "query": {"limit": 5}},
+            {"method": "POST", "path": "/issues/likes/toggle/", "body": {"issue_id": issue.id}},
+            # sees the like made by the request before it
+            {"method": "GET", "path": f"/issues/likes/of/{issue.id}/"},
+            {"method": "GET", "path": "/profile/me/"},
+            {"method": "GET", "path": "/nowhere/"},
+        ]
+        resp = user2_client.post("/batch/", {"requests": requests}, format='json')
+        assert resp.status_code == 200
+        results = resp.json()['response']['results']
+
+        assert [r['status'] for r in results] == [200, 200, 200, 200, 200, 404]
+        assert results[0]['body']['title'] == "Batched"
+        assert results[1]['body']['results'][0]['text'] == "First"
+        assert results[2]['body'] == {"liked": True}
+        assert [like['user'] for like in results[3]['body']['results']] == [user2.email]
+        assert results[4]['body']['email'] == user2.email
+
+        # conditional sub-requests
+        etag = results[3]['headers']['ETag']
+        again = [{"method": "GET", "path": f"/issues/likes/of/{issue.id}/", "headers": {"If-None-Match": etag}}]
+        result = user2_client.post("/batch/", {"requests": again}, format='json').json()['response']['results'][0]
+        assert result['status'] == 304 and result['body'] is None
+
+        # streamed exports can't be batched
+        export = [{"method": "GET", "path": "/issues/mine/export/"}]
+        result = user2_client.post("/batch/", {"requests": export}, format='json').json()['response']['results'][0]
+        assert result['status'] == 404
+
+        resp = user2_client.post("/batch/", {"requests": requests, "parallel": True}, format='json')
+        assert resp.status_code == 400
+        resp = user2_client.post("/batch/", {"requests": requests * 5}, format='json')
+        assert resp.status_code == 400
+
+    @pytest.mark.django_db(transaction=True)
+    def test_batch_parallel_reads(self, user1, user1_client):
+        print("\n--- Test: Parallel Batch Reads ---")
+        issues = [Issue.objects.create(title=f"P{i}", description="D", reported_by=user1) for i in range(4)]
+        requests = [{"method": "GET", "path": f"/issues/of/{issue.id}/"} for issue in issues]
+
+        resp = user1_client.post("/batch/", {"requests": requests, "parallel": True}, format='json')
+        results = resp.json()['response']['results']
+        assert [r['body']['title'] for r in results] == ["P0", "P1", "P2", "P3"]
+
+        # in order, one snapshot from a read transaction which doesn't take the write lock
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        with CaptureQueriesContext(connection) as queries:
+            resp = user1_client.post("/batch/", {"requests": requests}, format='json')
+        assert [r['body']['title'] for r in resp.json()['response']['results']] == ["P0", "P1", "P2", "P3"]
+        begins = [q['sql'] for q in queries.captured_queries if q['sql'].startswith("BEGIN")]
+        assert begins == ["BEGIN DEFERRED"]
+        assert connection.transaction_mode == "IMMEDIATE"
+
+
+
+@pytest.mark.django_db
+class TestQueryBudgets:
+    """
+    Every read endpoint declares a `query_budget`, these tests hold it to it
+    and make sure no endpoint queries once per row (N+1).
+    """
+
+    @pytest.fixture
+    def busy_issue(self, user1, user2, admin_user):
+        issue = Issue.objects.create(
+            title="Busy", description="D", latitude=27.7, longitude=85.3, reported_by=user1
+        )
+        for i in range(2):
+            Issue.objects.create(
+                title=f"Other {i}", description="D", latitude=27.7, longitude=85.3, reported_by=user2
+            )
+        for user in (user1, user2, admin_user):
+            IssueComment.objects.create(issue=issue, text="Hi", commented_by=user)
+            IssueLike.objects.create(issue=issue, liked_by=user)
+        return issue
+
+    @pytest.fixture(autouse=True)
+    def enable_inspection(self, settings):
+        settings.QUERY_INSPECTION_ENABLED = True
+
+    @pytest.mark.parametrize(
+        "url, view",
+        [
+            ("/issues/feed/", IssueFeedView),
+            ("/issues/search/?q=busy", IssueSearchView),
+            ("/issues/nearby/?lat=27.7&lon=85.3", IssueNearbyView),
+            ("/issues/mine/", MyIssuesView),
+            ("/issues/of/{id}/", IssueDetailView),
+            ("/issues/comments/of/{id}/", IssueCommentsView),
+            ("/issues/likes/of/{id}/", IssueLikesView),
+        ],
+    )
+    def test_endpoint_within_budget(self, user1_client, busy_issue, url, view):
+        print(f"\n--- Test: Query Budget {view.__name__} ---")
+        response = user1_client.get(url.format(id=busy_issue.id))
+        report = response.query_report
+
+        print(f"Report: {report}")
+        assert response.status_code == 200
+        assert report["budget"] == view.query_budget
+        assert not report["over_budget"]
+        assert report["n_plus_one"] == []
+        assert response["X-Query-Count"] == str(report["count"])
+
+    def test_recorder_flags_n_plus_one(self, busy_issue):
+        print("\n--- Test: Recorder Flags N+1 ---")
+        with QueryRecorder() as recorder:
+            [comment.commented_by.email for comment in IssueComment.objects.all()]
+
+        assert recorder.count == 4
+        (template, times), = recorder.n_plus_one()
+        assert times == 3
+        assert "accounts_user" in template
@@ -1,24 +1,136 @@
+import base64
+
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
 
+from .counters import adjust_counter
 from .models import Issue, IssueComment, IssueLike
 from .permissions import IsOwnerOrStaff
 from .serializers import (
     IssueCreateSerializer,
-    IssueListSerializer,
     IssueDetailSerializer,
+    IssueListSerializer,
     IssueUpdateSerializer,
     IssueCommentSerializer,
+    comment_data,
+    issue_detail_data,
+    issue_list_data,
 )
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import F, Q
 from django.shortcuts import get_object_or_404
 
+from rest_framework.exceptions import ValidationError
 from rest_framework.generics import UpdateAPIView, DestroyAPIView
 from rest_framework.permissions import IsAdminUser
 
+from core.fieldsets import Fieldset
+from core.renderers import StreamingEnvelopeResponse
+from core.uploads import StreamingUploadMixin
+from core.pagination import KeysetPaginator, decode_cursor, encode_cursor, get_page_size
+from . import cache as issue_cache
+from . import geo, likes, search
+from .conditional import conditional_issue_get
+
+User = get_user_model()
+
+
+def _is_resolved_param(params):
+    """
+    Parse the optional `is_resolved` query parameter, None when not given.
+    """
+    is_resolved = params.get("is_resolved")
+    if is_resolved in (None, ""):
+        return None
+
+    value = is_resolved.lower()
+    if value in ("true", "1"):
+        return True
+    if value in ("false", "0"):
+        return False
+    raise ValidationError({"is_resolved": "is_resolved must be true or false."})
+
+
+def _filter_issues(queryset, params):
+    """
+    Apply the optional `category` and `is_resolved` query filters of the feeds.
+    """
+    category = params.get("category")
+    if category:
+        queryset = queryset.filter(category=category)
+
+    is_resolved = _is_resolved_param(params)
+    if is_resolved is not None:
+        queryset = queryset.filter(is_resolved=is_resolved)
+
+    return queryset
+
+
+def _issue_rows(queryset, fieldset, user):
+    """
+    `queryset` loading only what the selected IssueListSerializer fields need.
+    """
+    # the pagination keys, always read
+    queryset = fieldset.apply(queryset, keep=("created_at",))
+    if "viewer_has_liked" in fieldset:
+        queryset = likes.with_viewer_has_liked(queryset, user)
+    return queryset
+
+
+def _issue_results(issues, fieldset, user):
+    if "viewer_has_liked" in fieldset:
+        likes.apply_pending_viewer_state(issues, user)
+    return issue_list_data.many(issues, fields=fieldset.names)
+
+
+def _merge_pending_likes(issue_id, rows, pending, add=True):
+    """
+    Apply buffered like/unlike intents (issues/like_buffer.py) to a page of like rows,
+    `add` puts the buffered likes not stored yet in front of it.
+    """
+    rows = [row for row in rows if pending.get(row["liked_by_id"], (True,))[0]]
+    if not add:
+        return rows
+
+    stored = set(
+        IssueLike.objects.filter(issue_id=issue_id, liked_by_id__in=pending).values_list(
+            "liked_by_id", flat=True
+        )
+    )
+    added = [
+        user_id for user_id, (liked, _) in pending.items() if liked and user_id not in stored
+    ]
+    emails = dict(User.objects.filter(id__in=added).values_list("id", "email"))
+    new_rows = [
+        {"user": emails[user_id], "created_at": pending[user_id][1], "liked_by_id": user_id}
+        for user_id in added
+        if user_id in emails
+    ]
+    return sorted(new_rows, key=lambda row: row["created_at"], reverse=True) + rows
+
+
+def _comment_thread(issue_id, fieldset=None):
+    """
+    Comments of an issue with their author's email joined in, nothing else loaded
+    (only the selected fields with a sparse fieldset).
+    """
+    fieldset = fieldset or Fieldset(IssueCommentSerializer)
+    return fieldset.apply(
+        IssueComment.objects.filter(issue_id=issue_id), keep=("created_at",)
+    )
 
-class IssueCreateView(APIView):
+
+def _paginate_comments(issue_id, request, fieldset=None):
+    # oldest first, same order as IssueComment.Meta.ordering
+    return KeysetPaginator(descending=False).paginate(
+        _comment_thread(issue_id, fieldset), request
+    )
+
+
+class IssueCreateView(StreamingUploadMixin, APIView):
     """
     Create a new issue with images.
 
@@ -27,8 +139,13 @@ class IssueCreateView(APIView):
     - description: string (required)
     - category: string (required)
     - address: string (optional)
+    - latitude: float (optional, required together with longitude)
+    - longitude: float (optional, required together with latitude)
     - uploaded_images: file[] (required,minimum of 1 max of 10, at least 1-10 images)
 
+    Uploads are streamed to disk and checked while they arrive (see core/uploads.py),
+    oversized requests get a 413 and non-image files a 400 before being read completely.
+
     **Response:** Created issue object with status 201
     """
 
@@ -60,20 +177,258 @@ class IssueCreateView(APIView):
 
 class MyIssuesView(APIView):
     """
-    Get all issues reported by the authenticated user.
+    Get the issues reported by the authenticated user, newest first.
+
+    **Query Parameters:**
+    - cursor: string (optional, the `next` value of the previous page)
+    - limit: integer (optional, default 20, max 100)
+    - category: string (optional)
+    - is_resolved: boolean (optional)
+    - fields, exclude: comma separated field names (optional, see core/fieldsets.py)
+
+    **Response:**
+    {
+        "results": list of issue objects with images and counts,
+        "next": string or null (cursor of the next page)
+    }
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    # auth user, issues page, images
+    query_budget = 3
+
+    def get(self, request):
+        fieldset = Fieldset.from_request(request, IssueListSerializer)
+        issues = _filter_issues(
+            Issue.objects.filter(reported_by_id=request.user.id), request.query_params
+        )
+        issues = _issue_rows(issues, fieldset, request.user)
+
+        page = KeysetPaginator().paginate(issues, request)
+        return Response(page.payload(_issue_results(page.items, fieldset, request.user)))
+
+
+class MyIssuesExportView(APIView):
+    """
+    Export every issue reported by the authenticated user, newest first.
 
-    **Response:** List of issue objects with images and counts
+    Streamed: issues are read, serialized and encoded in chunks, so memory use
+    does not grow with the number of issues.
+
+    **Query Parameters:**
+    - fields, exclude: comma separated field names (optional, see core/fieldsets.py)
+
+    **Response:**
+    {
+        "results": list of issue objects with images and counts
+    }
     """
 
     permission_classes = [IsAuthenticated]
+    # the body is never in response.data, see core/batch.py
+    streams_response = True
+
+    CHUNK_SIZE = 200
+
+    def get(self, request):
+        fieldset = Fieldset.from_request(request, IssueListSerializer)
+        issues = _issue_rows(
+            Issue.objects.filter(reported_by_id=request.user.id).order_by("-created_at", "-id"),
+            fieldset,
+            request.user,
+        )
+
+        def serialize(chunk):
+            return _issue_results(chunk, fieldset, request.user)
+
+        return StreamingEnvelopeResponse(
+            issues.iterator(chunk_size=self.CHUNK_SIZE),
+            serialize,
+            chunk_size=self.CHUNK_SIZE,
+        )
+
+
+class IssueFeedView(APIView):
+    """
+    Town-wide feed of all issues, newest first.
+
+    Paginated with opaque cursors over (created_at, id) so deep pages cost the
+    same as the first one.
+
+    **Query Parameters:**
+    - cursor: string (optional, the `next` value of the previous page)
+    - limit: integer (optional, default 20, max 100)
+    - category: string (optional)
+    - is_resolved: boolean (optional)
+    - fields, exclude: comma separated field names (optional, see core/fieldsets.py)
+
+    **Response:**
+    {
+        "results": list of issue objects with images and counts,
+        "next": string or null (cursor of the next page)
+    }
+    """
+
+    # auth user, issues page, images
+    query_budget = 3
 
     def get(self, request):
-        issues = Issue.objects.filter(reported_by=request.user).prefetch_related(
-            "images", "comments", "likes"
+        fieldset = Fieldset.from_request(request, IssueListSerializer)
+        issues = _filter_issues(Issue.objects.all(), request.query_params)
+        issues = _issue_rows(issues, fieldset, request.user)
+
+        page = KeysetPaginator().paginate(issues, request)
+        return Response(page.payload(_issue_results(page.items, fieldset, request.user)))
+
+
+class IssueSearchView(APIView):
+    """
+    Full-text search over issue title, description and address, best match first.
+
+    **Query Parameters:**
+    - q: string (required)
+    - cursor: string (optional, the `next` value of the previous page)
+    - limit: integer (optional, default 20, max 100)
+    - category: string (optional)
+    - is_resolved: boolean (optional)
+    - fields, exclude: comma separated field names (optional, see core/fieldsets.py)
+
+    **Response:**
+    {
+        "results": list of issue objects with images and counts,
+        "next": string or null (cursor of the next page)
+    }
+    """
+
+    # auth user, ranked ids, issues, images
+    query_budget = 4
+
+    def get(self, request):
+        fieldset = Fieldset.from_request(request, IssueListSerializer)
+        match = search.build_match_query(request.query_params.get("q"))
+        if match is None:
+            return Response(
+                {"detail": "q is mandatory but not given"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        after = None
+        cursor = request.query_params.get("cursor")
+        if cursor:
+            rank, issue_id = decode_cursor(cursor, 2)
+            if not isinstance(rank, (int, float)) or not isinstance(issue_id, int):
+                raise ValidationError({"cursor": "Invalid cursor."})
+            after = (rank, issue_id)
+
+        size = get_page_size(request)
+        rows = search.search_issue_ids(
+            match,
+            category=request.query_params.get("category"),
+            is_resolved=_is_resolved_param(request.query_params),
+            after=after,
+            limit=size + 1,
+        )
+
+        next_cursor = None
+        if len(rows) > size:
+            rows = rows[:size]
+            last_id, last_rank = rows[-1]
+            next_cursor = encode_cursor([last_rank, last_id])
+
+        issues = _issue_rows(Issue.objects.all(), fieldset, request.user).in_bulk(
+            [issue_id for issue_id, _ in rows]
         )
+        ordered = [issues[issue_id] for issue_id, _ in rows if issue_id in issues]
 
-        serializer = IssueListSerializer(issues, many=True)
-        return Response(serializer.data)
+        results = _issue_results(ordered, fieldset, request.user)
+        return Response({"results": results, "next": next_cursor})
+
+
+class IssueNearbyView(APIView):
+    """
+    Issues reported within a radius of a point, closest first.
+
+    Candidates are pruned with the indexed grid cell of each issue, then filtered
+    on the exact distance (see issues/geo.py).
+
+    **Query Parameters:**
+    - lat: float (required)
+    - lon: float (required)
+    - radius: integer meters (optional, default 500, max 5000)
+    - limit: integer (optional, default 20, max 100)
+    - category: string (optional)
+    - is_resolved: boolean (optional)
+    - fields, exclude: comma separated field names (optional, see core/fieldsets.py)
+
+    **Response:**
+    {
+        "results": list of issue objects with an extra "distance_m" field
+    }
+    """
+
+    DEFAULT_RADIUS_M = 500
+    MAX_RADIUS_M = 5000
+
+    # auth user, candidates, issues, images
+    query_budget = 4
+
+    def _coordinate(self, params, name, bound):
+        raw = params.get(name)
+        if raw in (None, ""):
+            raise ValidationError({name: f"{name} is mandatory but not given"})
+        try:
+            value = float(raw)
+        except ValueError:
+            raise ValidationError({name: f"{name} must be a number."})
+        if not -bound <= value <= bound:
+            raise ValidationError({name: f"{name} must be between -{bound} and {bound}."})
+        return value
+
+    def get(self, request):
+        params = request.query_params
+        fieldset = Fieldset.from_request(request, IssueListSerializer, extra=["distance_m"])
+        lat = self._coordinate(params, "lat", 90)
+        lon = self._coordinate(params, "lon", 180)
+
+        try:
+            radius = float(params.get("radius") or self.DEFAULT_RADIUS_M)
+        except ValueError:
+            raise ValidationError({"radius": "radius must be a number."})
+        if not 0 < radius <= self.MAX_RADIUS_M:
+            raise ValidationError(
+                {"radius": f"radius must be between 0 and {self.MAX_RADIUS_M} meters."}
+            )
+
+        size = get_page_size(request)
+
+        in_cells = Q()
+        for first, last in geo.cell_ranges(lat, lon, radius):
+            in_cells |= Q(geo_cell__range=(first, last))
+
+        candidates = _filter_issues(Issue.objects.filter(in_cells), params)
+
+        nearby = []
+        for issue_id, issue_lat, issue_lon in candidates.values_list(
+            "id", "latitude", "longitude"
+        ):
+            distance = geo.distance_m(lat, lon, issue_lat, issue_lon)
+            if distance <= radius:
+                nearby.append((distance, issue_id))
+        nearby = sorted(nearby)[:size]
+
+        issues = _issue_rows(Issue.objects.all(), fieldset, request.user).in_bulk(
+            [issue_id for _, issue_id in nearby]
+        )
+        ordered = [issues[issue_id] for _, issue_id in nearby if issue_id in issues]
+
+        results = _issue_results(ordered, fieldset, request.user)
+        if "distance_m" in fieldset:
+            distances = {issue_id: distance for distance, issue_id in nearby}
+            for issue, item in zip(ordered, results):
+                item["distance_m"] = round(distances[issue.id], 1)
+
+        return Response({"results": results})
 
 
 class IssueDetailView(APIView):
@@ -82,31 +437,82 @@ class IssueDetailView(APIView):
 
     **URL Parameter:** issue_id (integer)
 
-    **Response:** Detailed issue object with images, comments, and likes
+    **Query Parameters:**
+    - fields, exclude: comma separated field names (optional, see core/fieldsets.py)
+
+    **Response:** Detailed issue object with images, likes and the first page of
+    comments; `comments_next` is the cursor of the next page for IssueCommentsView
     """
 
+    COMMENTS_FIRST_PAGE = 20
+
+    # auth user, validators, issue, images, comments, viewer like (no more than 3 when cached)
+    query_budget = 6
+
+    # 404 before get_version, which would create a version key for any id asked
+    @conditional_issue_get("detail", lookup="issue_id", must_exist=True)
     def get(self, request, issue_id):
-        issue = get_object_or_404(
-            Issue.objects.prefetch_related("images", "comments", "likes"), id=issue_id
-        )
+        fieldset = Fieldset.from_request(request, IssueDetailSerializer)
+
+        # read the version before the data, see issues/cache.py
+        version = issue_cache.get_version(issue_id)
+        payload = issue_cache.get_detail(issue_id, version)
+
+        if payload is None:
+            issue = get_object_or_404(
+                Issue.objects.select_related("reported_by").prefetch_related("images"),
+                id=issue_id,
+            )
+            # only the first page of the thread, the rest comes from IssueCommentsView
+            page = KeysetPaginator(
+                descending=False, page_size=self.COMMENTS_FIRST_PAGE
+            ).paginate(_comment_thread(issue_id))
+            issue.first_comments = page.items
+            issue.comments_next = page.next_cursor
+            payload = issue_detail_data.one(issue)
+            issue_cache.set_detail(issue_id, version, payload)
+
+        # per viewer state and likes still in the write-behind buffer are
+        # never stored in the shared cache
+        payload = dict(fieldset.prune(payload))
+        if "likes_count" in fieldset:
+            delta = likes.likes_count_delta(issue_id, likes.pending_for_issue(issue_id))
+            payload["likes_count"] += delta
+        if "viewer_has_liked" in fieldset:
+            payload["viewer_has_liked"] = issue_id in likes.liked_issue_ids(
+                request.user, [issue_id]
+            )
 
-        serializer = IssueDetailSerializer(issue)
-        return Response(serializer.data)
+        return Response(payload)
 
 
 class IssueCommentsView(APIView):
     """
-    Get all comments for a specific issue.
+    Get the comments of a specific issue, oldest first.
 
     **URL Parameter:** id (integer)
 
-    **Response:** List of comment objects
+    **Query Parameters:**
+    - cursor: string (optional, the `next` value of the previous page, or the
+      `comments_next` value of the issue detail)
+    - limit: integer (optional, default 20, max 100)
+    - fields, exclude: comma separated field names (optional, see core/fieldsets.py)
+
+    **Response:**
+    {
+        "results": list of comment objects,
+        "next": string or null (cursor of the next page)
+    }
     """
 
+    # auth user, validators, comments page
+    query_budget = 3
+
+    @conditional_issue_get("comments")
     def get(self, request, id):
-        comments = IssueComment.objects.filter(issue_id=id)
-        serializer = IssueCommentSerializer(comments, many=True)
-        return Response(serializer.data)
+        fieldset = Fieldset.from_request(request, IssueCommentSerializer)
+        page = _paginate_comments(id, request, fieldset)
+        return Response(page.payload(comment_data.many(page.items, fields=fieldset.names)))
 
 
 class CreateCommentView(APIView):
@@ -148,9 +554,12 @@ class CreateCommentView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        comment = IssueComment.objects.create(
-            issue_id=issue_id, text=text, commented_by=request.user
-        )
+        with transaction.atomic():
+            IssueComment.objects.create(
+                issue_id=issue_id, text=text, commented_by=request.user
+            )
+            adjust_counter(issue_id, "comments_count", 1)
+            issue_cache.invalidate_issue(issue_id)
 
         return Response(
             {"message": "Comment added successfully"}, status=status.HTTP_201_CREATED
@@ -176,12 +585,16 @@ class LikeCreateView(APIView):
 
         if not issue_id:
             return Response({"detail": "issue_id required"}, status=400)
+        try:
+            issue_id = int(issue_id)
+        except (TypeError, ValueError):
+            return Response({"detail": "issue_id must be an integer"}, status=400)
 
-        like, created = IssueLike.objects.get_or_create(
-            issue_id=issue_id, liked_by=request.user
-        )
+        result = likes.add_like(issue_id, request.user.id)
 
-        if not created:
+        if result == likes.NOT_FOUND:
+            return Response({"detail": "Issue not found"}, status=404)
+        if result == likes.ALREADY_LIKED:
             return Response({"detail": "Already liked"}, status=400)
 
         return Response({"message": "Liked"}, status=201)
@@ -200,6 +613,8 @@ class ToggleLikeView(APIView):
     {
         "liked": boolean (true if liked, false if unliked)
     }
+
+    One conditional insert or delete, see issues/likes.py; safe under concurrent taps.
     """
 
     permission_classes = [IsAuthenticated]
@@ -207,30 +622,122 @@ class ToggleLikeView(APIView):
     def post(self, request):
         issue_id = request.data.get("issue_id")
 
-        like = IssueLike.objects.filter(issue_id=issue_id, liked_by=request.user)
+        if not issue_id:
+            return Response({"detail": "issue_id required"}, status=400)
+        try:
+            issue_id = int(issue_id)
+        except (TypeError, ValueError):
+            return Response({"detail": "issue_id must be an integer"}, status=400)
+
+        result = likes.toggle_like(issue_id, request.user.id)
+
+        if result == likes.NOT_FOUND:
+            return Response({"detail": "Issue not found"}, status=404)
+
+        return Response({"liked": result == likes.LIKED})
+
 
-        if like.exists():
-            like.delete()
-            return Response({"liked": False})
+class IssueLikeStateView(APIView):
+    """
+    Like state of the current user for a batch of issues.
+
+    **Request Format (JSON):**
+    {
+        "issue_ids": list of integers (required, at most 500)
+    }
 
-        IssueLike.objects.create(issue_id=issue_id, liked_by=request.user)
+    **Response:**
+    {
+        "liked": list of the given issue ids the user likes,
+        "bitmap": base64 string, bit i (most significant bit first) set when
+                  issue_ids[i] is liked
+    }
+    """
+
+    MAX_IDS = 500
+
+    permission_classes = [IsAuthenticated]
+
+    # auth user, likes
+    query_budget = 2
+
+    def post(self, request):
+        issue_ids = request.data.get("issue_ids")
+
+        if not isinstance(issue_ids, list) or not issue_ids:
+            raise ValidationError({"issue_ids": "issue_ids must be a non-empty list."})
+        if len(issue_ids) > self.MAX_IDS:
+            raise ValidationError(
+                {"issue_ids": f"At most {self.MAX_IDS} issue ids are allowed."}
+            )
+        if not all(type(issue_id) is int for issue_id in issue_ids):
+            raise ValidationError({"issue_ids": "issue_ids must be integers."})
 
-        return Response({"liked": True})
+        liked = likes.liked_issue_ids(request.user, issue_ids)
+
+        bits = bytearray((len(issue_ids) + 7) // 8)
+        for index, issue_id in enumerate(issue_ids):
+            if issue_id in liked:
+                bits[index // 8] |= 0x80 >> (index % 8)
+
+        return Response(
+            {
+                "liked": [issue_id for issue_id in issue_ids if issue_id in liked],
+                "bitmap": base64.b64encode(bytes(bits)).decode(),
+            }
+        )
 
 
 class IssueLikesView(APIView):
     """
-    Get all likes for a specific issue.
+    Get the likes of a specific issue, newest first.
 
     **URL Parameter:** id (integer)
 
-    **Response:** List of objects with user email and timestamp
+    **Query Parameters:**
+    - cursor: string (optional, the `next` value of the previous page)
+    - limit: integer (optional, default 20, max 100)
+    - count_only: boolean (optional, only return the number of likes)
+
+    **Response:**
+    {
+        "results": list of objects with user email and timestamp,
+        "next": string or null (cursor of the next page)
+    }
+    or, with count_only=true:
+    {
+        "count": integer
+    }
     """
 
+    # auth user, validators, likes page (or count)
+    query_budget = 3
+
+    @conditional_issue_get("likes")
     def get(self, request, id):
-        likes = IssueLike.objects.filter(issue_id=id)
+        pending = likes.pending_for_issue(id)
+
+        if request.query_params.get("count_only", "").lower() in ("true", "1"):
+            count = get_object_or_404(
+                Issue.objects.values_list("likes_count", flat=True), id=id
+            )
+            return Response({"count": count + likes.likes_count_delta(id, pending)})
+
+        # plain rows with the email joined in, no model instances
+        rows = IssueLike.objects.filter(issue_id=id).values(
+            "id", "created_at", "liked_by_id", user=F("liked_by__email")
+        )
+        page = KeysetPaginator().paginate(rows, request)
+
+        rows = page.items
+        if pending:
+            # buffered likes are the newest, they only show up on the first page
+            rows = _merge_pending_likes(
+                id, rows, pending, add=not request.query_params.get("cursor")
+            )
+
         return Response(
-            [{"user": like.liked_by.email, "time": like.created_at} for like in likes]
+            page.payload([{"user": row["user"], "time": row["created_at"]} for row in rows])
         )
 
 
@@ -246,6 +753,8 @@ class IssueUpdateView(UpdateAPIView):
         "description": string (optional),
         "category": string (optional),
         "address": string (optional),
+        "latitude": float (optional),
+        "longitude": float (optional),
         "is_resolved": boolean (optional)
     }
 
@@ -257,6 +766,10 @@ class IssueUpdateView(UpdateAPIView):
     permission_classes = [IsOwnerOrStaff]
     lookup_field = "id"
 
+    def perform_update(self, serializer):
+        issue = serializer.save()
+        issue_cache.invalidate_issue(issue.id)
+
 
 class IssueDeleteView(DestroyAPIView):
     """
@@ -271,6 +784,11 @@ class IssueDeleteView(DestroyAPIView):
     permission_classes = [IsOwnerOrStaff]
     lookup_field = "id"
 
+    def perform_destroy(self, instance):
+        issue_id = instance.id
+        instance.delete()
+        issue_cache.invalidate_issue(issue_id)
+
 
 class CommentDeleteView(DestroyAPIView):
     """
@@ -285,6 +803,12 @@ class CommentDeleteView(DestroyAPIView):
     permission_classes = [IsOwnerOrStaff]
     lookup_field = "id"
 
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            instance.delete()
+            adjust_counter(instance.issue_id, "comments_count", -1)
+            issue_cache.invalidate_issue(instance.issue_id)
+
 
 class AdminIssueDeleteView(DestroyAPIView):
     """
@@ -298,3 +822,8 @@ class AdminIssueDeleteView(DestroyAPIView):
     queryset = Issue.objects.all()
     permission_classes = [IsAdminUser]
     lookup_field = "id"
+
+    def perform_destroy(self, instance):
+        issue_id = instance.id
+        instance.delete()
+        issue_cache.invalidate_issue(issue_id)
@@ -85,8 +85,16 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    # our SQL query recorder / query budget checker
+    "core.middleware.QueryInspectionMiddleware",
 ]
 
+# Query inspection (see core/middleware.py)
+# records the SQL of each request, checks it against the view's `query_budget`
+# and logs possible N+1 patterns. Meant for development and tests.
+QUERY_INSPECTION_ENABLED = DEBUG
+QUERY_INSPECTION_N_PLUS_ONE_THRESHOLD = 3
+
 ROOT_URLCONF = "main_app.urls"
 
 AUTH_USER_MODEL = "accounts.User"
@@ -117,10 +125,85 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        "OPTIONS": {
+            # take the write lock at BEGIN and wait for it, instead of failing with
+            # "database is locked" when two transactions upgrade to writing at once
+            "transaction_mode": "IMMEDIATE",
+            "timeout": 20,
+        },
     }
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/6.0/topics/cache/
+# locmem is per process; "issues" is shared by the workers (file based), it can
+# also be the database cache table (run `python manage.py createcachetable` first)
+#   "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+#   "LOCATION": "townspark_cache",
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "townspark",
+    },
+    "issues": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": BASE_DIR / "var" / "cache" / "issues",
+        "OPTIONS": {"MAX_ENTRIES": 10000},
+    },
+}
+
+# cache alias and lifetime (seconds) of the serialized issue payloads, see issues/cache.py
+# (must be shared by the workers, the detail cache is off on a locmem alias)
+ISSUE_CACHE_ALIAS = "issues"
+ISSUE_DETAIL_CACHE_TIMEOUT = 300
+
+# upload limits enforced while streaming, see core/uploads.py
+UPLOAD_MAX_FILE_SIZE = 15 * 1024 * 1024
+UPLOAD_MAX_REQUEST_SIZE = 100 * 1024 * 1024
+
+# background generation of issue image thumbnails, see issues/derivatives.py
+ISSUE_IMAGE_VARIANT_WORKERS = 2
+ISSUE_IMAGE_VARIANT_MAX_PENDING = 100
+
+# write-behind buffering of like/unlike intents, see issues/like_buffer.py
+ISSUE_LIKE_WRITE_BEHIND = False
+ISSUE_LIKE_BUFFER_DIR = BASE_DIR / "var" / "like_buffer"
+ISSUE_LIKE_FLUSH_INTERVAL = 1.0
+
+# json encoder of the API responses: "stdlib", "orjson" or "auto", see core/json_backends.py
+JSON_ENCODER_BACKEND = "stdlib"
+
+# users resolved by CustomJWTAuthentication, see accounts/user_cache.py
+# (TTL in seconds, 0 disables it; the alias adds a cache shared by the workers)
+AUTH_USER_CACHE_SIZE = 10000
+AUTH_USER_CACHE_TTL = 30
+AUTH_USER_CACHE_ALIAS = None
+
+# trust the user claims of access tokens instead of loading the user, see accounts/auth.py
+# ("writes": token_version checked for unsafe methods only, "always": on every request)
+AUTH_STATELESS_CLAIMS = False
+AUTH_TOKEN_VERSION_CHECK = "writes"
+
+# login/ and the password change served by the async views hashing in a bounded
+# pool, for ASGI deployments, see accounts/hashing.py
+# (workers: hashes at once, max pending: running + waiting before answering 503)
+AUTH_ASYNC_VIEWS = False
+AUTH_HASHING_WORKERS = 2
+AUTH_HASHING_MAX_PENDING = 32
+
+# rotated and logged out refresh tokens, see accounts/revocation.py (the Bloom
+# filter is sized for the capacity, the sync interval is in seconds)
+AUTH_REVOCATION_BLOOM_CAPACITY = 100000
+AUTH_REVOCATION_BLOOM_ERROR_RATE = 0.001
+AUTH_REVOCATION_SYNC_INTERVAL = 10
+
+# /batch/ endpoint limits, see core/batch.py
+BATCH_MAX_REQUESTS = 20
+BATCH_MAX_WORKERS = 4
+
+
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
 
@@ -22,11 +22,14 @@ from django.urls import include
 from django.conf import settings
 from django.conf.urls.static import static
 
+from core.batch import BatchView
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("auth/", include("accounts.urls")),
     path("profile/", include("accounts.profile_urls")),
     path("issues/", include("issues.urls")),
+    path("batch/", BatchView.as_view()),
 ]
 
 if settings.DEBUG: